@@ -20,6 +20,11 @@ Modify the UrT server config as follows:
  * seta g_loghits "1"
 Modify the files '/conf/settings.conf' and '/conf/rules.conf'
 Run the bot: python spunky.py
+Replay a recorded games.log without game server: python spunky.py --replay games.log
+Import archived games.log files into the player statistics: python spunky.py --import games.log.1 games.log.2.gz
+Run several game servers in one process: python spunky.py --config conf/server1.conf conf/server2.conf
+Run a local stand-in game server for benchmarks: python tests/standin.py --latency 0.05 --loss 0.01
+Run the tests: python -m unittest discover tests
 """
 
 __version__ = '1.11.0'
@@ -28,9 +33,21 @@ __version__ = '1.11.0'
 ### IMPORTS
 import os
 import time
+import argparse
+import select
+import ctypes
+import ctypes.util
+import struct
+import mmap
+import gzip
+import itertools
+import multiprocessing
+import hashlib
 import sqlite3
+import re
 import math
 import textwrap
+import string
 import ConfigParser
 import logging.handlers
 import requests
@@ -39,9 +56,11 @@ import geoip2.database
 import lib.schedule as schedule
 
 from lib.pyquake3 import PyQuake3
-from Queue import Queue
+from Queue import Queue, Empty, Full
+from collections import namedtuple, deque
 from threading import Thread
 from threading import RLock
+from threading import Event
 
 from discord_webhook import DiscordWebhook, DiscordEmbed
 
@@ -61,8 +80,122 @@ logger.propagate = False
 # Bot player number
 BOT_PLAYER_NUM = 1022
 
-# RCON Delay in seconds, recommended range: 0.18 - 0.33
-RCON_DELAY = 0.20
+# RCON flood limit: commands per window in seconds, a burst of commands is sent without delay
+RCON_RATE = 5
+RCON_WINDOW = 1.0
+RCON_BURST = 3
+
+# adaptive RCON pacing: the rate is lowered if the smoothed round trip time exceeds the target
+# or a response is lost, and raised again while the server responds fast. The rate never exceeds
+# rcon_rate unless rcon_max_rate is configured, ioq3 drops excess RCON requests without notice.
+RCON_MIN_RATE = 2
+RCON_TARGET_RTT = 0.2
+RCON_RTT_SAMPLES = 200
+
+# priority classes of the RCON commands, the lower classes are sent first
+RCON_ENFORCE = 0
+RCON_CONTROL = 1
+RCON_REPLY = 2
+RCON_CHAT = 3
+RCON_CLASSES = ('enforce', 'control', 'reply', 'chat')
+
+# priority class by the first word of a command, other commands are game control and text is chat
+RCON_COMMAND_CLASSES = {'kick': RCON_ENFORCE, 'smite': RCON_ENFORCE, 'slap': RCON_ENFORCE, 'nuke': RCON_ENFORCE,
+                        'mute': RCON_ENFORCE, 'tell': RCON_REPLY, 'say': RCON_CHAT, 'bigtext': RCON_CHAT}
+
+# seconds a command of a lower class waits at most behind the higher classes
+RCON_MAX_WAIT = 2.0
+
+# seconds to wait for the response of an RCON query and the number of repeated requests
+# if the server did not respond or the response belongs to another request
+RCON_QUERY_TIMEOUT = 5.0
+RCON_QUERY_RETRIES = 2
+
+# seconds the responses of CVAR, server info and status queries are reused
+RCON_CVAR_TTL = 30.0
+RCON_STATUS_TTL = 5.0
+
+# commands setting the CVAR given as first argument
+RCON_SET_COMMANDS = frozenset(['set', 'seta', 'sets', 'setu'])
+
+# commands addressed to a player number, dropped from the queue if the player disconnects
+RCON_PLAYER_COMMANDS = frozenset(['tell', 'kick', 'smite', 'slap', 'nuke', 'mute', 'forceteam'])
+
+# queued say lines are merged up to the wrap width of rcon_say
+RCON_SAY_WIDTH = 140
+RCON_SAY_SEPARATOR = " ^7| "
+
+# RCON requests per second an ioq3 server accepts from one address, no command is sent above this limit
+RCON_SERVER_LIMIT = 10
+RCON_SERVER_WINDOW = 1.0
+
+# highest number of commands of a group sent back to back. Groups are not limited by the rate, they
+# use the server limit less one request, which is kept for kicks and other enforcement commands.
+RCON_GROUP_BURST = 8
+
+# Delay in seconds between two reads of the games.log, if inotify is not available
+LOG_POLL_DELAY = 0.125
+
+# Delay in seconds before the games.log is read again after a read error
+LOG_RETRY_DELAY = 5
+
+# Size in bytes of the blocks read from the games.log
+LOG_CHUNK_SIZE = 65536
+
+# maximum number of decoded events waiting for the handler, the games.log reader waits if the queue is full
+EVENT_QUEUE_SIZE = 10000
+
+# events handled again when rebuilding the running map after a restart
+REPLAY_ACTIONS = ('ClientUserinfo', 'ClientUserinfoChanged', 'ClientBegin', 'ClientDisconnect', 'ClientSpawn',
+                  'Kill', 'Hit', 'Assist', 'Freeze', 'ThawOutFinished', 'Flag', 'FlagCaptureTime')
+# events of the backlog which are not handled, the commands and votes are outdated
+BACKLOG_SKIP_ACTIONS = ('say', 'sayteam', 'saytell', 'Callvote')
+
+# number of matches sent to an import process at once
+IMPORT_CHUNK_SIZE = 4
+# number of imported matches merged into the database in one transaction
+IMPORT_COMMIT_MATCHES = 1000
+
+# tables of the database, created if they do not exist
+DATABASE_TABLES = ('CREATE TABLE IF NOT EXISTS xlrstats (id INTEGER PRIMARY KEY NOT NULL, guid TEXT NOT NULL, name TEXT NOT NULL, ip_address TEXT NOT NULL, first_seen DATETIME, last_played DATETIME, num_played INTEGER DEFAULT 1, kills INTEGER DEFAULT 0, deaths INTEGER DEFAULT 0, headshots INTEGER DEFAULT 0, team_kills INTEGER DEFAULT 0, team_death INTEGER DEFAULT 0, max_kill_streak INTEGER DEFAULT 0, suicides INTEGER DEFAULT 0, ratio REAL DEFAULT 0, rounds INTEGER DEFAULT 0, admin_role INTEGER DEFAULT 1, flags_captured INTEGER DEFAULT 0, flags_returned INTEGER DEFAULT 0, flags_dropped INTEGER DEFAULT 0, assists INTEGER DEFAULT 0, gear TEXT DEFAULT "fLjRU")',
+                   'CREATE TABLE IF NOT EXISTS player (id INTEGER PRIMARY KEY NOT NULL, guid TEXT NOT NULL, name TEXT NOT NULL, ip_address TEXT NOT NULL, time_joined DATETIME, aliases TEXT, networks TEXT)',
+                   'CREATE TABLE IF NOT EXISTS ban_list (id INTEGER PRIMARY KEY NOT NULL, guid TEXT NOT NULL, name TEXT, ip_address TEXT, expires DATETIME DEFAULT 259200, timestamp DATETIME, reason TEXT)',
+                   'CREATE TABLE IF NOT EXISTS ban_points (id INTEGER PRIMARY KEY NOT NULL, guid TEXT NOT NULL, point_type TEXT, expires DATETIME)',
+                   'CREATE TABLE IF NOT EXISTS mapvotes (id INTEGER PRIMARY KEY NOT NULL, map TEXT, passed INTEGAR DEFAULT 0, failed INTEGAR DEFAULT 0)',
+                   'CREATE TABLE IF NOT EXISTS log_checkpoint (log_file TEXT PRIMARY KEY NOT NULL, inode INTEGER, offset INTEGER, line_hash TEXT, timestamp DATETIME)')
+
+# typed records of the decoded games.log events, all other events are passed on as text
+Kill = namedtuple('Kill', 'killer victim mod')
+Hit = namedtuple('Hit', 'victim hitter zone item')
+Flag = namedtuple('Flag', 'player action')
+FlagCaptureTime = namedtuple('FlagCaptureTime', 'player msec')
+# events of a single player: ClientBegin, ClientSpawn, ClientDisconnect, Freeze, ThawOutFinished, Assist
+ClientEvent = namedtuple('ClientEvent', 'player')
+
+# hit zones counted for the hit stats
+ZONES = {'TORSO': 'body', 'VEST': 'body', 'KEVLAR': 'body', 'BUTT': 'body', 'GROIN': 'body',
+         'LEGS': 'legs', 'LEFT_UPPER_LEG': 'legs', 'RIGHT_UPPER_LEG': 'legs',
+         'LEFT_LOWER_LEG': 'legs', 'RIGHT_LOWER_LEG': 'legs', 'LEFT_FOOT': 'legs', 'RIGHT_FOOT': 'legs',
+         'ARMS': 'arms', 'LEFT_ARM': 'arms', 'RIGHT_ARM': 'arms'}
+
+HS_MSG = {10: 'watch out!',
+          15: 'awesome!',
+          20: 'unbelievable!',
+          30: '^1MANIAC!',
+          40: '^8AIMBOT?',
+          50: 'stop that'}
+
+KILL_STREAK_MSG = {6: "IS ON ^8FIRE!^7",
+                   9: "IS ON A ^1RAMPAGE!^7 ",
+                   12: "IS ^5UNSTOPPABLE!^7",
+                   15: "IS ^2DOMINATING!^7",
+                   20: "IS ^9G O D L I K E !^7",
+                   25: "IS ^6L E G E N D A R Y !^7"}
+
+SUICIDE_REASONS = frozenset(['UT_MOD_SUICIDE', 'MOD_FALLING', 'MOD_WATER', 'MOD_LAVA', 'MOD_TRIGGER_HURT',
+                             'UT_MOD_SPLODED', 'UT_MOD_SLAPPED', 'UT_MOD_SMITED'])
+# weapons counted as suicide if killer and victim are the same player
+SUICIDE_WEAPONS = frozenset(['UT_MOD_HEGRENADE', 'UT_MOD_HK69', 'UT_MOD_NUKED', 'UT_MOD_BOMBED'])
 
 COMMANDS = {'help': {'desc': 'display all available commands', 'syntax': '^7Usage: ^8!help', 'level': 0, 'short': 'h'},
             'forgive': {'desc': 'forgive a player for team killing', 'syntax': '^7Usage: ^8!forgive ^7[<name>]', 'level': 0, 'short': 'f'},
@@ -173,6 +306,28 @@ COMMANDS = {'help': {'desc': 'display all available commands', 'syntax': '^7Usag
             'password': {'desc': 'set private server password', 'syntax': '^7Usage: ^8!password ^7[<password>]', 'level': 90},
             'reload': {'desc': 'reload map', 'syntax': '^7Usage: ^8!reload', 'level': 90}}
 
+# names of the chat commands besides !<command> and !<short>, including the commands not listed by !help
+COMMAND_ALIASES = {'time': ('@time',), 'discord': ('@discord',), 'votes': ('@votes',), 'locate': ('@locate',),
+                   'nextmap': ('@nextmap',), 'warntest': ('!wt',), 'admins': ('@admins',), 'regulars': ('@regulars',),
+                   'aliases': ('@alias', '@aliases'), 'maps': ('@maps',), 'mapstats': ('!mapstats',), 'iamgod': ('!iamgod',)}
+
+# chat commands available for all players, their level in COMMANDS only sorts them into the !help lists
+OPEN_COMMANDS = frozenset(['bombstats', 'ctfstats', 'freezestats', 'hestats', 'hits', 'hs', 'knife', 'regtest', 'spree', 'stats', 'votes', 'xlrstats'])
+
+# first character of a chat command, all other chat lines are ordinary conversation
+COMMAND_PREFIXES = frozenset('!@')
+
+BAD_WORDS = ('fuck', 'ass', 'bastard', 'retard', 'slut', 'bitch', 'whore', 'cunt', 'pussy', 'dick', 'sucker',
+             'fick', 'arsch', 'nutte', 'schlampe', 'hure', 'fotze', 'penis', 'wichser', 'nazi', 'hitler',
+             'putain', 'merde', 'chienne',
+             'kurwa', 'suka', 'dupa', 'dupek', 'puta')
+
+# color codes of player names and chat messages
+COLOR_CODE = re.compile(r'\^[0-9]')
+
+# common character substitutions used to disguise bad words
+LEETSPEAK = string.maketrans('0134578@$!|', 'oieastbasil')
+
 REASONS = {'obj': 'go for objective',
            'camp': 'stop camping',
            'spam': 'do not spam!',
@@ -203,34 +358,28 @@ class LogParser(object):
     log file parser
     """
     
-    def __init__(self, config_file):
+    def __init__(self, config_file, replay_file=None, transcript_file=None, import_files=None, processes=None, server_host=None):
         """
         create a new instance of LogParser
 
         @param config_file: The full path of the bot configuration file
         @type  config_file: String
+        @param replay_file: The recorded games.log to replay without game server
+        @type  replay_file: String
+        @param transcript_file: The file to write the RCON commands of the replay to
+        @type  transcript_file: String
+        @param import_files: The archived games.log files to import into the player statistics
+        @type  import_files: List
+        @param processes: The number of processes of the import, default is the number of CPUs
+        @type  processes: Integer
+        @param server_host: The host running this game server together with other game servers,
+                            if not given the game server is run on its own
+        @type  server_host: ServerHost
         """
         # Urban Terror auth status
-        self.authtimer = time.time()
+        self.authtimer = CLOCK.time()
         self.auth_status = True
         
-        # hit zone support for UrT > 4.2.013
-        self.hit_points = {0: "HEAD", 1: "HEAD", 2: "HELMET", 3: "TORSO", 4: "VEST", 5: "LEFT_ARM", 6: "RIGHT_ARM",
-                           7: "GROIN", 8: "BUTT", 9: "LEFT_UPPER_LEG", 10: "RIGHT_UPPER_LEG", 11: "LEFT_LOWER_LEG",
-                           12: "RIGHT_LOWER_LEG", 13: "LEFT_FOOT", 14: "RIGHT_FOOT"}
-        self.hit_item = {1: "UT_MOD_KNIFE", 2: "UT_MOD_BERETTA", 3: "UT_MOD_DEAGLE", 4: "UT_MOD_SPAS", 5: "UT_MOD_MP5K",
-                         6: "UT_MOD_UMP45", 8: "UT_MOD_LR300", 9: "UT_MOD_G36", 10: "UT_MOD_PSG1", 14: "UT_MOD_SR8",
-                         15: "UT_MOD_AK103", 17: "UT_MOD_NEGEV", 19: "UT_MOD_M4", 20: "UT_MOD_GLOCK", 21: "UT_MOD_COLT1911",
-                         22: "UT_MOD_MAC11", 23: "UT_MOD_BLED"}
-        self.death_cause = {1: "MOD_WATER", 3: "MOD_LAVA", 5: "UT_MOD_TELEFRAG", 6: "MOD_FALLING", 7: "UT_MOD_SUICIDE",
-                            9: "MOD_TRIGGER_HURT", 10: "MOD_CHANGE_TEAM", 12: "UT_MOD_KNIFE", 13: "UT_MOD_KNIFE_THROWN",
-                            14: "UT_MOD_BERETTA", 15: "UT_MOD_DEAGLE", 16: "UT_MOD_SPAS", 17: "UT_MOD_UMP45", 18: "UT_MOD_MP5K",
-                            19: "UT_MOD_LR300", 20: "UT_MOD_G36", 21: "UT_MOD_PSG1", 22: "UT_MOD_HK69", 23: "UT_MOD_BLED",
-                            24: "UT_MOD_KICKED", 25: "UT_MOD_HEGRENADE", 28: "UT_MOD_SR8", 30: "UT_MOD_AK103",
-                            31: "UT_MOD_SPLODED", 32: "UT_MOD_SLAPPED", 33: "UT_MOD_SMITED", 34: "UT_MOD_BOMBED",
-                            35: "UT_MOD_NUKED", 36: "UT_MOD_NEGEV", 37: "UT_MOD_HK69_HIT", 38: "UT_MOD_M4",
-                            39: "UT_MOD_GLOCK", 40: "UT_MOD_COLT1911", 41: "UT_MOD_MAC11"}
-
         # RCON commands for the different admin roles
         self.user_cmds = []
         self.mod_cmds = []
@@ -280,34 +429,69 @@ class LogParser(object):
         self.senioradmin_cmds.sort()
         self.superadmin_cmds.sort()
 
+        # chat commands by name and shortcut, the handler of a command is the method cmd_<command>
+        self.command_table = {}
+        self.commands = []
+        for key in set(COMMANDS) | set(COMMAND_ALIASES):
+            handler = getattr(self, 'cmd_%s' % key, None)
+            if handler is None:
+                continue
+            value = COMMANDS.get(key, {})
+            command = {'name': key, 'handler': handler,
+                       'level': value['level'] if 'level' in value and key not in OPEN_COMMANDS else None,
+                       # Last Man Standing and Gun Game require UrT 4.3
+                       'modversion': 43 if key in ('lms', 'gungame') else None,
+                       'calls': 0, 'time': 0.0, 'max_time': 0.0}
+            names = list(COMMAND_ALIASES.get(key, ()))
+            if key in COMMANDS:
+                names.append('!%s' % key)
+            if 'short' in value and key != 'say':
+                names.append('!%s' % value['short'])
+            for name in names:
+                self.command_table[name] = command
+            self.commands.append(command)
+        # the shortcut of !say is !!<text>
+        self.command_table['!!'] = dict(self.command_table['!say'], name='!!', handler=self.cmd_say_short)
+        self.commands.append(self.command_table['!!'])
+
         self.config_file = config_file
         config = ConfigParser.ConfigParser()
         config.read(config_file)
 
-        # enable/disable debug output
-        verbose = config.getboolean('bot', 'verbose') if config.has_option('bot', 'verbose') else False
-        # logging format
-        formatter = logging.Formatter('[%(asctime)s] %(levelname)-8s %(message)s', datefmt='%d.%m.%Y %H:%M:%S')
-        # console logging
-        console = logging.StreamHandler()
-        if not verbose:
-            console.setLevel(logging.INFO)
-        console.setFormatter(formatter)
-
-        # devel.log file
-        devel_log = logging.handlers.RotatingFileHandler(filename='devel.log', maxBytes=2097152, backupCount=1, encoding='utf8')
-        devel_log.setLevel(logging.INFO)
-        devel_log.setFormatter(formatter)
-
-        # add logging handler
-        logger.addHandler(console)
-        logger.addHandler(devel_log)
-
-        logger.info("*** Spunky Bot v%s ***", __version__)
-        logger.info("Starting logging      : OK")
+        # the logging is set up by the first game server of the process
+        if not logger.handlers:
+            # enable/disable debug output
+            verbose = config.getboolean('bot', 'verbose') if config.has_option('bot', 'verbose') else False
+            # logging format
+            formatter = logging.Formatter('[%(asctime)s] %(levelname)-8s %(message)s', datefmt='%d.%m.%Y %H:%M:%S')
+            # console logging
+            console = logging.StreamHandler()
+            if not verbose:
+                console.setLevel(logging.INFO)
+                # skip creating debug records on the hot path, all handlers drop them anyway
+                logger.setLevel(logging.INFO)
+            console.setFormatter(formatter)
+
+            # devel.log file
+            devel_log = logging.handlers.RotatingFileHandler(filename='devel.log', maxBytes=2097152, backupCount=1, encoding='utf8')
+            devel_log.setLevel(logging.INFO)
+            devel_log.setFormatter(formatter)
+
+            # add logging handler
+            logger.addHandler(console)
+            logger.addHandler(devel_log)
+
+            logger.info("*** Spunky Bot v%s ***", __version__)
+            logger.info("Starting logging      : OK")
         logger.info("Loading config file   : %s", config_file)
 
-        games_log = config.get('server', 'log_file')
+        if import_files:
+            LogImporter(processes).import_logs(import_files)
+            return
+
+        games_log = replay_file if replay_file else config.get('server', 'log_file')
+        self.replay_mode = True if replay_file else False
+        self.transcript_file = transcript_file
 
         self.ffa_lms_gametype = False
         self.ctf_gametype = False
@@ -315,6 +499,8 @@ class LogParser(object):
         self.tdm_gametype = False
         self.bomb_gametype = False
         self.freeze_gametype = False
+        # wrapped !help lines per admin role for the current game type
+        self.help_lines = {}
         self.ts_do_team_balance = False
         self.allow_cmd_teams = True
         self.urt_modversion = None
@@ -327,12 +513,31 @@ class LogParser(object):
         self.allow_nextmap_vote = True
         self.allow_cyclevote = True
         self.discord_link = 'discordapp.com'
-        self.failed_vote_timer = time.time()
-        self.failed_cyclemap_timer = time.time()
+        self.failed_vote_timer = CLOCK.time()
+        self.failed_cyclemap_timer = CLOCK.time()
         self.default_gear = ''
         self.lastreport = ''
-        self.cooldown = time.time()
+        self.cooldown = CLOCK.time()
         self.stats_with_bots = False
+        self.replaying = False
+        self.decoder = EventDecoder()
+        self.stats = StatsCounter()
+        # the event queue, the games.log reader and the RCON thread are shared by all game servers of the host
+        self.server_host = server_host if server_host else ServerHost()
+        self.event_queue = self.server_host.event_queue
+        self.end_reached = False
+        self.backlog_start = time.time()
+        self.backlog_lines = 0
+        self.checkpoint = None
+        self.event_handlers = {'InitGame': self.new_game, 'Warmup': self.handle_warmup, 'InitRound': self.handle_initround,
+                               'Exit': self.handle_exit, 'say': self.handle_say, 'sayteam': self.handle_say, 'saytell': self.handle_saytell,
+                               'ClientUserinfo': self.handle_userinfo, 'ClientUserinfoChanged': self.handle_userinfo_changed,
+                               'ClientBegin': self.handle_begin, 'ClientDisconnect': self.handle_disconnect,
+                               'SurvivorWinner': self.handle_teams_ts_mode, 'Kill': self.handle_kill, 'Hit': self.handle_hit,
+                               'Freeze': self.handle_freeze, 'ThawOutFinished': self.handle_thawout, 'ClientSpawn': self.handle_spawn,
+                               'Flag': self.handle_flag, 'FlagCaptureTime': self.handle_flagcapturetime,
+                               'VotePassed': self.handle_vote_passed, 'VoteFailed': self.handle_vote_failed,
+                               'Callvote': self.handle_callvote, 'ShutdownGame': self.handle_shutdown, 'Assist': self.handle_assist}
         self.server_name = config.get('server', 'server_name')
 
         # enable/disable autokick for team killing
@@ -347,8 +552,14 @@ class LogParser(object):
         self.num_kick_specs = config.getint('bot', 'kick_spec_full_server') if config.has_option('bot', 'kick_spec_full_server') else 10
         # set task frequency
         self.task_frequency = config.getint('bot', 'task_frequency') if config.has_option('bot', 'task_frequency') else 60
+        # store the position of the games.log every n seconds to resume after a restart, 0 = disabled
+        self.checkpoint_interval = config.getint('bot', 'checkpoint_interval') if config.has_option('bot', 'checkpoint_interval') else 10
         self.warn_expiration = config.getint('bot', 'warn_expiration') if config.has_option('bot', 'warn_expiration') else 240
         self.bad_words_autokick = config.getint('bot', 'bad_words_autokick') if config.has_option('bot', 'bad_words_autokick') else 0
+        # bad words file with one word per line, the built-in list is used if the file does not exist
+        bad_words_file = os.path.join(HOME, config.get('bot', 'bad_words_file') if config.has_option('bot', 'bad_words_file') else os.path.join('conf', 'badwords.conf'))
+        bad_words_leetspeak = config.getboolean('bot', 'bad_words_leetspeak') if config.has_option('bot', 'bad_words_leetspeak') else False
+        self.bad_words = WordMatcher(self.load_bad_words(bad_words_file), LEETSPEAK if bad_words_leetspeak else None)
         # enable/disable message 'Player connected from...'
         self.show_country_on_connect = config.getboolean('bot', 'show_country_on_connect') if config.has_option('bot', 'show_country_on_connect') else True
         # discord display link
@@ -380,154 +591,135 @@ class LogParser(object):
         self.iamgod = True if curs.fetchone()[0] < 1 else False
         logger.info("Connecting to Database: OK")
         logger.debug("Cmd !iamgod available : %s", self.iamgod)
-        self.uptime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
+        self.uptime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time()))
         # Rotating Messages and Rules
-        if config.has_option('rules', 'show_rules') and config.getboolean('rules', 'show_rules'):
+        if config.has_option('rules', 'show_rules') and config.getboolean('rules', 'show_rules') and not self.replay_mode:
             self.output_rules = config.get('rules', 'display') if config.has_option('rules', 'display') else "chat"
             rules_frequency = config.getint('rules', 'rules_frequency') if config.has_option('rules', 'rules_frequency') else 90
             self.rules_file = os.path.join(HOME, 'conf', 'rules.conf')
             self.rules_frequency = rules_frequency if rules_frequency > 0 else 10
             if os.path.isfile(self.rules_file):
-                self.thread_rotate()
+                self.server_host.add_rules(self)
                 logger.info("Load rotating messages: OK")
             else:
                 logger.error("ERROR: Rotating messages will be ignored, file '%s' has not been found", self.rules_file)
         # Parse Game log file
         try:
             # open game log file
-            self.log_file = open(games_log, 'r')
+            self.log_tail = LogTail(games_log)
         except IOError:
             logger.error("ERROR: The Gamelog file '%s' has not been found", games_log)
             logger.error("*** Aborting Spunky Bot ***")
         else:
-            # go to the end of the file
-            self.log_file.seek(0, 2)
+            if self.replay_mode:
+                logger.info("Replaying Gamelog file: %s", games_log)
+                self.replay_log()
+                return
+            # resume at the last checkpoint or go to the end of the file
+            offset = self.load_checkpoint()
+            if offset is None:
+                self.log_tail.seek_end()
+            else:
+                self.log_tail.seek(offset)
+                logger.info("Resuming Gamelog at   : %d", offset)
             # start parsing the games logfile
             logger.info("Parsing Gamelog file  : %s", games_log)
-            self.read_log()
+            self.server_host.add_server(self)
+            if not server_host:
+                self.server_host.run()
 
-    def thread_rotate(self):
+    def rotating_message(self, line):
         """
-        Thread process for starting method rotate_messages
+        display a line of the rotating messages and rules, called by the rules thread of the server host
+
+        @param line: The line of the rules file
+        @type  line: String
         """
-        processor = Thread(target=self.rotating_messages)
-        processor.setDaemon(True)
-        processor.start()
+        with self.players_lock:
+            if "@admins" in line:
+                admins = "%s" % ", ".join(["^7%s" % (player.get_name()) for player in self.game.player_index.get_admins()])
+                if admins:
+                    self.game.rcon_say("^3Admins online:^7 %s" % (admins))
+            elif "@nextmap" in line:
+                self.get_nextmap(self.game.rcon_say)
+            elif "@time" in line:
+                self.game.rcon_say("^3Time:^7 %s" % time.strftime("%H:%M", time.localtime(CLOCK.time())))
+            elif "@discord" in line:
+                self.game.rcon_say("^3Discord:^7 %s" % (self.discord_link))
+            elif "@bigtext" in line:
+                self.game.rcon_bigtext("^7%s" % line.split('@bigtext')[-1].strip())
+            else:
+                if self.output_rules == 'chat':
+                    self.game.rcon_say("^3%s" % line.strip())
+                elif self.output_rules == 'bigtext':
+                    self.game.rcon_bigtext("^3%s" % line.strip())
+                else:
+                    self.game.send_rcon("^3%s" % line.strip())
 
-    def rotating_messages(self):
+    def find_game_start(self):
         """
-        display rotating messages and rules
+        find the last InitGame in front of the current position of the games.log
         """
-        # initial wait
-        time.sleep(30)
-        while 1:
-            with open(self.rules_file, 'r') as filehandle:
-                rotation_msg = filehandle.readlines()
-            if not rotation_msg:
-                break
-            for line in rotation_msg:
-                # display rule
-                with self.players_lock:
-                    if "@admins" in line:
-                        admins = "%s" % ", ".join(["^7%s" % (player.get_name()) for player in self.game.players.itervalues() if player.get_admin_role() >= 20])
-                        if admins:
-                            self.game.rcon_say("^3Admins online:^7 %s" % (admins))
-                    elif "@nextmap" in line:
-                        self.game.rcon_say(self.get_nextmap())
-                    elif "@time" in line:
-                        self.game.rcon_say("^3Time:^7 %s" % time.strftime("%H:%M", time.localtime(time.time())))
-                    elif "@discord" in line:
-                        self.game.rcon_say("^3Discord:^7 %s" % (self.discord_link))
-                    elif "@bigtext" in line:
-                        self.game.rcon_bigtext("^7%s" % line.split('@bigtext')[-1].strip())
-                    else:
-                        if self.output_rules == 'chat':
-                            self.game.rcon_say("^3%s" % line.strip())
-                        elif self.output_rules == 'bigtext':
-                            self.game.rcon_bigtext("^3%s" % line.strip())
-                        else:
-                            self.game.send_rcon("^3%s" % line.strip())
-                # wait for given delay in the config file
-                time.sleep(self.rules_frequency)
+        log_file = self.log_tail.log_file
+        end_pos = log_file.tell()
+        start_time = time.time()
+        # position of the InitGame line
+        self.game_start_offset = None
+        values = None
+        if end_pos > 0:
+            log_map = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                end_pos = min(end_pos, len(log_map))
+                # the mapped file is searched backwards, only the pages behind the last InitGame are read
+                pos = log_map.rfind('InitGame:', 0, end_pos)
+                while pos > 0:
+                    line_start = log_map.rfind('\n', 0, pos) + 1
+                    # only the timestamp is allowed in front of the InitGame event
+                    if len(log_map[line_start:pos].split()) == 1:
+                        self.game_start_offset = line_start
+                        line_end = log_map.find('\n', pos, end_pos)
+                        values = self.explode_line(log_map[pos + len('InitGame:'):line_end if line_end > -1 else end_pos])
+                        break
+                    pos = log_map.rfind('InitGame:', 0, pos)
+            finally:
+                log_map.close()
+        logger.info("Gamelog InitGame scan : %.1f ms", (time.time() - start_time) * 1000)
+
+        if values is None:
+            logger.error("ERROR: No InitGame found in the games.log file, ignoring game type and start")
+            return
 
-    def find_game_start(self):
+        urt_modversion = self.stats.set_modversion(values.get('g_modversion', ''))
+        if urt_modversion:
+            self.urt_modversion = urt_modversion
+            logger.info("Game modversion       : %d.%d", urt_modversion / 10, urt_modversion % 10)
+
+        self.set_gametype(values)
+
+        # get default g_gear value
+        self.default_gear = values['g_gear'] if 'g_gear' in values else '' if self.urt_modversion > 41 else '0'
+
+    def set_gametype(self, values):
         """
-        find InitGame start
+        set the game type of an InitGame event
+
+        @param values: The server settings of the InitGame event
+        @type  values: Dict
         """
-        seek_amount = 768
-        # search within the specified range for the InitGame message
-        start_pos = self.log_file.tell() - seek_amount
-        end_pos = start_pos + seek_amount
-        try:
-            self.log_file.seek(start_pos)
-        except IOError:
-            logger.error("ERROR: The games.log file is empty, ignoring game type and start")
-            # go to the end of the file
-            self.log_file.seek(0, 2)
-            game_start = True
-        else:
-            game_start = False
-        while not game_start:
-            while self.log_file:
-                line = self.log_file.readline()
-                tmp = line.split()
-                if len(tmp) > 1 and tmp[1] == "InitGame:":
-                    game_start = True
-                    if 'g_modversion\\4.3' in line:
-                        self.hit_item.update({23: "UT_MOD_FRF1", 24: "UT_MOD_BENELLI", 25: "UT_MOD_P90",
-                                              26: "UT_MOD_MAGNUM", 29: "UT_MOD_KICKED", 30: "UT_MOD_KNIFE_THROWN"})
-                        self.death_cause.update({42: "UT_MOD_FRF1", 43: "UT_MOD_BENELLI", 44: "UT_MOD_P90", 45: "UT_MOD_MAGNUM",
-                                                 46: "UT_MOD_TOD50", 47: "UT_MOD_FLAG", 48: "UT_MOD_GOOMBA"})
-                        self.urt_modversion = 43
-                        logger.info("Game modversion       : 4.3")
-                    elif 'g_modversion\\4.2' in line:
-                        self.hit_item.update({23: "UT_MOD_BLED", 24: "UT_MOD_KICKED", 25: "UT_MOD_KNIFE_THROWN"})
-                        self.death_cause.update({42: "UT_MOD_FLAG", 43: "UT_MOD_GOOMBA"})
-                        self.urt_modversion = 42
-                        logger.info("Game modversion       : 4.2")
-                    elif 'g_modversion\\4.1' in line:
-                        # hit zone support for UrT 4.1
-                        self.hit_points = {0: "HEAD", 1: "HELMET", 2: "TORSO", 3: "KEVLAR", 4: "ARMS", 5: "LEGS", 6: "BODY"}
-                        self.hit_item.update({21: "UT_MOD_KICKED", 22: "UT_MOD_KNIFE_THROWN"})
-                        self.death_cause.update({33: "UT_MOD_BOMBED", 34: "UT_MOD_NUKED", 35: "UT_MOD_NEGEV",
-                                                 39: "UT_MOD_FLAG", 40: "UT_MOD_GOOMBA"})
-                        self.urt_modversion = 41
-                        logger.info("Game modversion       : 4.1")
-
-                    if 'g_gametype\\0\\' in line or 'g_gametype\\1\\' in line or 'g_gametype\\9\\' in line or 'g_gametype\\11\\' in line:
-                        # disable teamkill event and some commands for FFA (0), LMS (1), Jump (9), Gun (11)
-                        self.ffa_lms_gametype = True
-                    elif 'g_gametype\\7\\' in line:
-                        self.ctf_gametype = True
-                    elif 'g_gametype\\4\\' in line or 'g_gametype\\5\\' in line:
-                        self.ts_gametype = True
-                    elif 'g_gametype\\3\\' in line:
-                        self.tdm_gametype = True
-                    elif 'g_gametype\\8\\' in line:
-                        self.bomb_gametype = True
-                    elif 'g_gametype\\10\\' in line:
-                        self.freeze_gametype = True
-
-                    # get default g_gear value
-                    self.default_gear = line.split('g_gear\\')[-1].split('\\')[0] if 'g_gear\\' in line else "%s" % '' if self.urt_modversion > 41 else '0'
-                    
-                if self.log_file.tell() > end_pos:
-                    break
-                elif not line:
-                    break
-            if self.log_file.tell() < seek_amount:
-                self.log_file.seek(0, 0)
-            else:
-                cur_pos = start_pos - seek_amount
-                end_pos = start_pos
-                start_pos = cur_pos
-                if start_pos < 0:
-                    start_pos = 0
-                self.log_file.seek(start_pos)
+        gametype = values.get('g_gametype')
+        # disable teamkill event and some commands for FFA (0), LMS (1), Jump (9), Gun (11)
+        self.ffa_lms_gametype = gametype in ('0', '1', '9', '11')
+        self.ctf_gametype = gametype == '7'
+        self.ts_gametype = gametype in ('4', '5')
+        self.tdm_gametype = gametype == '3'
+        self.bomb_gametype = gametype == '8'
+        self.freeze_gametype = gametype == '10'
+        # the available commands depend on the game type and modversion
+        self.help_lines = {}
 
-    def read_log(self):
+    def start_log(self):
         """
-        read the logfile
+        schedule the tasks and rebuild the running map, the games.log is read by the server host
         """
         if self.task_frequency > 0:
             # schedule the task
@@ -538,28 +730,160 @@ class LogParser(object):
                 schedule.every(self.task_frequency).seconds.do(self.taskmanager)
         # schedule the task
         schedule.every(2).hours.do(self.remove_expired_db_entries)
+        schedule.every(10).minutes.do(self.report_command_stats)
+        if self.checkpoint_interval > 0:
+            schedule.every(self.checkpoint_interval).seconds.do(self.save_checkpoint)
 
+        resume_offset = self.log_tail.offset
         self.find_game_start()
 
         # create instance of Game
         self.game = Game(self.config_file, self.urt_modversion)
+        schedule.every(1).seconds.do(self.game.announcer.flush_due)
+
+        # rebuild players and statistics of the running map
+        self.replay_game(resume_offset)
+        self.log_tail.seek(resume_offset)
+        self.checkpoint = (self.log_tail.inode[1], resume_offset, self.log_tail.last_line)
+        logger.info("Gamelog tail backend  : %s", self.log_tail.backend)
+        self.backlog_start = time.time()
+
+    def handle_queued_event(self, read_time, action, event, inode, offset, line):
+        """
+        handle an event taken from the event queue by the server host
+        """
+        if action is None:
+            # the reader has reached the end of the games.log for the first time
+            if self.backlog_lines:
+                logger.info("Gamelog backlog       : %d lines in %.2f s", self.backlog_lines, time.time() - self.backlog_start)
+                # latency of the backlog is not the ingest latency
+                self.event_queue.get_latency_stats()
+            self.game.go_live()
+            return
+        self.handle_event(action, event)
+        self.checkpoint = (inode, offset, line)
+        self.event_queue.event_handled(read_time)
+        if not self.game.live:
+            self.backlog_lines += 1
 
-        self.log_file.seek(0, 2)
-        while self.log_file:
-            schedule.run_pending()
-            line = self.log_file.readline()
-            if line:
-                self.parse_line(line)
-            else:
-                if not self.game.live:
-                    self.game.go_live()
-                time.sleep(.125)
+    def replay_log(self):
+        """
+        handle all events of a recorded games.log as fast as possible, without game server.
+        The time is taken from the game time of the lines, the RCON commands are recorded.
+        """
+        # modversion of the server, the game type is set again by the first InitGame
+        self.log_tail.seek_end()
+        end = self.log_tail.offset
+        self.find_game_start()
+
+        quake = RecordingQuake()
+        self.game = Game(self.config_file, self.urt_modversion, quake=quake)
+        self.game.go_live()
+        self.game.flush_rcon()
+
+        start_time = time.time()
+        events = 0
+        for line in self.log_tail.iter_lines(0, end):
+            CLOCK.set_game_time(line)
+            action, event = self.decoder.decode(line)
+            if action:
+                if action == 'InitGame':
+                    quake.set_server_info(self.explode_line(event))
+                self.handle_event(action, event)
+                self.game.flush_rcon()
+                events += 1
+        elapsed = time.time() - start_time
+        logger.info("Replay completed      : %d events in %.2f s, %.0f events/s, %d RCON commands", events, elapsed, events / elapsed if elapsed else 0, len(quake.transcript))
+        if self.transcript_file:
+            with open(self.transcript_file, 'w') as file_handle:
+                for timestamp, command in quake.transcript:
+                    file_handle.write("%s %s\n" % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)), command))
+            logger.info("RCON transcript       : %s", self.transcript_file)
+
+    def ingest_log(self):
+        """
+        read and decode the next lines of the games.log and put the events into the event queue,
+        return False if there are no new lines. Called by the reader thread of the server host.
+        """
+        lines = self.log_tail.read_lines()
+        if not lines:
+            if not self.end_reached:
+                self.end_reached = True
+                self.event_queue.put((time.time(), self, None, None, None, None, None))
+            return False
+        # the latency of a line is measured from the read which returned it
+        read_time = time.time()
+        inode = self.log_tail.inode[1]
+        offset = self.log_tail.batch_offset
+        for line in lines:
+            offset += len(line) + 1
+            action, event = self.decoder.decode(line)
+            if action:
+                self.event_queue.put((read_time, self, action, event, inode, offset, line))
+        return True
+
+    def replay_game(self, end):
+        """
+        rebuild connected players and their statistics of the running map from the
+        games.log lines between InitGame and the resume position. These lines have
+        already been handled before, so only the accounting is done again.
+
+        @param end: The resume position
+        @type  end: Integer
+        """
+        if self.game_start_offset is None:
+            return
+        self.replaying = True
+        try:
+            for line in self.log_tail.iter_lines(self.game_start_offset, end):
+                action, event = self.decoder.decode(line)
+                if action in REPLAY_ACTIONS:
+                    self.handle_event(action, event)
+        finally:
+            self.replaying = False
+        logger.info("Players of running map: %d", len(self.game.players) - 1)
+
+    def load_checkpoint(self):
+        """
+        return the position of the games.log stored at the last checkpoint, or None if not available
+        """
+        if self.checkpoint_interval <= 0:
+            return None
+        values = (os.path.abspath(self.log_tail.filename),)
+        curs.execute("SELECT `inode`,`offset`,`line_hash` FROM `log_checkpoint` WHERE `log_file` = ?", values)
+        result = curs.fetchone()
+        if not result:
+            return None
+        return self.log_tail.verify_checkpoint(result[0], result[1], str(result[2]))
+
+    def save_checkpoint(self):
+        """
+        store the position of the last handled line of the games.log
+        """
+        inode, offset, line = self.checkpoint
+        values = (os.path.abspath(self.log_tail.filename), inode, offset, hashlib.sha1(line).hexdigest(), time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
+        curs.execute("INSERT OR REPLACE INTO `log_checkpoint` (`log_file`,`inode`,`offset`,`line_hash`,`timestamp`) VALUES (?,?,?,?,?)", values)
+        conn.commit()
+
+    def report_command_stats(self):
+        """
+        report the calls and the handling time of the chat commands used since the last report
+        """
+        commands = [command for command in self.commands if command['calls']]
+        commands.sort(key=lambda command: command['time'], reverse=True)
+        if commands:
+            logger.info("Chat commands: %s", ", ".join("%s %dx avg %.1f ms max %.1f ms" % (command['name'], command['calls'], command['time'] / command['calls'] * 1000,
+                                                                                        command['max_time'] * 1000) for command in commands[:10]))
+        for command in commands:
+            command['calls'] = 0
+            command['time'] = 0.0
+            command['max_time'] = 0.0
 
     def remove_expired_db_entries(self):
         """
         delete expired ban points
         """
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time()))
         values = (timestamp,)
         # remove expired ban_points
         curs.execute("DELETE FROM `ban_points` WHERE `expires` < ?", values)
@@ -571,6 +895,8 @@ class LogParser(object):
         - check for spectators and set warning
         - check for players with low score and set warning
         """
+        if not self.game.live:
+            return
         try:
             with self.players_lock:
                 # get number of connected players
@@ -586,7 +912,7 @@ class LogParser(object):
 
                     # clear expired warnings
                     if self.warn_expiration > 0 and player.get_warning() > 0 and player.get_last_warn_time():
-                        if player.get_last_warn_time() + self.warn_expiration < time.time():
+                        if player.get_last_warn_time() + self.warn_expiration < CLOCK.time():
                             player.clear_warning()
 
                     # kick player with 5 or more warnings, Admins will never get kicked
@@ -615,7 +941,7 @@ class LogParser(object):
                             continue
                         # if player is spectator on full server, inform player and increase warn counter
                         # GTV or Moderator or higher levels will not get the warning
-                        elif counter > self.num_kick_specs and player.get_team() == 3 and player.get_time_joined() < (time.time() - 30):
+                        elif counter > self.num_kick_specs and player.get_team() == 3 and player.get_time_joined() < (CLOCK.time() - 30):
                             player.add_warning(warning='spectator too long on full server', timer=False)
                             logger.debug("%s is spectator too long on full server", player_name)
                             warnmsg = "^1WARNING ^7[^3%d^7]: You are spectator too long on full server" % player.get_warning()
@@ -649,29 +975,43 @@ class LogParser(object):
                 if not self.ffa_lms_gametype:
                     self.autobalancer()
                     
-                if self.authtimer < time.time():
-                    with requests_cache.disabled():
-                        #urt auth status checker
-                        auth_api_url = 'https://www.urbanterror.info/api/status'
-                        UAheaders = {'User-Agent': 'SpunkyBot/1.11.0', 'From': 'www.LilPwny.com'}
-                        authcheck = requests.get(auth_api_url, headers=UAheaders).json()
-                        if not authcheck["authserver.urbanterror.info"]["active"]:
-                            self.auth_status = False
-                        else:
-                            self.auth_status = True
-                        self.authtimer = time.time() + 210
+                if self.authtimer < CLOCK.time():
+                    self.authtimer = CLOCK.time() + 210
+                    WORKER.submit(self.check_auth_status)
                         
         except Exception as err:
             logger.error(err, exc_info=True)
 
+    def check_auth_status(self):
+        """
+        check the status of the Urban Terror auth server, runs in the background worker
+        """
+        #urt auth status checker
+        auth_api_url = 'https://www.urbanterror.info/api/status'
+        UAheaders = {'User-Agent': 'SpunkyBot/1.11.0', 'From': 'www.LilPwny.com'}
+        authcheck = WORKER.uncached_session.get(auth_api_url, headers=UAheaders).json()
+        if not authcheck["authserver.urbanterror.info"]["active"]:
+            self.auth_status = False
+        else:
+            self.auth_status = True
+
     def check_player_ping(self):
         """
         check ping of all players and set warning for high ping user
         """
         if self.max_ping > 0:
-            # rcon update status
-            self.game.quake.rcon_update()
-            for player in self.game.quake.players:
+            # rcon update status, the players are checked when the server has responded
+            self.game.query_status(callback=self.warn_high_ping)
+
+    def warn_high_ping(self, players):
+        """
+        set warning for players with high ping
+
+        @param players: The players of the RCON status
+        @type  players: List
+        """
+        with self.players_lock:
+            for player in players or []:
                 # if ping is too high, increase warn counter, Admins or higher levels will not get the warning
                 try:
                     ping_value = player.ping
@@ -689,26 +1029,26 @@ class LogParser(object):
         """
         parse the logfile and search for specific action
         """
-        # Check for game beyond timelimit
-        line = string[7:]
-        tmp = line.split(":", 1)
-        line = tmp[1].strip() if len(tmp) > 1 else tmp[0].strip()
-        option = {'InitGame': self.new_game, 'Warmup': self.handle_warmup, 'InitRound': self.handle_initround,
-                  'Exit': self.handle_exit, 'say': self.handle_say, 'sayteam': self.handle_say, 'saytell': self.handle_saytell,
-                  'ClientUserinfo': self.handle_userinfo, 'ClientUserinfoChanged': self.handle_userinfo_changed,
-                  'ClientBegin': self.handle_begin, 'ClientDisconnect': self.handle_disconnect,
-                  'SurvivorWinner': self.handle_teams_ts_mode, 'Kill': self.handle_kill, 'Hit': self.handle_hit,
-                  'Freeze': self.handle_freeze, 'ThawOutFinished': self.handle_thawout, 'ClientSpawn': self.handle_spawn,
-                  'Flag': self.handle_flag, 'FlagCaptureTime': self.handle_flagcapturetime,
-                  'VotePassed': self.handle_vote_passed, 'VoteFailed': self.handle_vote_failed,
-                  'Callvote': self.handle_callvote, 'ShutdownGame': self.handle_shutdown, 'Assist': self.handle_assist}
+        action, event = self.decoder.decode(string)
+        if action:
+            self.handle_event(action, event)
+
+    def handle_event(self, action, event):
+        """
+        call the handler of a decoded event
 
+        @param action: The name of the event
+        @type  action: String
+        @param event: The typed event record or the text of the event
+        """
         try:
-            action = tmp[0].strip()
-            if action in option:
-                option[action](line)
+            if not self.game.live and action in BACKLOG_SKIP_ACTIONS:
+                # commands and chat of the backlog are outdated
+                return
+            if action in self.event_handlers:
+                self.event_handlers[action](event)
             elif 'Bomb' in action:
-                self.handle_bomb(line)
+                self.handle_bomb(event)
             elif 'Pop' in action:
                 self.handle_bomb_exploded()
         except (IndexError, KeyError):
@@ -720,19 +1060,7 @@ class LogParser(object):
         """
         explode line
         """
-        arr = line.lstrip().lstrip('\\').split('\\')
-        key = True
-        key_val = None
-        values = {}
-        for item in arr:
-            if key:
-                key_val = item
-                key = False
-            else:
-                values[key_val.rstrip()] = item.rstrip()
-                key_val = None
-                key = True
-        return values
+        return self.decoder.explode_line(line)
 
     def handle_shutdown(self, line):
         # reset var
@@ -744,6 +1072,7 @@ class LogParser(object):
         """
         # nextmap vote
         if "g_nextmap" in line:
+            self.game.cache.invalidate_cvar('g_nextmap')
             self.game.next_mapname = line.split("g_nextmap")[-1].strip('"').strip()
             self.game.rcon_say("^3Next Map:^7 %s" % self.game.next_mapname)
             self.allow_nextmap_vote = False
@@ -759,7 +1088,7 @@ class LogParser(object):
         if "g_nextmap" in line: 
             mapvote = line.split("g_nextmap")[-1].strip('"').strip().lower()
             if mapvote not in self.game.get_last_maps() or self.game.next_mapname:
-                self.failed_vote_timer = time.time() + self.failed_vote_delay * 5            
+                self.failed_vote_timer = CLOCK.time() + self.failed_vote_delay * 5            
         elif "cyclemap" in line:
             self.allow_cyclevote = False
 
@@ -769,9 +1098,8 @@ class LogParser(object):
         """
         player_num = int(line[0:2])
         
-        config_file = os.path.join(HOME, 'conf', 'settings.conf')
         config = ConfigParser.ConfigParser()
-        config.read(config_file)
+        config.read(self.config_file)
         disabled_maps = filter(None, config.get('mapcycle', 'disabled_maps').replace(' ', '').split(',')) if config.has_option('mapcycle', 'disabled_maps') else []
             
         if not self.auth_status or self.game.players[player_num].get_authname():
@@ -780,9 +1108,9 @@ class LogParser(object):
                 mapvote = line.split("g_nextmap")[-1].strip('"').strip().lower()
                 if not self.allow_nextmap_vote:
                     msg = "^3Next Map^7 voting is ^1disabled^7 for the rest of this map"
-                elif self.failed_vote_timer > time.time():
+                elif self.failed_vote_timer > CLOCK.time():
                     self.failed_vote_timer += 60
-                    remaining_time = int(math.ceil((self.failed_vote_timer - time.time()) / 60))
+                    remaining_time = int(math.ceil((self.failed_vote_timer - CLOCK.time()) / 60))
                     msg = "^3Next Map^7 voting not available for: ^3 %s min%s" % (remaining_time, "s" if remaining_time > 1 else "" )
                 elif mapvote in self.game.get_last_maps():
                     msg = "^3%s ^7has been played recently" % (mapvote)
@@ -796,9 +1124,9 @@ class LogParser(object):
             elif "cyclemap" in line and self.limit_cyclemap_votes:
                 if not self.allow_cyclevote:
                     msg = "^3Cyclemap^7 voting is ^1disabled^7 for the rest of this map"
-                elif self.failed_cyclemap_timer > time.time():
+                elif self.failed_cyclemap_timer > CLOCK.time():
                     self.failed_cyclemap_timer += 60
-                    remaining_time = int(math.ceil((self.failed_cyclemap_timer - time.time()) / 60))
+                    remaining_time = int(math.ceil((self.failed_cyclemap_timer - CLOCK.time()) / 60))
                     msg = "^7Cyclemap voting is disabled for^3 %s min%s" % (remaining_time, "s" if remaining_time > 1 else "" )
                 else:
                     spam_msg = True
@@ -820,14 +1148,12 @@ class LogParser(object):
         """
         set-up a new game
         """
-        self.ffa_lms_gametype = True if ('g_gametype\\0\\' in line or 'g_gametype\\1\\' in line or 'g_gametype\\9\\' in line or 'g_gametype\\11\\' in line) else False
-        self.ctf_gametype = True if 'g_gametype\\7\\' in line else False
-        self.ts_gametype = True if ('g_gametype\\4\\' in line or 'g_gametype\\5\\' in line) else False
-        self.tdm_gametype = True if 'g_gametype\\3\\' in line else False
-        self.bomb_gametype = True if 'g_gametype\\8\\' in line else False
-        self.freeze_gametype = True if 'g_gametype\\10\\' in line else False
+        values = self.explode_line(line)
+        self.set_gametype(values)
         logger.debug("InitGame: Starting game...")
         self.game.rcon_clear()
+        # the server info of the new map is known from the event
+        self.game.reset_rcon_cache(values)
             
         # reset the player stats
         self.stats_reset()
@@ -846,19 +1172,19 @@ class LogParser(object):
         
         # allow nextmap votes after 45s
         self.allow_nextmap_vote = True
-        self.failed_vote_timer = time.time() + 40
+        self.failed_vote_timer = CLOCK.time() + 40
         
         if self.allow_cyclevote:
-            self.failed_cyclemap_timer = time.time() + 40
+            self.failed_cyclemap_timer = CLOCK.time() + 40
         else:
-            self.failed_cyclemap_timer = time.time() + 950
+            self.failed_cyclemap_timer = CLOCK.time() + 950
             self.allow_cyclevote = True
 
-    def handle_spawn(self, line):
+    def handle_spawn(self, event):
         """
         handle client spawn
         """
-        player_num = int(line)
+        player_num = event.player
         with self.players_lock:
             self.game.players[player_num].set_alive(True)
         
@@ -866,18 +1192,15 @@ class LogParser(object):
         if self.game.players[player_num].get_ip_address() in ['0.0.0.0']:
             self.stats_with_bots = True
             
-    def handle_flagcapturetime(self, line):
+    def handle_flagcapturetime(self, event):
         """
         handle flag capture time
         """
-        tmp = line.split(": ", 1)
-        player_num = int(tmp[0])
-        action = tmp[1]
-        if action.isdigit():
-            cap_time = round(float(action) / 1000, 2)
-            logger.debug("Player %d captured the flag in %s seconds", player_num, cap_time)
-            with self.players_lock:
-                self.game.players[player_num].set_flag_capture_time(cap_time)
+        player_num = event.player
+        cap_time = round(float(event.msec) / 1000, 2)
+        logger.debug("Player %d captured the flag in %s seconds", player_num, cap_time)
+        with self.players_lock:
+            self.game.players[player_num].set_flag_capture_time(cap_time)
 
     def handle_warmup(self, line):
         """
@@ -914,6 +1237,8 @@ class LogParser(object):
         """
         store user score in database if needed and reset the player statistics
         """
+        # send the pending announcements before their statistics are reset
+        self.game.announcer.flush()
         with self.players_lock:
             for player in self.game.players.itervalues():
                 if store_score:
@@ -941,7 +1266,6 @@ class LogParser(object):
         handle player user information, auto-kick known cheater ports or guids
         """
         with self.players_lock:
-            vpn = False
             player_num = int(line[:2].strip())
             line = line[2:].lstrip("\\").lstrip()
             values = self.explode_line(line)
@@ -978,19 +1302,10 @@ class LogParser(object):
                 # kick banned player
                 if player.get_ban_id():
                     self.kick_player_reason(reason="%s ^1banned ^3(ID @%s):^7 %s" % (player.get_name(), player.get_ban_id(), player.get_ban_msg()), player_num=player_num)  
-                # VPN/TOR API
-                elif ip_address not in ['0.0.0.0', '127.0.0.1']: 
-                    with requests_cache.enabled('cache_db'):
-                        try: 
-                            headers = {'X-Key': '=='}
-                            vpncheck = requests.get('http://v2.api.iphub.info/ip/%s' % (ip_address), headers=headers).json()
-                            if vpncheck['block'] == 1:
-                                vpn = True
-                        except:
-                            print("Error with the Proxy detection of [ %s ]...status: %s" % (ip_address, vpncheck))
-                if vpn:
-                    self.kick_player_reason('use of VPN/PROXY is not allowed', player_num=player_num)
-                elif "unnamedplayer" in name.lower():
+                # VPN/TOR API, the lookup runs in the background and kicks the player later
+                elif self.game.live and not self.replay_mode and ip_address not in ['0.0.0.0', '127.0.0.1']: 
+                    WORKER.submit(self.check_vpn, player_num, ip_address)
+                if "unnamedplayer" in name.lower():
                     self.kick_player_reason(reason="name not allowed on this server", player_num=player_num)
                 elif self.show_country_on_connect and player.get_country():
                         self.game.rcon_say("^3%s ^7connected from^3 %s" % (player.get_name(), player.get_country()))
@@ -1019,6 +1334,29 @@ class LogParser(object):
                 if self.last_disconnected_player and self.last_disconnected_player.get_guid() == self.game.players[player_num].get_guid():
                     self.last_disconnected_player = None
             
+    def check_vpn(self, player_num, ip_address):
+        """
+        kick player connected by VPN/TOR, runs in the background worker
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        @param ip_address: The IP address of the player
+        @type  ip_address: String
+        """
+        vpncheck = None
+        try:
+            headers = {'X-Key': '=='}
+            vpncheck = WORKER.session.get('http://v2.api.iphub.info/ip/%s' % (ip_address), headers=headers).json()
+            vpn = vpncheck['block'] == 1
+        except Exception:
+            logger.warning("Error with the Proxy detection of [ %s ]...status: %s", ip_address, vpncheck)
+            return
+        if vpn:
+            with self.players_lock:
+                # the player may have left meanwhile
+                if player_num in self.game.players and self.game.players[player_num].get_ip_address() == ip_address:
+                    self.kick_player_reason('use of VPN/PROXY is not allowed', player_num=player_num)
+
     def kick_player_reason(self, reason, player_num):
         """
         kick player for specific reason
@@ -1066,12 +1404,12 @@ class LogParser(object):
                 self.game.rcon_tell(player_num, "^7You are forced to: ^3%s" % team_lock)
             logger.debug("ClientUserinfoChanged: Player %d %s joined team %s", player_num, name, Player.teams[team_num])
 
-    def handle_begin(self, line):
+    def handle_begin(self, event):
         """
         handle player entering game
         """
         with self.players_lock:
-            player_num = int(line)
+            player_num = event.player
             player = self.game.players[player_num]
             player_name = player.get_name()
             player_auth = player.get_authname()
@@ -1089,131 +1427,98 @@ class LogParser(object):
 
             logger.debug("ClientBegin: Player %d %s has entered the game", player_num, player_name)
 
-    def handle_disconnect(self, line):
+    def handle_disconnect(self, event):
         """
         handle player disconnect
         """
         with self.players_lock:
-            player_num = int(line)
+            player_num = event.player
             player = self.game.players[player_num]
-            if not self.stats_with_bots:
+            # statistics of a replayed disconnect are already stored
+            if not self.stats_with_bots and not self.replaying:
                 player.save_info()
             player.reset()
             self.last_disconnected_player = player
             del self.game.players[player_num]
+            self.game.player_index.remove(player_num)
+            self.game.rcon_drop_player(player_num)
             for player in self.game.players.itervalues():
                 player.clear_tk(player_num)
                 player.clear_grudged_player(player_num)
             logger.debug("ClientDisconnect: Player %d %s has left the game", player_num, player.get_name())
 
-    def handle_hit(self, line):
+    def handle_hit(self, event):
         """
         handle all kind of hits
         """
         with self.players_lock:
-            info = line.split(":", 1)[0].split()
-            hitter_id = int(info[1])
-            victim_id = int(info[0])
+            hitter_id = event.hitter
+            victim_id = event.victim
             hitter = self.game.players[hitter_id]
             victim = self.game.players[victim_id]
             hitter_name = hitter.get_name()
             victim_name = victim.get_name()
-            hitpoint = int(info[2])
-            hit_item = int(info[3])
-            # increase summary of all hits
-            hitter.set_all_hits()
-
-            zones = {'TORSO': 'body', 'VEST': 'body', 'KEVLAR': 'body', 'BUTT': 'body', 'GROIN': 'body',
-                     'LEGS': 'legs', 'LEFT_UPPER_LEG': 'legs', 'RIGHT_UPPER_LEG': 'legs',
-                     'LEFT_LOWER_LEG': 'legs', 'RIGHT_LOWER_LEG': 'legs', 'LEFT_FOOT': 'legs', 'RIGHT_FOOT': 'legs',
-                     'ARMS': 'arms', 'LEFT_ARM': 'arms', 'RIGHT_ARM': 'arms'}
-            
-            if hitpoint in self.hit_points:
-                if self.hit_points[hitpoint] == 'HEAD' or self.hit_points[hitpoint] == 'HELMET':
-                    hitter.headshot()
+            # increase summary of all hits and the hit zones
+            hit_point = self.stats.count_hit(hitter, event.zone)
+            if hit_point is not None:
+                if hit_point == 'HEAD' or hit_point == 'HELMET':
                     hitter_hs_count = hitter.get_headshots()
-                    hs_msg = {10: 'watch out!',
-                              15: 'awesome!',
-                              20: 'unbelievable!',
-                              30: '^1MANIAC!',
-                              40: '^8AIMBOT?',
-                              50: 'stop that'}
-                    if self.spam_headshot_hits_msg and hitter_hs_count in hs_msg:
-                        self.game.rcon_bigtext("^3%s: ^8%d ^7HeadShots, %s" % (hitter_name, hitter_hs_count, hs_msg[hitter_hs_count]))
-                    hs_plural = "headshots" if hitter_hs_count > 1 else "headshot"
+                    if self.spam_headshot_hits_msg and hitter_hs_count in HS_MSG:
+                        self.game.rcon_bigtext("^3%s: ^8%d ^7HeadShots, %s" % (hitter_name, hitter_hs_count, HS_MSG[hitter_hs_count]))
                     percentage = int(round(float(hitter_hs_count) / float(hitter.get_all_hits()), 2) * 100)
-                    self.game.send_rcon("^3%s^7 has made ^3%d ^7%s (%d percent)" % (hitter_name, hitter_hs_count, hs_plural, percentage ))
-                elif self.hit_points[hitpoint] in zones:
-                    hitter.set_hitzones(zones[self.hit_points[hitpoint]])
-                logger.debug("Player %d %s hit %d %s in the %s with %s", hitter_id, hitter_name, victim_id, victim_name, self.hit_points[hitpoint], self.hit_item[hit_item])
+                    self.game.announcer.add_headshots(hitter, hitter_hs_count, percentage)
+                logger.debug("Player %d %s hit %d %s in the %s with %s", hitter_id, hitter_name, victim_id, victim_name, hit_point, self.stats.hit_item[event.item])
 
-    def handle_kill(self, line):
+    def handle_kill(self, event):
         """
         handle kills
         """
         with self.players_lock:
-            parts = line.split(":", 1)
-            info = parts[0].split()
-            k_name = parts[1].split()[0]
-            killer_id = int(info[0])
-            victim_id = int(info[1])
-            death_cause = self.death_cause[int(info[2])]
+            killer_id = event.killer
+            victim_id = event.victim
             victim = self.game.players[victim_id]
             victim.set_alive(False)
-
-            if k_name == "<non-client>":
-                # killed by World
-                killer_id = BOT_PLAYER_NUM
             killer = self.game.players[killer_id]
 
             killer_name = killer.get_name()
             victim_name = victim.get_name()
-            tk_event = False
-
-            # teamkill event - disabled for FFA, LMS, Jump, for all other game modes team kills are counted and punished
-            if not self.ffa_lms_gametype:
-                if victim.get_team() == killer.get_team() and victim.get_team() != 3 and victim_id != killer_id and death_cause != "UT_MOD_BOMBED":
-                    tk_event = True
-                    # increase team kill counter for killer and kick for too many team kills
-                    killer.team_kill()
-                    # increase team death counter for victim
-                    victim.team_death()
-                    # Regular and higher will not get punished
-                    if killer.get_admin_role() < 2 and self.tk_autokick and killer.get_ip_address() != '0.0.0.0':
-                        # list of players of TK victim
-                        killer.add_tk_victims(victim_id)
-                        # list of players who killed victim
-                        if killer_id not in victim.get_grudged_player():
-                            victim.add_killed_me(killer_id)
-                            self.game.rcon_tell(victim_id, "^7Type ^3!fp ^7to forgive ^3%s" % killer_name)
-                        self.game.rcon_tell(killer_id, "^7Do not attack teammates, you ^1killed ^7%s" % victim_name)
-                        if len(killer.get_tk_victim_names()) > 4:
+            # killing spree of the victim ended by this kill
+            victim_killing_streak = victim.get_killing_streak()
+
+            # count kill, death, team kill and suicide - team kills are disabled for FFA, LMS, Jump
+            death_cause, tk_event, suicide = self.stats.count_kill(killer, victim, event.mod, not self.ffa_lms_gametype)
+
+            # teamkill event - team kills are punished
+            if tk_event:
+                # Regular and higher will not get punished
+                if killer.get_admin_role() < 2 and self.tk_autokick and killer.get_ip_address() != '0.0.0.0':
+                    # list of players of TK victim
+                    killer.add_tk_victims(victim_id)
+                    # list of players who killed victim
+                    if killer_id not in victim.get_grudged_player():
+                        victim.add_killed_me(killer_id)
+                        self.game.rcon_tell(victim_id, "^7Type ^3!fp ^7to forgive ^3%s" % killer_name)
+                    self.game.rcon_tell(killer_id, "^7Do not attack teammates, you ^1killed ^7%s" % victim_name)
+                    if len(killer.get_tk_victim_names()) > 4:
+                        if not self.replaying:
                             killer.ban(duration=1800, reason='team killing over limit', admin='bot')
-                            self.game.rcon_say("^3%s ^7banned for ^130 minutes ^7for team killing over limit" % killer_name)
-                            self.game.kick_player(killer_id, reason='team killing over limit')
-                        else:
-                            killer.add_warning('stop team killing')
-                            self.game.rcon_tell(killer_id, "^1WARNING ^7[^3%d^7]: ^7For team killing you will get kicked" % killer.get_warning(), False)
-                            if killer.get_warning() == 4 and killer.get_admin_role() < 40:
-                                self.game.rcon_say("^1ALERT: ^2%s ^7auto-kick from warnings if not cleared" % killer_name)
-
-            suicide_reason = ['UT_MOD_SUICIDE', 'MOD_FALLING', 'MOD_WATER', 'MOD_LAVA', 'MOD_TRIGGER_HURT',
-                              'UT_MOD_SPLODED', 'UT_MOD_SLAPPED', 'UT_MOD_SMITED']
-            suicide_weapon = ['UT_MOD_HEGRENADE', 'UT_MOD_HK69', 'UT_MOD_NUKED', 'UT_MOD_BOMBED']
-            # suicide counter
-            if death_cause in suicide_reason or (killer_id == victim_id and death_cause in suicide_weapon):
-                victim.suicide()
-                victim.die()
-                logger.debug("Player %d %s committed suicide with %s", victim_id, victim_name, death_cause)
-            # kill counter
-            elif not tk_event and int(info[2]) != 10:  # 10: MOD_CHANGE_TEAM
-                killer.kill()
+                        self.game.rcon_say("^3%s ^7banned for ^130 minutes ^7for team killing over limit" % killer_name)
+                        self.game.kick_player(killer_id, reason='team killing over limit')
+                    else:
+                        killer.add_warning('stop team killing')
+                        self.game.rcon_tell(killer_id, "^1WARNING ^7[^3%d^7]: ^7For team killing you will get kicked" % killer.get_warning(), False)
+                        if killer.get_warning() == 4 and killer.get_admin_role() < 40:
+                            self.game.rcon_say("^1ALERT: ^2%s ^7auto-kick from warnings if not cleared" % killer_name)
 
+            if suicide:
+                victim_killing_streak = 0
+                logger.debug("Player %d %s committed suicide with %s", victim_id, victim_name, death_cause)
+            elif not tk_event and event.mod != 10:  # 10: MOD_CHANGE_TEAM
                 # spawn killing - warn/kick or instant kill
                 if (self.spawnkill_autokick or self.kill_spawnkiller) and killer.get_admin_role() < 40:
                     # Spawn Protection time between players deaths in seconds to issue a warning
                     warn_time = 6
-                    if victim.get_respawn_time() + warn_time > time.time():
+                    if victim.get_respawn_time() + warn_time > CLOCK.time():
                         if killer.get_ip_address() != '0.0.0.0':
                             if self.kill_spawnkiller:
                                 self.game.send_rcon("smite %d" % killer_id)
@@ -1225,7 +1530,7 @@ class LogParser(object):
                             self.game.send_rcon("smite %d" % killer_id)
 
             # first kill message
-            if victim_name != killer_name and killer_name.lower() != 'world' and int(info[2]) != 10 and not tk_event:
+            if victim_name != killer_name and killer_name.lower() != 'world' and event.mod != 10 and not tk_event:
                 if self.firstblood:
                     self.game.rcon_bigtext("^1FIRST BLOOD: ^7%s killed by ^3%s" % (victim_name, killer_name))
                     self.firstblood = False
@@ -1240,54 +1545,35 @@ class LogParser(object):
                     self.game.rcon_bigtext("^3%s: ^7first knife kill" % killer_name)
                     self.firstknifekill = False
 
-            # HE grenade kill
-            if death_cause == 'UT_MOD_HEGRENADE':
-                killer.set_he_kill()
-                he_kill_count = killer.get_he_kills()
-
-            # Knife kill
-            if "UT_MOD_KNIFE" in death_cause or "UT_MOD_KNIFE_THROWN" in death_cause:
-                killer.set_knife_kill()
-                knife_kill_count = killer.get_knife_kills()
-
             # killing spree counter
             killer_killing_streak = killer.get_killing_streak()
-            kill_streak_msg = {6: "IS ON ^8FIRE!^7",
-                               9: "IS ON A ^1RAMPAGE!^7 ",
-                               12: "IS ^5UNSTOPPABLE!^7",
-                               15: "IS ^2DOMINATING!^7",
-                               20: "IS ^9G O D L I K E !^7",
-                               25: "IS ^6L E G E N D A R Y !^7"}
-            if killer_killing_streak in kill_streak_msg and killer_id != BOT_PLAYER_NUM and killer_killing_streak < 20:
-                self.game.rcon_say("^3%s ^7%s" % (killer_name, kill_streak_msg[killer_killing_streak]))
-            elif killer_killing_streak in kill_streak_msg and killer_id != BOT_PLAYER_NUM and killer_killing_streak >= 20:
-                self.game.rcon_say("^3%s ^7%s" % (killer_name, kill_streak_msg[killer_killing_streak]))
-                self.game.rcon_bigtext("^3%s ^7%s" % (killer_name, kill_streak_msg[killer_killing_streak]))
-                self.game.rcon_bigtext("^3%s ^7%s" % (killer_name, kill_streak_msg[killer_killing_streak]))
-
-            if victim.get_killing_streak() >= 25 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
-                self.game.rcon_say("^3%s's ^6L E G E N D A R Y^7 (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim.get_killing_streak(), killer_name))
-            elif victim.get_killing_streak() >= 20 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
-                self.game.rcon_say("^3%s's ^9G O D L I K E^7 (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim.get_killing_streak(), killer_name))
-            elif victim.get_killing_streak() >= 15 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
-                self.game.rcon_say("^3%s's ^7Spree (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim.get_killing_streak(), killer_name))
-            elif victim.get_killing_streak() >= 12 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
-                self.game.rcon_say("^3%s's ^7Spree (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim.get_killing_streak(), killer_name))
-            elif victim.get_killing_streak() >= 9 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
-                self.game.rcon_say("^3%s's ^7Spree (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim.get_killing_streak(), killer_name))
-            elif victim.get_killing_streak() >= 6 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
-                self.game.rcon_say("^3%s's ^7Spree (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim.get_killing_streak(), killer_name))
-
-            # death counter
-            victim.die()
+            if killer_killing_streak in KILL_STREAK_MSG and killer_id != BOT_PLAYER_NUM and killer_killing_streak < 20:
+                self.game.rcon_say("^3%s ^7%s" % (killer_name, KILL_STREAK_MSG[killer_killing_streak]))
+            elif killer_killing_streak in KILL_STREAK_MSG and killer_id != BOT_PLAYER_NUM and killer_killing_streak >= 20:
+                self.game.rcon_say("^3%s ^7%s" % (killer_name, KILL_STREAK_MSG[killer_killing_streak]))
+                self.game.rcon_bigtext("^3%s ^7%s" % (killer_name, KILL_STREAK_MSG[killer_killing_streak]))
+                self.game.rcon_bigtext("^3%s ^7%s" % (killer_name, KILL_STREAK_MSG[killer_killing_streak]))
+
+            if victim_killing_streak >= 25 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
+                self.game.rcon_say("^3%s's ^6L E G E N D A R Y^7 (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim_killing_streak, killer_name))
+            elif victim_killing_streak >= 20 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
+                self.game.rcon_say("^3%s's ^9G O D L I K E^7 (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim_killing_streak, killer_name))
+            elif victim_killing_streak >= 15 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
+                self.game.rcon_say("^3%s's ^7Spree (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim_killing_streak, killer_name))
+            elif victim_killing_streak >= 12 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
+                self.game.rcon_say("^3%s's ^7Spree (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim_killing_streak, killer_name))
+            elif victim_killing_streak >= 9 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
+                self.game.rcon_say("^3%s's ^7Spree (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim_killing_streak, killer_name))
+            elif victim_killing_streak >= 6 and killer_name != victim_name and killer_id != BOT_PLAYER_NUM:
+                self.game.rcon_say("^3%s's ^7Spree (^3%s ^7kills) was ended by ^3%s!" % (victim_name, victim_killing_streak, killer_name))
+
             if self.show_hit_stats_msg:
-                self.game.rcon_tell(victim_id, "^1HIT Stats: ^7HS:^3%s ^7BODY:^3%s ^7ARMS:^3%s ^7LEGS:^3%s ^7TOTAL:^3%s" % (victim.get_headshots(), victim.get_hitzones('body'), victim.get_hitzones('arms'), victim.get_hitzones('legs'), victim.get_all_hits()))
+                self.game.announcer.add_hit_stats(victim)
             logger.debug("Player %d %s killed %d %s with %s", killer_id, killer_name, victim_id, victim_name, death_cause)
 
-    def handle_assist(self, line):
+    def handle_assist(self, event):
     
-        info = [int(i) for i in line.split() if i.isdigit()]
-        assist_id = info[0]
+        assist_id = event.player
         player = self.game.players[assist_id]
         player.assist()
         
@@ -1295,23 +1581,9 @@ class LogParser(object):
         """
         return True and instance of player or False and message text
         """
-        victim = None
-        name_list = []
-        append = name_list.append
-        for player in self.game.players.itervalues():
-            player_num = player.get_player_num()
-            if player_num == BOT_PLAYER_NUM:
-                continue
-            player_name = player.get_name()
-            player_authname = player.get_authname()
-            player_id = "@%d" % player.get_player_id()
-            if user.upper() == player_name.upper() or user == str(player_num) or user == player_id or user.lower() == player_authname:
-                victim = player
-                name_list = ["^3%s^7 [^3%d^7]" % (player_name, player_num)]
-                break
-            elif user.upper() in player_name.upper():
-                victim = player
-                append("^3%s^7 [^3%d^7]" % (player_name, player_num))
+        victim = self.game.player_index.find_exact(user)
+        matches = [victim] if victim else self.game.player_index.find_partial(user)
+        name_list = ["^3%s^7 [^3%d^7]" % (player.get_name(), player.get_player_num()) for player in matches]
         if not name_list:
             if user.startswith('@'):
                 return self.offline_player(user)
@@ -1320,7 +1592,7 @@ class LogParser(object):
         elif len(name_list) > 1:
             return False, None, "^7Players matching %s: ^3%s" % (user, ', '.join(name_list))
         else:
-            return True, victim, "^7Found player matching %s: ^3%s" % (user, name_list[-1])
+            return True, matches[0], "^7Found player matching %s: ^3%s" % (user, name_list[0])
 
     def offline_player(self, user_id):
         """
@@ -1402,15 +1674,18 @@ class LogParser(object):
 
     def handle_say(self, line):
         """
-        handle say commands
+        handle say commands, the command is looked up in the command table
         """
-        bad_words = ['fuck', 'ass', 'bastard', 'retard', 'slut', 'bitch', 'whore', 'cunt', 'pussy', 'dick', 'sucker',
-                     'fick', 'arsch', 'nutte', 'schlampe', 'hure', 'fotze', 'penis', 'wichser', 'nazi', 'hitler',
-                     'putain', 'merde', 'chienne',
-                     'kurwa', 'suka', 'dupa', 'dupek', 'puta']
+        line = line.strip()
+        # ordinary chat only passes the moderation filters, without the players lock
+        number, _, text = line.partition(": ")
+        text = text.lstrip()
+        if text and text[0] not in COMMAND_PREFIXES:
+            if self.bad_words_autokick:
+                self.check_bad_words(number.split(" ", 1)[0], text)
+            return
 
         with self.players_lock:
-            line = line.strip()
             try:
                 divider = line.split(": ", 1)
                 number = divider[0].split(" ", 1)[0]
@@ -1420,1598 +1695,1887 @@ class LogParser(object):
             except IndexError:
                 sar = {'player_num': BOT_PLAYER_NUM, 'command': ''}
 
-            if sar['command'] == '!mapstats':
-                self.game.rcon_tell(sar['player_num'], "^3%d ^7kills - ^3%d ^7deaths" % (self.game.players[sar['player_num']].get_kills(), self.game.players[sar['player_num']].get_deaths()))
-                self.game.rcon_tell(sar['player_num'], "^3%d ^7kills in a row - ^3%d ^7teamkills" % (self.game.players[sar['player_num']].get_killing_streak(), self.game.players[sar['player_num']].get_team_kill_count()))
-                self.game.rcon_tell(sar['player_num'], "^3%d ^7total hits - ^3%d ^7headshots" % (self.game.players[sar['player_num']].get_all_hits(), self.game.players[sar['player_num']].get_headshots()))
-                self.game.rcon_tell(sar['player_num'], "^3%d ^7HE grenade kills" % self.game.players[sar['player_num']].get_he_kills())
-                if self.ctf_gametype:
-                    if self.urt_modversion > 41:
-                        self.game.rcon_tell(sar['player_num'], "^7flags captured:^3%d ^7- flags returned:^3%d ^7- fastest cap:^3%s ^7sec" % (self.game.players[sar['player_num']].get_flags_captured(), self.game.players[sar['player_num']].get_flags_returned(), self.game.players[sar['player_num']].get_flag_capture_time()))
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^7flags captured:^3%d ^7- flags returned:^3%d" % (self.game.players[sar['player_num']].get_flags_captured(), self.game.players[sar['player_num']].get_flags_returned()))
-                elif self.bomb_gametype:
-                    self.game.rcon_tell(sar['player_num'], "^7planted: ^2%d ^7- defused: ^2%d" % (self.game.players[sar['player_num']].get_planted_bomb(), self.game.players[sar['player_num']].get_defused_bomb()))
-                    self.game.rcon_tell(sar['player_num'], "^7bomb carrier killed: ^2%d ^7- enemies bombed: ^2%d" % (self.game.players[sar['player_num']].get_bomb_carrier_kills(), self.game.players[sar['player_num']].get_kills_with_bomb()))
-                elif self.freeze_gametype:
-                    self.game.rcon_tell(sar['player_num'], "^7freeze: ^2%d ^7- thaw out: ^2%d" % (self.game.players[sar['player_num']].get_freeze(), self.game.players[sar['player_num']].get_thawout()))
-
-            elif sar['command'] == '!help' or sar['command'] == '!h':
-                if line.split(sar['command'])[1]:
-                    cmd = line.split(sar['command'])[1].strip()
-                    if cmd in COMMANDS:
-                        if self.game.players[sar['player_num']].get_admin_role() >= COMMANDS[cmd]['level']:
-                            self.game.rcon_tell(sar['player_num'], "%s ^3- %s" % (COMMANDS[cmd]['syntax'], COMMANDS[cmd]['desc']))
-                    elif cmd in self.shortcut_cmd:
-                        if self.game.players[sar['player_num']].get_admin_role() >= COMMANDS[self.shortcut_cmd[cmd]]['level']:
-                            self.game.rcon_tell(sar['player_num'], "%s ^3- %s" % (COMMANDS[self.shortcut_cmd[cmd]]['syntax'], COMMANDS[self.shortcut_cmd[cmd]]['desc']))
-                    else:
-                        if cmd not in self.superadmin_cmds:
-                            self.game.rcon_tell(sar['player_num'], "^7Unknown command ^3%s" % cmd)
-                else:
-                    if self.game.players[sar['player_num']].get_admin_role() < 20:
-                        self.game.rcon_tell(sar['player_num'], "^7Available commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.user_cmds)))
-                    # help for mods - additional commands
-                    elif self.game.players[sar['player_num']].get_admin_role() == 20:
-                        self.game.rcon_tell(sar['player_num'], "^7Moderator commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.mod_cmds)))
-                    # help for admins - additional commands
-                    elif self.game.players[sar['player_num']].get_admin_role() == 40:
-                        self.game.rcon_tell(sar['player_num'], "^7Admin commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.admin_cmds)))
-                    elif self.game.players[sar['player_num']].get_admin_role() == 60:
-                        self.game.rcon_tell(sar['player_num'], "^7Full Admin commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.fulladmin_cmds)))
-                    elif self.game.players[sar['player_num']].get_admin_role() == 80:
-                        self.game.rcon_tell(sar['player_num'], "^7Senior Admin commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.senioradmin_cmds)))
-                    elif self.game.players[sar['player_num']].get_admin_role() >= 90:
-                        self.game.rcon_tell(sar['player_num'], "^7Super Admin commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.superadmin_cmds)))
-
-## player commands
-            # register - register yourself as a basic user
-            elif sar['command'] == '!register':
-                if not self.game.players[sar['player_num']].get_registered_user():
-                    self.game.players[sar['player_num']].register_user_db(role=1)
-                    self.game.rcon_tell(sar['player_num'], "^3%s ^7put in group User" % self.game.players[sar['player_num']].get_name())
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^3%s ^7is already in a higher level group" % self.game.players[sar['player_num']].get_name())
-
-            # regtest - display current user status
-            elif sar['command'] == '!regtest':
-                if self.game.players[sar['player_num']].get_registered_user():
-                    self.game.rcon_tell(sar['player_num'], "^7%s [^3@%s^7] is registered since ^3%s" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_player_id(), self.game.players[sar['player_num']].get_first_seen_date()))
+            command = self.command_table.get(sar['command'])
+            if command is None and sar['command'].startswith('!!'):
+                command = self.command_table['!!']
+            if command and (command['modversion'] is None or self.urt_modversion >= command['modversion']) and (command['level'] is None or self.game.players[sar['player_num']].get_admin_role() >= command['level']):
+                start_time = time.time()
+                command['handler'](sar, line)
+                elapsed = time.time() - start_time
+                command['calls'] += 1
+                command['time'] += elapsed
+                if elapsed > command['max_time']:
+                    command['max_time'] = elapsed
+## unknown command
+            elif sar['command'].startswith('!') and len(sar['command']) > 1 and self.game.players[sar['player_num']].get_admin_role() > 20:
+                if sar['command'].lstrip('!') in self.superadmin_cmds:
+                    self.game.rcon_tell(sar['player_num'], "^7Insufficient privileges to use command ^3%s" % sar['command'])
                 else:
-                    self.game.rcon_tell(sar['player_num'], "^7You are not a registered user.")
+                    self.game.rcon_tell(sar['player_num'], "^7Unknown command ^3%s" % sar['command'])
+## bad words
+            elif self.bad_words_autokick:
+                self.check_bad_words(sar['player_num'], text)
 
-            # hs - display headshot counter
-            elif sar['command'] == '!hs':
-                hs_count = self.game.players[sar['player_num']].get_headshots()
-                if hs_count > 0:
-                    self.game.rcon_tell(sar['player_num'], "^7You made ^3%d ^7headshot%s" % (hs_count, 's' if hs_count > 1 else ''))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7You made no headshot")
+    def load_bad_words(self, filename):
+        """
+        return the words of the bad words file, or the built-in list if the file does not exist
 
-            # spree - display kill streak counter
-            elif sar['command'] == '!spree':
-                spree_count = self.game.players[sar['player_num']].get_killing_streak()
-                if spree_count > 0:
-                    self.game.rcon_tell(sar['player_num'], "^7You have ^3%d ^7kill%s in a row" % (spree_count, 's' if spree_count > 1 else ''))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7You are currently not having a killing spree")
+        @param filename: The bad words file, one word per line, lines starting with # are comments
+        @type  filename: String
+        """
+        if not os.path.isfile(filename):
+            return BAD_WORDS
+        with open(filename, 'r') as filehandle:
+            words = [word.strip() for word in filehandle if word.strip() and not word.strip().startswith('#')]
+        logger.info("Load bad words        : %d words", len(words))
+        return words
 
-            # hestats - display HE grenade kill counter
-            elif sar['command'] == '!hestats':
-                he_kill_count = self.game.players[sar['player_num']].get_he_kills()
-                if he_kill_count > 0:
-                    self.game.rcon_tell(sar['player_num'], "^7You made ^3%d ^7HE grenade kill%s" % (he_kill_count, 's' if he_kill_count > 1 else ''))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7You made no HE grenade kill")
+    def check_bad_words(self, player_num, text):
+        """
+        warn and finally kick players using bad language
 
-            # knife - display knife kill counter
-            elif sar['command'] == '!knife':
-                knife_kill_count = self.game.players[sar['player_num']].get_knife_kills()
-                if knife_kill_count > 0:
-                    self.game.rcon_tell(sar['player_num'], "^7You made ^3%d ^7knife kill%s" % (knife_kill_count, 's' if knife_kill_count > 1 else ''))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7You made no knife kill")
+        @param player_num: The player number of the chatting player
+        @type  player_num: String or Integer
+        @param text: The chat message
+        @type  text: String
+        """
+        if self.bad_words.search(text) is None:
+            return
+        with self.players_lock:
+            victim = self.game.players.get(int(player_num))
+            if victim and victim.get_admin_role() < 40:
+                victim.add_warning('bad language')
+                self.kick_high_warns(victim, 'bad language', 'Behave, stop using bad language')
 
-            # hits - display hit stats
-            elif sar['command'] == '!hits':
-                self.game.rcon_tell(sar['player_num'], "^1HIT Stats: ^7HS:^3%s ^7BODY:^3%s ^7ARMS:^3%s ^7LEGS:^3%s ^7TOTAL:^3%s" % (self.game.players[sar['player_num']].get_headshots(), self.game.players[sar['player_num']].get_hitzones('body'), self.game.players[sar['player_num']].get_hitzones('arms'), self.game.players[sar['player_num']].get_hitzones('legs'), self.game.players[sar['player_num']].get_all_hits()))
+    def cmd_mapstats(self, sar, line):
+        """
+        display your statistics of the current map
+        """
+        self.game.rcon_tell(sar['player_num'], "^3%d ^7kills - ^3%d ^7deaths" % (self.game.players[sar['player_num']].get_kills(), self.game.players[sar['player_num']].get_deaths()))
+        self.game.rcon_tell(sar['player_num'], "^3%d ^7kills in a row - ^3%d ^7teamkills" % (self.game.players[sar['player_num']].get_killing_streak(), self.game.players[sar['player_num']].get_team_kill_count()))
+        self.game.rcon_tell(sar['player_num'], "^3%d ^7total hits - ^3%d ^7headshots" % (self.game.players[sar['player_num']].get_all_hits(), self.game.players[sar['player_num']].get_headshots()))
+        self.game.rcon_tell(sar['player_num'], "^3%d ^7HE grenade kills" % self.game.players[sar['player_num']].get_he_kills())
+        if self.ctf_gametype:
+            if self.urt_modversion > 41:
+                self.game.rcon_tell(sar['player_num'], "^7flags captured:^3%d ^7- flags returned:^3%d ^7- fastest cap:^3%s ^7sec" % (self.game.players[sar['player_num']].get_flags_captured(), self.game.players[sar['player_num']].get_flags_returned(), self.game.players[sar['player_num']].get_flag_capture_time()))
+            else:
+                self.game.rcon_tell(sar['player_num'], "^7flags captured:^3%d ^7- flags returned:^3%d" % (self.game.players[sar['player_num']].get_flags_captured(), self.game.players[sar['player_num']].get_flags_returned()))
+        elif self.bomb_gametype:
+            self.game.rcon_tell(sar['player_num'], "^7planted: ^2%d ^7- defused: ^2%d" % (self.game.players[sar['player_num']].get_planted_bomb(), self.game.players[sar['player_num']].get_defused_bomb()))
+            self.game.rcon_tell(sar['player_num'], "^7bomb carrier killed: ^2%d ^7- enemies bombed: ^2%d" % (self.game.players[sar['player_num']].get_bomb_carrier_kills(), self.game.players[sar['player_num']].get_kills_with_bomb()))
+        elif self.freeze_gametype:
+            self.game.rcon_tell(sar['player_num'], "^7freeze: ^2%d ^7- thaw out: ^2%d" % (self.game.players[sar['player_num']].get_freeze(), self.game.players[sar['player_num']].get_thawout()))
 
-            # bombstats - display bomb statistics
-            elif sar['command'] == '!bombstats':
-                if self.bomb_gametype:
-                    self.game.rcon_tell(sar['player_num'], "^7planted: ^2%d ^7- defused: ^2%d" % (self.game.players[sar['player_num']].get_planted_bomb(), self.game.players[sar['player_num']].get_defused_bomb()))
-                    self.game.rcon_tell(sar['player_num'], "^7bomb carrier killed: ^2%d ^7- enemies bombed: ^2%d" % (self.game.players[sar['player_num']].get_bomb_carrier_kills(), self.game.players[sar['player_num']].get_kills_with_bomb()))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7You are not playing Bomb")
+    def cmd_help(self, sar, line):
+        """
+        display all available commands
+        """
+        if line.split(sar['command'])[1]:
+            cmd = line.split(sar['command'])[1].strip()
+            if cmd in COMMANDS:
+                if self.game.players[sar['player_num']].get_admin_role() >= COMMANDS[cmd]['level']:
+                    self.game.rcon_tell(sar['player_num'], "%s ^3- %s" % (COMMANDS[cmd]['syntax'], COMMANDS[cmd]['desc']))
+            elif cmd in self.shortcut_cmd:
+                if self.game.players[sar['player_num']].get_admin_role() >= COMMANDS[self.shortcut_cmd[cmd]]['level']:
+                    self.game.rcon_tell(sar['player_num'], "%s ^3- %s" % (COMMANDS[self.shortcut_cmd[cmd]]['syntax'], COMMANDS[self.shortcut_cmd[cmd]]['desc']))
+            else:
+                if cmd not in self.superadmin_cmds:
+                    self.game.rcon_tell(sar['player_num'], "^7Unknown command ^3%s" % cmd)
+        else:
+            self.game.rcon_tell_lines(sar['player_num'], self.get_help_lines(self.game.players[sar['player_num']].get_admin_role()))
+
+    def get_help_lines(self, role):
+        """
+        return the wrapped !help lines of an admin role, the lines are cached until the game type changes
+
+        @param role: The admin role
+        @type  role: Integer
+        """
+        if role not in self.help_lines:
+            if role < 20:
+                msg = "^7Available commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.user_cmds))
+            # help for mods - additional commands
+            elif role == 20:
+                msg = "^7Moderator commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.mod_cmds))
+            # help for admins - additional commands
+            elif role == 40:
+                msg = "^7Admin commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.admin_cmds))
+            elif role == 60:
+                msg = "^7Full Admin commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.fulladmin_cmds))
+            elif role == 80:
+                msg = "^7Senior Admin commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.senioradmin_cmds))
+            elif role >= 90:
+                msg = "^7Super Admin commands: ^3%s" % ', ^3'.join(self.clean_cmd_list(self.superadmin_cmds))
+            else:
+                msg = ''
+            self.help_lines[role] = textwrap.wrap(msg, 128)
+        return self.help_lines[role]
 
-            # ctfstats - display ctf statistics
-            elif sar['command'] == '!ctfstats':
-                if self.ctf_gametype:
-                    if self.urt_modversion > 41:
-                        self.game.rcon_tell(sar['player_num'], "^7flags captured:^3%d ^7- flags returned:^3%d ^7- fastest cap:^3%s^7sec" % (self.game.players[sar['player_num']].get_flags_captured(), self.game.players[sar['player_num']].get_flags_returned(), self.game.players[sar['player_num']].get_flag_capture_time()))
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^7flags captured:^3%d ^7- flags returned:^3%d" % (self.game.players[sar['player_num']].get_flags_captured(), self.game.players[sar['player_num']].get_flags_returned()))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7You are not playing Capture the Flag")
+    def cmd_register(self, sar, line):
+        """
+        register yourself as a basic user
+        """
+        if not self.game.players[sar['player_num']].get_registered_user():
+            self.game.players[sar['player_num']].register_user_db(role=1)
+            self.game.rcon_tell(sar['player_num'], "^3%s ^7put in group User" % self.game.players[sar['player_num']].get_name())
+        else:
+            self.game.rcon_tell(sar['player_num'], "^3%s ^7is already in a higher level group" % self.game.players[sar['player_num']].get_name())
 
-            # freezestats - display freeze tag statistics
-            elif sar['command'] == '!freezestats':
-                if self.freeze_gametype:
-                    self.game.rcon_tell(sar['player_num'], "^7freeze: ^2%d ^7- thaw out: ^2%d" % (self.game.players[sar['player_num']].get_freeze(), self.game.players[sar['player_num']].get_thawout()))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7You are not playing Freeze Tag")
+    def cmd_regtest(self, sar, line):
+        """
+        display current user status
+        """
+        if self.game.players[sar['player_num']].get_registered_user():
+            self.game.rcon_tell(sar['player_num'], "^7%s [^3@%s^7] is registered since ^3%s" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_player_id(), self.game.players[sar['player_num']].get_first_seen_date()))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You are not a registered user.")
 
-            # time - display the servers current time
-            elif sar['command'] == '!time' or sar['command'] == '@time':
-                msg = "^7%s" % time.strftime("%H:%M", time.localtime(time.time()))
-                self.tell_say_message(sar, msg)
- 
-            # discord - display the discord invite link
-            elif sar['command'] == '!discord' or sar['command'] == '@discord':
-                msg = "^3Discord: ^7%s" % (self.discord_link)
-                self.tell_say_message(sar, msg)
-                
-            # votes - Display time remaining before another vote can be called
-            elif sar['command'] == '!votes' or sar['command'] == '@votes':
-                if not self.auth_status or self.game.players[sar['player_num']].get_authname():
-                    if not self.allow_nextmap_vote:
-                        msg = "^3Next Map ^7vote is ^1disabled"
-                    elif self.failed_vote_timer < time.time():
-                        msg = "^3Next Map ^7vote available: ^2Now!"
-                    else:
-                        remain_vote_time =  int(math.ceil((self.failed_vote_timer - time.time()) / 60))
-                        msg = "^3Next Map ^7vote available in: ^8 %s min%s" % (remain_vote_time, "s" if remain_vote_time > 1 else "")
-                    # Cyclemap Timer
-                    if not self.allow_cyclevote:
-                        msg2 = "^3Cycle Map ^7vote is ^1disabled"
-                    elif self.failed_cyclemap_timer < time.time():
-                        msg2 = "^3Cycle Map ^7vote available: ^2Now!"                                  
-                    else:
-                        remain_vote_time =  int(math.ceil((self.failed_cyclemap_timer - time.time()) / 60))
-                        msg2 = "^3Cycle Map ^7vote available in: ^8 %s min%s" % (remain_vote_time, "s" if remain_vote_time > 1 else "")
-                        
-                    self.tell_say_message(sar, msg)
-                    self.tell_say_message(sar, msg2)  
-                else:
-                    msg = "^3Players ^7must have ^3[^2AUTH^3]^7 to use this command"
-                    self.tell_say_message(sar, msg)
+    def cmd_hs(self, sar, line):
+        """
+        display headshot counter
+        """
+        hs_count = self.game.players[sar['player_num']].get_headshots()
+        if hs_count > 0:
+            self.game.rcon_tell(sar['player_num'], "^7You made ^3%d ^7headshot%s" % (hs_count, 's' if hs_count > 1 else ''))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You made no headshot")
 
-            # teams - balance teams
-            elif sar['command'] == '!teams' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['teams']['level']:
-                if not self.ffa_lms_gametype:
-                    self.handle_team_balance()
+    def cmd_spree(self, sar, line):
+        """
+        display current kill streak
+        """
+        spree_count = self.game.players[sar['player_num']].get_killing_streak()
+        if spree_count > 0:
+            self.game.rcon_tell(sar['player_num'], "^7You have ^3%d ^7kill%s in a row" % (spree_count, 's' if spree_count > 1 else ''))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You are currently not having a killing spree")
 
-            # stats - display current map stats
-            elif sar['command'] == '!stats':
-                if not self.freeze_gametype:
-                    ratio = round(float(self.game.players[sar['player_num']].get_kills()) / float(self.game.players[sar['player_num']].get_deaths()), 2) if self.game.players[sar['player_num']].get_deaths() > 0 else 1.0
-                    self.game.rcon_tell(sar['player_num'], "^7Map Stats %s: ^7K ^3%d ^7D ^3%d ^7TK ^3%d ^7Ratio ^3%s ^7HS ^3%d" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_kills(), self.game.players[sar['player_num']].get_deaths(), self.game.players[sar['player_num']].get_team_kill_count(), ratio, self.game.players[sar['player_num']].get_headshots()))
-                else:
-                    # Freeze Tag
-                    self.game.rcon_tell(sar['player_num'], "^7Freeze Stats %s: ^7F ^2%d ^7T ^3%d ^7TK ^1%d ^7HS ^2%d" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_freeze(), self.game.players[sar['player_num']].get_thawout(), self.game.players[sar['player_num']].get_team_kill_count(), self.game.players[sar['player_num']].get_headshots()))
-
-            # xlrstats - display full player stats
-            elif sar['command'] == '!xlrstats':
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    player_found = False
-                    for player in self.game.players.itervalues():
-                        if (arg.upper() in (player.get_name()).upper()) or (arg == str(player.get_player_num())) or (arg == ("@%s" % player.get_player_id())) or (arg.lower() == player.get_authname()):
-                            player_found = True
-                            if player.get_registered_user():
-                                ratio = round(float(player.get_db_kills()) / float(player.get_db_deaths()), 2) if player.get_db_deaths() > 0 else 1.0
-                                self.game.rcon_tell(sar['player_num'], "^1Stats^7 %s: ^7K ^3%d ^7D ^3%d ^7TK ^3%d ^7Ratio ^3%s ^7HS ^3%d" % (player.get_name(), player.get_db_kills(), player.get_db_deaths(), player.get_db_tks(), ratio, player.get_db_headshots()))
-                            else:
-                                self.game.rcon_tell(sar['player_num'], "^7Sorry, this player is not registered")
-                            break
-                    if not player_found:
-                        self.game.rcon_tell(sar['player_num'], "^7No player found matching ^3%s" % arg)
-                else:
-                    if self.game.players[sar['player_num']].get_registered_user():
-                        ratio = round(float(self.game.players[sar['player_num']].get_db_kills()) / float(self.game.players[sar['player_num']].get_db_deaths()), 2) if self.game.players[sar['player_num']].get_db_deaths() > 0 else 1.0
-                        self.game.rcon_tell(sar['player_num'], "^1Stats^7 %s: ^7K ^3%d ^7D ^3%d ^7TK ^3%d ^7Ratio ^3%s ^7HS ^3%d" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_db_kills(), self.game.players[sar['player_num']].get_db_deaths(), self.game.players[sar['player_num']].get_db_tks(), ratio, self.game.players[sar['player_num']].get_db_headshots()))
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^7You need to ^3!register ^7first")
-
-            # xlrtopstats
-            elif (sar['command'] == '!xlrtopstats' or sar['command'] == '!topstats') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['xlrtopstats']['level']:
-                values = (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime((time.time() - 10368000))),)  # last played within the last 120 days
-                result = curs.execute("SELECT name FROM `xlrstats` WHERE (`rounds` > 35 or `kills` > 500) and `last_played` > ? ORDER BY `ratio` DESC LIMIT 3", values).fetchall()
-                toplist = ['^1#%s ^7%s' % (index + 1, result[index][0]) for index in xrange(len(result))]
-                msg = "^3Top players: %s" % str(", ".join(toplist)) if toplist else "^3Awards still available"
-                self.game.rcon_tell(sar['player_num'], msg)
+    def cmd_hestats(self, sar, line):
+        """
+        display HE grenade kill stats
+        """
+        he_kill_count = self.game.players[sar['player_num']].get_he_kills()
+        if he_kill_count > 0:
+            self.game.rcon_tell(sar['player_num'], "^7You made ^3%d ^7HE grenade kill%s" % (he_kill_count, 's' if he_kill_count > 1 else ''))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You made no HE grenade kill")
 
-            # !forgive [<name>] - forgive a player for team killing
-            elif sar['command'] == '!forgive' or sar['command'] == '!f':
-                victim = self.game.players[sar['player_num']]
-                if victim.get_killed_me():
-                    if line.split(sar['command'])[1]:
-                        user = line.split(sar['command'])[1].strip()
-                        found, forgive_player, _ = self.player_found(user)
-                        if not found:
-                            forgive_player_num = False
-                        else:
-                            forgive_player_num = forgive_player.get_player_num() if forgive_player.get_player_num() in victim.get_killed_me() else False
-                    else:
-                        forgive_player_num = victim.get_killed_me()[-1]
-                        forgive_player = self.game.players[forgive_player_num]
-                    if forgive_player_num is not False:
-                        victim.clear_tk(forgive_player_num)
-                        forgive_player.clear_killed_me(victim.get_player_num())
-                        self.game.rcon_say("^7%s has forgiven %s's attack" % (victim.get_name(), forgive_player.get_name()))
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^7Whom to forgive? %s" % ", ".join(["^3%s^7 [^3%s^7]" % (self.game.players[playernum].get_name(), playernum) for playernum in list(set(victim.get_killed_me()))]))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^3No one to forgive")
-
-            # forgive last team kill
-            elif sar['command'] == '!forgiveprev' or sar['command'] == '!fp':
-                victim = self.game.players[sar['player_num']]
-                if victim.get_killed_me():
-                    forgive_player_num = victim.get_killed_me()[-1]
-                    forgive_player = self.game.players[forgive_player_num]
-                    victim.clear_tk(forgive_player_num)
-                    forgive_player.clear_killed_me(victim.get_player_num())
-                    self.game.rcon_say("^7%s has forgiven %s's attack" % (victim.get_name(), forgive_player.get_name()))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^3No one to forgive")
+    def cmd_knife(self, sar, line):
+        """
+        display knife kill stats
+        """
+        knife_kill_count = self.game.players[sar['player_num']].get_knife_kills()
+        if knife_kill_count > 0:
+            self.game.rcon_tell(sar['player_num'], "^7You made ^3%d ^7knife kill%s" % (knife_kill_count, 's' if knife_kill_count > 1 else ''))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You made no knife kill")
 
-            # !forgivelist - list all players who killed you
-            elif sar['command'] == '!forgivelist' or sar['command'] == '!fl':
-                victim = self.game.players[sar['player_num']]
-                if victim.get_killed_me():
-                    self.game.rcon_tell(sar['player_num'], "^7Whom to forgive? %s" % ", ".join(["^3%s^7 [^3%s^7]" % (self.game.players[playernum].get_name(), playernum) for playernum in list(set(victim.get_killed_me()))]))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^3No one to forgive")
-
-            # forgive all team kills
-            elif sar['command'] == '!forgiveall' or sar['command'] == '!fa':
-                victim = self.game.players[sar['player_num']]
-                msg = []
-                append = msg.append
-                if victim.get_killed_me():
-                    forgive_player_num_list = list(set(victim.get_killed_me()))
-                    victim.clear_all_tk()
-                    for forgive_player_num in forgive_player_num_list:
-                        forgive_player = self.game.players[forgive_player_num]
-                        forgive_player.clear_killed_me(victim.get_player_num())
-                        append(forgive_player.get_name())
-                if msg:
-                    self.game.rcon_say("^7%s has forgiven: ^3%s" % (victim.get_name(), ", ".join(msg)))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^3No one to forgive")
-
-            # grudge - grudge a player for team killing (a grudged player will not be forgiven) - !grudge [<name>]
-            elif sar['command'] == '!grudge':
-                victim = self.game.players[sar['player_num']]
-                if victim.get_killed_me():
-                    if line.split(sar['command'])[1]:
-                        user = line.split(sar['command'])[1].strip()
-                        found, grudge_player, _ = self.player_found(user)
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], "^7Whom to grudge? %s" % ", ".join(["^3%s^7 [^3%s^7]" % (self.game.players[playernum].get_name(), playernum) for playernum in list(set(victim.get_killed_me()))]))
-                        else:
-                            victim.set_grudge(grudge_player.get_player_num())
-                            self.game.rcon_say("^7%s has grudge against ^1%s" % (victim.get_name(), grudge_player.get_name()))
-                    else:
-                        grudge_player = self.game.players[victim.get_killed_me()[-1]]
-                        victim.set_grudge(grudge_player.get_player_num())
-                        self.game.rcon_say("^7%s has grudge against ^1%s" % (victim.get_name(), grudge_player.get_name()))
-                elif victim.get_grudged_player():
-                    self.game.rcon_tell(sar['player_num'], "^7No one to grudge. You already have a grudge against: %s" % ", ".join(["^3%s" % self.game.players[playernum].get_name() for playernum in victim.get_grudged_player()]))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^3No one to grudge")
- 
-            # report - report a player to discord admin
-            elif (sar['command'] == '!report' or sar['command'] == '!r') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['report']['level']:
-                if not self.auth_status or self.game.players[sar['player_num']].get_authname():
-                    if line.split(sar['command'])[1]:
-                        arg = line.split(sar['command'])[1].split()
-                        clear = False
-                        if self.game.players[sar['player_num']].get_admin_role() >= 40 and len(arg) == 1:
-                            user = reason = None
-                            if "clear" in arg[0]:
-                                self.cooldown = time.time()
-                                clear = True
-                        elif len(arg) > 1:
-                            user = arg[0]
-                            reason = ' '.join(arg[1:])[:40].strip()
-                        else:
-                            user = reason = None
-                            
-                        if user and reason:
-                            found, victim, msg = self.player_found(user)
-                            if not found:
-                                self.game.rcon_tell(sar['player_num'], msg)
-                            else:
-                                if reason in REASONS:
-                                    reason = REASONS[reason]
-                                
-                                if victim != self.lastreport:
-                                    self.lastreport = victim
-                                    reporter =  self.game.players[sar['player_num']]
-                                    
-                                    if time.time() > self.cooldown or self.game.players[sar['player_num']].get_admin_role() >= 40:
-                                        self.cooldown = time.time() + 60
-                                        
-                                        embed = DiscordEmbed(
-                                            title='Player report!',
-                                            color=3447003
-                                            )
-                                        image1 = 'https://lilpwny.com/downloads/vectto_icons/bullets.png'
-                                        
-                                        embed.set_timestamp()
-                                        embed.set_author(name='%s' % (self.server_name), icon_url=image1)
-                                        embed.set_footer(text='Reported by: %s [%s]  @%s' % (reporter.get_name(), reporter.get_authname(), reporter.get_player_id()))
-                                        embed.add_embed_field(name='NAME', value='%s' % (victim.get_name()))
-                                        embed.add_embed_field(name='PLAYER ID', value='@%s' % (victim.get_player_id()))
-                                        embed.add_embed_field(name='REASON', value='%s' % (reason))
-
-                                        reporthook.add_embed(embed)
-                                        response = reporthook.execute()
-                                        
-                                        if "204" in str(response):
-                                            self.game.rcon_tell(sar['player_num'], "^3Report: ^2success")
-                                        else:
-                                            self.game.rcon_tell(sar['player_num'], "^3Report: ^1Failed^7 with error %s" % (str(response)))
-                                            
-                                        reporthook.remove_embed(0) # remove embed report after posting
-                                        
-                                    else:
-                                        if self.cooldown >= time.time() + 300:
-                                            self.cooldown = time.time() + 300
-                                        else:
-                                            self.cooldown += 60   
-                                        remain_time =  int(math.ceil((self.cooldown - time.time()) / 60))
-                                        warning = 'do not spam'
-                                        reporter.add_warning(warning, timer=False)
-                                        self.game.rcon_tell(sar['player_num'], "^1WARNING ^7[^3%d^7]: ^3%s^7: %s" % (reporter.get_warning(), reporter.get_name(), warning))
-                                        self.game.rcon_tell(sar['player_num'], "^8!report^7 is on cooldown for: ^3 %s min%s" % (remain_time, "s" if remain_time > 1 else ""))
-                                else:
-                                    self.game.rcon_tell(sar['player_num'], "^7This player has already been reported")
-                        else:
-                            if not clear:
-                                self.game.rcon_tell(sar['player_num'], "^7You need to enter a reason: ^8!report ^7 <name> <reason>")
-                            else:
-                                self.game.rcon_tell(sar['player_num'], "^3Reports^7 are now cleared")
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['report']['syntax'])
-                else:
-                    msg = "^3Players ^7must have ^3[^2AUTH^3]^7 to use this command"
-                    self.tell_say_message(sar, msg)
-                    
-            # Like - set map that you like
-            elif sar['command'] == '!like' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['like']['level']:
-                liked_map = self.game.mapname
-                player = self.game.players[sar['player_num']]
-                guid = player.get_guid()
-                if liked_map and player.get_registered_user():
-                    values = (guid,)
-                    curs.execute("SELECT `liked_map` FROM `xlrstats` WHERE `guid` = ?", values)
-                    result = curs.fetchone()
-                    liked_list = result[0].split(', ')
-                    if liked_map not in liked_list and len(liked_list) < 3:
-                        liked_list.append(liked_map)
-                        liked_string = ', '.join(liked_list)
-                    else:
-                        del liked_list[0]
-                        liked_list.append(liked_map)
-                        liked_string = ', '.join(liked_list)
-                
-                    self.game.rcon_tell(sar['player_num'], "^2 Success - ^7Liked map set to ^3%s" % (liked_map))
-                    values = (liked_string, guid)
-                    curs.execute("UPDATE `xlrstats` SET `liked_map` = ? WHERE `guid` = ?", values)
-                    conn.commit() 
-                else: 
-                    self.game.rcon_tell(sar['player_num'], "^7 You must ^3!register^7 for xlrstats")
-                         
-## mod level 20
-            # admintest - display current admin status
-            elif sar['command'] == '!admintest' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['admintest']['level']:
-                player_admin_role = self.game.players[sar['player_num']].get_admin_role()
-                self.game.rcon_tell(sar['player_num'], "^7%s^7 [^3@%s^7] is ^3%s ^7[^3%d^7]" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_player_id(), self.game.players[sar['player_num']].roles[player_admin_role], player_admin_role))
-
-            #locate
-            elif (sar['command'] == '!locate' or sar['command'] == '@locate') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['locate']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        msg = "^3%s ^7is connecting from ^3%s" % (victim.get_name(), victim.get_country())
-                        self.tell_say_message(sar, msg)
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['country']['syntax'])
+    def cmd_hits(self, sar, line):
+        """
+        display hit stats
+        """
+        self.game.rcon_tell(sar['player_num'], "^1HIT Stats: ^7HS:^3%s ^7BODY:^3%s ^7ARMS:^3%s ^7LEGS:^3%s ^7TOTAL:^3%s" % (self.game.players[sar['player_num']].get_headshots(), self.game.players[sar['player_num']].get_hitzones('body'), self.game.players[sar['player_num']].get_hitzones('arms'), self.game.players[sar['player_num']].get_hitzones('legs'), self.game.players[sar['player_num']].get_all_hits()))
 
-            # leveltest
-            elif (sar['command'] == '!leveltest' or sar['command'] == '!lt') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['leveltest']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        victim_admin_role = victim.get_admin_role()
-                        if victim_admin_role > 0:
-                            self.game.rcon_tell(sar['player_num'], "^7%s^7 [^3@%s^7] is ^3%s ^7[^3%d^7] and registered since ^3%s" % (victim.get_name(), victim.get_player_id(), victim.roles[victim_admin_role], victim_admin_role, victim.get_first_seen_date()))
-                        else:
-                            self.game.rcon_tell(sar['player_num'], "^7%s^7 [^3@%s^7] is ^3%s ^7[^3%d^7]" % (victim.get_name(), victim.get_player_id(), victim.roles[victim_admin_role], victim_admin_role))
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^3Level^7 %s^7 [^3%d^7]: ^7%s" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_admin_role(), self.game.players[sar['player_num']].roles[self.game.players[sar['player_num']].get_admin_role()]))
+    def cmd_bombstats(self, sar, line):
+        """
+        display Bomb stats
+        """
+        if self.bomb_gametype:
+            self.game.rcon_tell(sar['player_num'], "^7planted: ^2%d ^7- defused: ^2%d" % (self.game.players[sar['player_num']].get_planted_bomb(), self.game.players[sar['player_num']].get_defused_bomb()))
+            self.game.rcon_tell(sar['player_num'], "^7bomb carrier killed: ^2%d ^7- enemies bombed: ^2%d" % (self.game.players[sar['player_num']].get_bomb_carrier_kills(), self.game.players[sar['player_num']].get_kills_with_bomb()))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You are not playing Bomb")
 
-            # lastmaps - list the last played maps
-            elif sar['command'] == '!lastmaps' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['lastmaps']['level']:
-                if self.game.get_last_maps():
-                    self.game.rcon_tell(sar['player_num'], "^7Last Maps: ^3%s" % ", ".join(self.game.get_last_maps()))
+    def cmd_ctfstats(self, sar, line):
+        """
+        display Capture the Flag stats
+        """
+        if self.ctf_gametype:
+            if self.urt_modversion > 41:
+                self.game.rcon_tell(sar['player_num'], "^7flags captured:^3%d ^7- flags returned:^3%d ^7- fastest cap:^3%s^7sec" % (self.game.players[sar['player_num']].get_flags_captured(), self.game.players[sar['player_num']].get_flags_returned(), self.game.players[sar['player_num']].get_flag_capture_time()))
+            else:
+                self.game.rcon_tell(sar['player_num'], "^7flags captured:^3%d ^7- flags returned:^3%d" % (self.game.players[sar['player_num']].get_flags_captured(), self.game.players[sar['player_num']].get_flags_returned()))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You are not playing Capture the Flag")
 
-            # list - list all connected players
-            elif sar['command'] == '!list' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['list']['level']:
-                msg = "^7Players online: %s" % ", ".join(["^3%s^7 [^3%d^7]" % (player.get_name(), player.get_player_num()) for player in self.game.players.itervalues() if player.get_player_num() != BOT_PLAYER_NUM])
-                self.game.rcon_tell(sar['player_num'], msg)
+    def cmd_freezestats(self, sar, line):
+        """
+        display freeze/thawout stats
+        """
+        if self.freeze_gametype:
+            self.game.rcon_tell(sar['player_num'], "^7freeze: ^2%d ^7- thaw out: ^2%d" % (self.game.players[sar['player_num']].get_freeze(), self.game.players[sar['player_num']].get_thawout()))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You are not playing Freeze Tag")
 
-            # nextmap - display the next map in rotation
-            elif (sar['command'] == '!nextmap' or sar['command'] == '@nextmap') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['nextmap']['level']:
-                msg = self.get_nextmap()
-                self.tell_say_message(sar, msg)
+    def cmd_time(self, sar, line):
+        """
+        display the current server time
+        """
+        msg = "^7%s" % time.strftime("%H:%M", time.localtime(CLOCK.time()))
+        self.tell_say_message(sar, msg)
 
-            # mute - mute or unmute a player
-            elif sar['command'] == '!mute' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['mute']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if len(arg) > 1:
-                        user = arg[0]
-                        duration = arg[1]
-                        if not duration.isdigit():
-                            duration = ''
-                    else:
-                        user = arg[0]
-                        duration = ''
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        self.game.send_rcon("mute %d %s" % (victim.get_player_num(), duration))
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['mute']['syntax'])
+    def cmd_discord(self, sar, line):
+        """
+        display the discord invite link
+        """
+        msg = "^3Discord: ^7%s" % (self.discord_link)
+        self.tell_say_message(sar, msg)
 
-            # seen - display when the player was last seen
-            elif sar['command'] == '!seen' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['seen']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        if victim.get_registered_user():
-                            self.game.rcon_tell(sar['player_num'], "^3%s ^7was last seen on %s" % (victim.get_name(), victim.get_last_visit()))
-                        else:
-                            self.game.rcon_tell(sar['player_num'], "^3%s ^7is not a registered user" % victim.get_name())
+    def cmd_votes(self, sar, line):
+        """
+        Time remaining before next vote
+        """
+        if not self.auth_status or self.game.players[sar['player_num']].get_authname():
+            if not self.allow_nextmap_vote:
+                msg = "^3Next Map ^7vote is ^1disabled"
+            elif self.failed_vote_timer < CLOCK.time():
+                msg = "^3Next Map ^7vote available: ^2Now!"
+            else:
+                remain_vote_time =  int(math.ceil((self.failed_vote_timer - CLOCK.time()) / 60))
+                msg = "^3Next Map ^7vote available in: ^8 %s min%s" % (remain_vote_time, "s" if remain_vote_time > 1 else "")
+            # Cyclemap Timer
+            if not self.allow_cyclevote:
+                msg2 = "^3Cycle Map ^7vote is ^1disabled"
+            elif self.failed_cyclemap_timer < CLOCK.time():
+                msg2 = "^3Cycle Map ^7vote available: ^2Now!"                                  
+            else:
+                remain_vote_time =  int(math.ceil((self.failed_cyclemap_timer - CLOCK.time()) / 60))
+                msg2 = "^3Cycle Map ^7vote available in: ^8 %s min%s" % (remain_vote_time, "s" if remain_vote_time > 1 else "")
+
+            self.tell_say_message(sar, msg)
+            self.tell_say_message(sar, msg2)  
+        else:
+            msg = "^3Players ^7must have ^3[^2AUTH^3]^7 to use this command"
+            self.tell_say_message(sar, msg)
+
+    def cmd_teams(self, sar, line):
+        """
+        balance teams
+        """
+        if not self.ffa_lms_gametype:
+            self.handle_team_balance()
+
+    def cmd_stats(self, sar, line):
+        """
+        display current map stats
+        """
+        if not self.freeze_gametype:
+            ratio = round(float(self.game.players[sar['player_num']].get_kills()) / float(self.game.players[sar['player_num']].get_deaths()), 2) if self.game.players[sar['player_num']].get_deaths() > 0 else 1.0
+            self.game.rcon_tell(sar['player_num'], "^7Map Stats %s: ^7K ^3%d ^7D ^3%d ^7TK ^3%d ^7Ratio ^3%s ^7HS ^3%d" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_kills(), self.game.players[sar['player_num']].get_deaths(), self.game.players[sar['player_num']].get_team_kill_count(), ratio, self.game.players[sar['player_num']].get_headshots()))
+        else:
+            # Freeze Tag
+            self.game.rcon_tell(sar['player_num'], "^7Freeze Stats %s: ^7F ^2%d ^7T ^3%d ^7TK ^1%d ^7HS ^2%d" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_freeze(), self.game.players[sar['player_num']].get_thawout(), self.game.players[sar['player_num']].get_team_kill_count(), self.game.players[sar['player_num']].get_headshots()))
+
+    def cmd_xlrstats(self, sar, line):
+        """
+        display full player statistics
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            player = self.game.player_index.find_exact(arg)
+            if not player:
+                matches = self.game.player_index.find_partial(arg)
+                player = matches[0] if matches else None
+            if player:
+                if player.get_registered_user():
+                    ratio = round(float(player.get_db_kills()) / float(player.get_db_deaths()), 2) if player.get_db_deaths() > 0 else 1.0
+                    self.game.rcon_tell(sar['player_num'], "^1Stats^7 %s: ^7K ^3%d ^7D ^3%d ^7TK ^3%d ^7Ratio ^3%s ^7HS ^3%d" % (player.get_name(), player.get_db_kills(), player.get_db_deaths(), player.get_db_tks(), ratio, player.get_db_headshots()))
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['seen']['syntax'])
+                    self.game.rcon_tell(sar['player_num'], "^7Sorry, this player is not registered")
+            else:
+                self.game.rcon_tell(sar['player_num'], "^7No player found matching ^3%s" % arg)
+        else:
+            if self.game.players[sar['player_num']].get_registered_user():
+                ratio = round(float(self.game.players[sar['player_num']].get_db_kills()) / float(self.game.players[sar['player_num']].get_db_deaths()), 2) if self.game.players[sar['player_num']].get_db_deaths() > 0 else 1.0
+                self.game.rcon_tell(sar['player_num'], "^1Stats^7 %s: ^7K ^3%d ^7D ^3%d ^7TK ^3%d ^7Ratio ^3%s ^7HS ^3%d" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_db_kills(), self.game.players[sar['player_num']].get_db_deaths(), self.game.players[sar['player_num']].get_db_tks(), ratio, self.game.players[sar['player_num']].get_db_headshots()))
+            else:
+                self.game.rcon_tell(sar['player_num'], "^7You need to ^3!register ^7first")
 
-            # shuffleteams
-            elif (sar['command'] == '!shuffleteams' or sar['command'] == '!shuffle') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['shuffleteams']['level']:
-                if not self.ffa_lms_gametype:
-                    self.game.send_rcon('shuffleteams')
-                    time.sleep(1)
-                    self.game.send_rcon('exec shuffle.cfg')
+    def cmd_xlrtopstats(self, sar, line):
+        """
+        display the top players
+        """
+        values = (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime((CLOCK.time() - 10368000))),)  # last played within the last 120 days
+        result = curs.execute("SELECT name FROM `xlrstats` WHERE (`rounds` > 35 or `kills` > 500) and `last_played` > ? ORDER BY `ratio` DESC LIMIT 3", values).fetchall()
+        toplist = ['^1#%s ^7%s' % (index + 1, result[index][0]) for index in xrange(len(result))]
+        msg = "^3Top players: %s" % str(", ".join(toplist)) if toplist else "^3Awards still available"
+        self.game.rcon_tell(sar['player_num'], msg)
+
+    def cmd_forgive(self, sar, line):
+        """
+        forgive a player for team killing
+        """
+        victim = self.game.players[sar['player_num']]
+        if victim.get_killed_me():
+            if line.split(sar['command'])[1]:
+                user = line.split(sar['command'])[1].strip()
+                found, forgive_player, _ = self.player_found(user)
+                if not found:
+                    forgive_player_num = False
                 else:
-                    self.game.rcon_tell(sar['player_num'], "^7Command is disabled for this game mode")
+                    forgive_player_num = forgive_player.get_player_num() if forgive_player.get_player_num() in victim.get_killed_me() else False
+            else:
+                forgive_player_num = victim.get_killed_me()[-1]
+                forgive_player = self.game.players[forgive_player_num]
+            if forgive_player_num is not False:
+                victim.clear_tk(forgive_player_num)
+                forgive_player.clear_killed_me(victim.get_player_num())
+                self.game.rcon_say("^7%s has forgiven %s's attack" % (victim.get_name(), forgive_player.get_name()))
+            else:
+                self.game.rcon_tell(sar['player_num'], "^7Whom to forgive? %s" % ", ".join(["^3%s^7 [^3%s^7]" % (self.game.players[playernum].get_name(), playernum) for playernum in list(set(victim.get_killed_me()))]))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^3No one to forgive")
 
-            # warninfo - display how many warnings the player has
-            elif (sar['command'] == '!warninfo' or sar['command'] == '!wi') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['warninfo']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        # clear if already expired
-                        if victim.get_last_warn_time() + self.warn_expiration < time.time():
-                            victim.clear_warning()
-                        warn_count = victim.get_warning()
-                        warn_time = int(math.ceil(float(victim.get_last_warn_time() + self.warn_expiration - time.time()) / 60))
-                        self.game.rcon_tell(sar['player_num'], "^1%s ^7has ^3%s ^7active warning%s%s" % (victim.get_name(), warn_count if warn_count > 0 else 'no', 's' if warn_count > 1 else '', ", expires in ^1%s ^7minute%s: ^3%s" % (warn_time, "s" if warn_time > 1 else "", ", ^3".join(victim.get_all_warn_msg())) if warn_count > 0 else ''))
+    def cmd_forgiveprev(self, sar, line):
+        """
+        forgive last team kill
+        """
+        victim = self.game.players[sar['player_num']]
+        if victim.get_killed_me():
+            forgive_player_num = victim.get_killed_me()[-1]
+            forgive_player = self.game.players[forgive_player_num]
+            victim.clear_tk(forgive_player_num)
+            forgive_player.clear_killed_me(victim.get_player_num())
+            self.game.rcon_say("^7%s has forgiven %s's attack" % (victim.get_name(), forgive_player.get_name()))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^3No one to forgive")
+
+    def cmd_forgivelist(self, sar, line):
+        """
+        list all players who killed you
+        """
+        victim = self.game.players[sar['player_num']]
+        if victim.get_killed_me():
+            self.game.rcon_tell(sar['player_num'], "^7Whom to forgive? %s" % ", ".join(["^3%s^7 [^3%s^7]" % (self.game.players[playernum].get_name(), playernum) for playernum in list(set(victim.get_killed_me()))]))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^3No one to forgive")
+
+    def cmd_forgiveall(self, sar, line):
+        """
+        forgive all team kills
+        """
+        victim = self.game.players[sar['player_num']]
+        msg = []
+        append = msg.append
+        if victim.get_killed_me():
+            forgive_player_num_list = list(set(victim.get_killed_me()))
+            victim.clear_all_tk()
+            for forgive_player_num in forgive_player_num_list:
+                forgive_player = self.game.players[forgive_player_num]
+                forgive_player.clear_killed_me(victim.get_player_num())
+                append(forgive_player.get_name())
+        if msg:
+            self.game.rcon_say("^7%s has forgiven: ^3%s" % (victim.get_name(), ", ".join(msg)))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^3No one to forgive")
+
+    def cmd_grudge(self, sar, line):
+        """
+        grudge a player for team killing, a grudged player will not be forgiven
+        """
+        victim = self.game.players[sar['player_num']]
+        if victim.get_killed_me():
+            if line.split(sar['command'])[1]:
+                user = line.split(sar['command'])[1].strip()
+                found, grudge_player, _ = self.player_found(user)
+                if not found:
+                    self.game.rcon_tell(sar['player_num'], "^7Whom to grudge? %s" % ", ".join(["^3%s^7 [^3%s^7]" % (self.game.players[playernum].get_name(), playernum) for playernum in list(set(victim.get_killed_me()))]))
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['warninfo']['syntax'])
-
-            # warn - warn user - !warn <name> [<reason>]
-            elif (sar['command'] == '!warn' or sar['command'] == '!w') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['warn']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if arg:
-                        user = arg[0]
-                        reason = ' '.join(arg[1:])[:40].strip() if len(arg) > 1 else 'behave yourself'
-                        found, victim, msg = self.player_found(user)
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], msg)
-                        else:
-                            warn_delay = 5
-                            if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                                self.game.rcon_tell(sar['player_num'], "^3You cannot warn an admin")
-                            elif victim.get_last_warn_time() + warn_delay > time.time():
-                                self.game.rcon_tell(sar['player_num'], "^3Only one warning per %d seconds can be issued" % warn_delay)
-                            else:
-                                # clear if already expired
-                                if victim.get_last_warn_time() + self.warn_expiration < time.time():
-                                    victim.clear_warning()
-                                show_alert = False
-                                ban_duration = 0
-                                if victim.get_warning() > 4:
-                                    self.game.kick_player(victim.get_player_num(), reason='too many warnings')
-                                    msg = "^1%s ^7was kicked, too many warnings" % victim.get_name()
-                                else:
-                                    if reason in REASONS:
-                                        warning = REASONS[reason]
-                                        if reason == 'tk' and victim.get_warning() > 1:
-                                            ban_duration = victim.add_ban_point('tk, ban by %s' % self.game.players[sar['player_num']].get_name(), 1800)
-                                        elif reason == 'lang' and victim.get_warning() > 1:
-                                            ban_duration = victim.add_ban_point('lang', 300)
-                                        elif reason == 'spam' and victim.get_warning() > 1:
-                                            ban_duration = victim.add_ban_point('spam', 300)
-                                        elif reason == 'racism' and victim.get_warning() > 1:
-                                            ban_duration = victim.add_ban_point('racism', 300)
-                                    else:
-                                        warning = reason
-                                    victim.add_warning(warning)
-                                    msg = "^1WARNING ^7[^3%d^7]: ^3%s^7: %s" % (victim.get_warning(), victim.get_name(), warning)
-                                    # ban player if needed
-                                    if ban_duration > 0:
-                                        msg = "^1%s ^7banned for ^3%d minutes ^7for too many warnings" % (victim.get_name(), ban_duration)
-                                        self.game.kick_player(victim.get_player_num(), reason='too many warnings')
-                                    # show alert message for player with 3 warnings
-                                    elif victim.get_warning() == 4:
-                                        show_alert = True
-                                self.game.rcon_say(msg)
-                                if show_alert:
-                                    self.game.rcon_say("^1ALERT: ^3%s ^7auto-kick from warnings if not cleared" % victim.get_name())
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['warn']['syntax'])
+                    victim.set_grudge(grudge_player.get_player_num())
+                    self.game.rcon_say("^7%s has grudge against ^1%s" % (victim.get_name(), grudge_player.get_name()))
+            else:
+                grudge_player = self.game.players[victim.get_killed_me()[-1]]
+                victim.set_grudge(grudge_player.get_player_num())
+                self.game.rcon_say("^7%s has grudge against ^1%s" % (victim.get_name(), grudge_player.get_name()))
+        elif victim.get_grudged_player():
+            self.game.rcon_tell(sar['player_num'], "^7No one to grudge. You already have a grudge against: %s" % ", ".join(["^3%s" % self.game.players[playernum].get_name() for playernum in victim.get_grudged_player()]))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^3No one to grudge")
+
+    def cmd_report(self, sar, line):
+        """
+        report a player to an admin
+        """
+        if not self.auth_status or self.game.players[sar['player_num']].get_authname():
+            if line.split(sar['command'])[1]:
+                arg = line.split(sar['command'])[1].split()
+                clear = False
+                if self.game.players[sar['player_num']].get_admin_role() >= 40 and len(arg) == 1:
+                    user = reason = None
+                    if "clear" in arg[0]:
+                        self.cooldown = CLOCK.time()
+                        clear = True
+                elif len(arg) > 1:
+                    user = arg[0]
+                    reason = ' '.join(arg[1:])[:40].strip()
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['warn']['syntax'])
+                    user = reason = None
 
-            # warnremove - remove a player's last warning
-            elif (sar['command'] == '!warnremove' or sar['command'] == '!wr') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['warnremove']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
+                if user and reason:
                     found, victim, msg = self.player_found(user)
                     if not found:
                         self.game.rcon_tell(sar['player_num'], msg)
                     else:
-                        last_warning = victim.clear_last_warning()
-                        if last_warning:
-                            self.game.rcon_say("^7Last warning removed for %s: ^3%s" % (victim.get_name(), last_warning))
+                        if reason in REASONS:
+                            reason = REASONS[reason]
+
+                        if victim != self.lastreport:
+                            self.lastreport = victim
+                            reporter =  self.game.players[sar['player_num']]
+
+                            if CLOCK.time() > self.cooldown or self.game.players[sar['player_num']].get_admin_role() >= 40:
+                                self.cooldown = CLOCK.time() + 60
+
+                                embed = DiscordEmbed(
+                                    title='Player report!',
+                                    color=3447003
+                                    )
+                                image1 = 'https://lilpwny.com/downloads/vectto_icons/bullets.png'
+
+                                embed.set_timestamp()
+                                embed.set_author(name='%s' % (self.server_name), icon_url=image1)
+                                embed.set_footer(text='Reported by: %s [%s]  @%s' % (reporter.get_name(), reporter.get_authname(), reporter.get_player_id()))
+                                embed.add_embed_field(name='NAME', value='%s' % (victim.get_name()))
+                                embed.add_embed_field(name='PLAYER ID', value='@%s' % (victim.get_player_id()))
+                                embed.add_embed_field(name='REASON', value='%s' % (reason))
+
+                                # posted in the background, the reporter gets the result later
+                                WORKER.post_webhook(reporthook, embed, self.report_posted, sar['player_num'])
+
+                            else:
+                                if self.cooldown >= CLOCK.time() + 300:
+                                    self.cooldown = CLOCK.time() + 300
+                                else:
+                                    self.cooldown += 60   
+                                remain_time =  int(math.ceil((self.cooldown - CLOCK.time()) / 60))
+                                warning = 'do not spam'
+                                reporter.add_warning(warning, timer=False)
+                                self.game.rcon_tell(sar['player_num'], "^1WARNING ^7[^3%d^7]: ^3%s^7: %s" % (reporter.get_warning(), reporter.get_name(), warning))
+                                self.game.rcon_tell(sar['player_num'], "^8!report^7 is on cooldown for: ^3 %s min%s" % (remain_time, "s" if remain_time > 1 else ""))
                         else:
-                            self.game.rcon_tell(sar['player_num'], "^3%s ^7has no active warning" % victim.get_name())
+                            self.game.rcon_tell(sar['player_num'], "^7This player has already been reported")
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['warnremove']['syntax'])
-
-            # warns - list the warnings
-            elif sar['command'] == '!warns' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['warns']['level']:
-                keylist = REASONS.keys()
-                keylist.sort()
-                self.game.rcon_tell(sar['player_num'], "^7Warnings: ^3%s" % ", ^3".join([key for key in keylist]))
-
-            # warntest - test a warning
-            elif (sar['command'] == '!warntest' or sar['command'] == '!wt') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['warntest']['level']:
-                if line.split(sar['command'])[1]:
-                    reason = line.split(sar['command'])[1].strip()
-                    warning = REASONS[reason] if reason in REASONS else reason
-                else:
-                    warning = 'behave yourself'
-                self.game.rcon_tell(sar['player_num'], "^1TEST: ^1WARNING ^7[^31^7]: ^4%s" % warning)
+                    if not clear:
+                        self.game.rcon_tell(sar['player_num'], "^7You need to enter a reason: ^8!report ^7 <name> <reason>")
+                    else:
+                        self.game.rcon_tell(sar['player_num'], "^3Reports^7 are now cleared")
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['report']['syntax'])
+        else:
+            msg = "^3Players ^7must have ^3[^2AUTH^3]^7 to use this command"
+            self.tell_say_message(sar, msg)
 
-## admin level 40
-            # admins - list all the online admins
-            elif (sar['command'] == '!admins' or sar['command'] == '@admins') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['admins']['level']:
-                msg = self.get_admins_online()
-                self.tell_say_message(sar, msg)
+    def cmd_like(self, sar, line):
+        """
+        like your favourite maps
+        """
+        liked_map = self.game.mapname
+        player = self.game.players[sar['player_num']]
+        guid = player.get_guid()
+        if liked_map and player.get_registered_user():
+            values = (guid,)
+            curs.execute("SELECT `liked_map` FROM `xlrstats` WHERE `guid` = ?", values)
+            result = curs.fetchone()
+            liked_list = result[0].split(', ')
+            if liked_map not in liked_list and len(liked_list) < 3:
+                liked_list.append(liked_map)
+                liked_string = ', '.join(liked_list)
+            else:
+                del liked_list[0]
+                liked_list.append(liked_map)
+                liked_string = ', '.join(liked_list)
+
+            self.game.rcon_tell(sar['player_num'], "^2 Success - ^7Liked map set to ^3%s" % (liked_map))
+            values = (liked_string, guid)
+            curs.execute("UPDATE `xlrstats` SET `liked_map` = ? WHERE `guid` = ?", values)
+            conn.commit() 
+        else: 
+            self.game.rcon_tell(sar['player_num'], "^7 You must ^3!register^7 for xlrstats")
+
+    def cmd_admintest(self, sar, line):
+        """
+        display current admin status
+        """
+        player_admin_role = self.game.players[sar['player_num']].get_admin_role()
+        self.game.rcon_tell(sar['player_num'], "^7%s^7 [^3@%s^7] is ^3%s ^7[^3%d^7]" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_player_id(), self.game.players[sar['player_num']].roles[player_admin_role], player_admin_role))
 
-            # !regulars/!regs - display the regular players online
-            elif (sar['command'] == '!regulars' or sar['command'] == '!regs' or sar['command'] == '@regulars') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['regulars']['level']:
-                liste = "%s" % ", ".join(["^3%s^7 [^3%d^7]" % (player.get_name(), player.get_admin_role()) for player in self.game.players.itervalues() if player.get_admin_role() == 2])
-                msg = "^7Regulars online: %s" % liste if liste else "^7No regulars online"
+    def cmd_locate(self, sar, line):
+        """
+        display geolocation info of a player
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                msg = "^3%s ^7is connecting from ^3%s" % (victim.get_name(), victim.get_country())
                 self.tell_say_message(sar, msg)
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['country']['syntax'])
 
-            # aliases - list the aliases of the player
-            elif (sar['command'] == '!aliases' or sar['command'] == '@aliases' or sar['command'] == '!alias' or sar['command'] == '@alias') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['aliases']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        msg = "^7Aliases of ^5%s: ^3%s" % (victim.get_name(), victim.get_aliases())
-                        self.tell_say_message(sar, msg)
+    def cmd_leveltest(self, sar, line):
+        """
+        get the admin level for a given player or myself
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                victim_admin_role = victim.get_admin_role()
+                if victim_admin_role > 0:
+                    self.game.rcon_tell(sar['player_num'], "^7%s^7 [^3@%s^7] is ^3%s ^7[^3%d^7] and registered since ^3%s" % (victim.get_name(), victim.get_player_id(), victim.roles[victim_admin_role], victim_admin_role, victim.get_first_seen_date()))
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['aliases']['syntax'])
+                    self.game.rcon_tell(sar['player_num'], "^7%s^7 [^3@%s^7] is ^3%s ^7[^3%d^7]" % (victim.get_name(), victim.get_player_id(), victim.roles[victim_admin_role], victim_admin_role))
+        else:
+            self.game.rcon_tell(sar['player_num'], "^3Level^7 %s^7 [^3%d^7]: ^7%s" % (self.game.players[sar['player_num']].get_name(), self.game.players[sar['player_num']].get_admin_role(), self.game.players[sar['player_num']].roles[self.game.players[sar['player_num']].get_admin_role()]))
+
+    def cmd_lastmaps(self, sar, line):
+        """
+        list the last played maps
+        """
+        if self.game.get_last_maps():
+            self.game.rcon_tell(sar['player_num'], "^7Last Maps: ^3%s" % ", ".join(self.game.get_last_maps()))
+
+    def cmd_list(self, sar, line):
+        """
+        list all connected players
+        """
+        msg = "^7Players online: %s" % ", ".join(["^3%s^7 [^3%d^7]" % (player.get_name(), player.get_player_num()) for player in self.game.players.itervalues() if player.get_player_num() != BOT_PLAYER_NUM])
+        self.game.rcon_tell(sar['player_num'], msg)
+
+    def cmd_nextmap(self, sar, line):
+        """
+        display the next map in rotation
+        """
+        self.get_nextmap(lambda msg: self.tell_say_message(sar, msg))
+
+    def cmd_mute(self, sar, line):
+        """
+        mute or un-mute a player
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if len(arg) > 1:
+                user = arg[0]
+                duration = arg[1]
+                if not duration.isdigit():
+                    duration = ''
+            else:
+                user = arg[0]
+                duration = ''
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                self.game.send_rcon("mute %d %s" % (victim.get_player_num(), duration))
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['mute']['syntax'])
 
-            # bigtext - display big message on screen
-            elif sar['command'] == '!bigtext' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['bigtext']['level']:
-                if line.split(sar['command'])[1]:
-                    self.game.rcon_bigtext("%s" % line.split(sar['command'])[1].strip())
+    def cmd_seen(self, sar, line):
+        """
+        display when a player was last seen
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                if victim.get_registered_user():
+                    self.game.rcon_tell(sar['player_num'], "^3%s ^7was last seen on %s" % (victim.get_name(), victim.get_last_visit()))
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['bigtext']['syntax'])
+                    self.game.rcon_tell(sar['player_num'], "^3%s ^7is not a registered user" % victim.get_name())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['seen']['syntax'])
 
-            # say - say a message to all players
-            elif sar['command'] == '!say' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['say']['level']:
-                if line.split(sar['command'])[1]:
-                    self.game.rcon_say("^2%s: ^7%s" % (self.game.players[sar['player_num']].get_name(), line.split(sar['command'])[1].strip()))
+    def cmd_shuffleteams(self, sar, line):
+        """
+        shuffle the teams
+        """
+        if not self.ffa_lms_gametype:
+            self.game.send_rcon('shuffleteams')
+            CLOCK.sleep(1)
+            self.game.send_rcon('exec shuffle.cfg')
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7Command is disabled for this game mode")
+
+    def cmd_warninfo(self, sar, line):
+        """
+        display how many warnings a player has
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                # clear if already expired
+                if victim.get_last_warn_time() + self.warn_expiration < CLOCK.time():
+                    victim.clear_warning()
+                warn_count = victim.get_warning()
+                warn_time = int(math.ceil(float(victim.get_last_warn_time() + self.warn_expiration - CLOCK.time()) / 60))
+                self.game.rcon_tell(sar['player_num'], "^1%s ^7has ^3%s ^7active warning%s%s" % (victim.get_name(), warn_count if warn_count > 0 else 'no', 's' if warn_count > 1 else '', ", expires in ^1%s ^7minute%s: ^3%s" % (warn_time, "s" if warn_time > 1 else "", ", ^3".join(victim.get_all_warn_msg())) if warn_count > 0 else ''))
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['warninfo']['syntax'])
+
+    def cmd_warn(self, sar, line):
+        """
+        warn player
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if arg:
+                user = arg[0]
+                reason = ' '.join(arg[1:])[:40].strip() if len(arg) > 1 else 'behave yourself'
+                found, victim, msg = self.player_found(user)
+                if not found:
+                    self.game.rcon_tell(sar['player_num'], msg)
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['say']['syntax'])
-
-            # !!<text> - allow spectator to say a message to players in-game
-            elif sar['command'].startswith('!!') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['say']['level']:
-                if line.split('!!')[1]:
-                    self.game.rcon_say("^2%s: ^7%s" % (self.game.players[sar['player_num']].get_name(), line.split('!!', 1)[1].strip()))
-
-            # tell - tell a message to a specific player - !tell <name|id> <text>
-            elif sar['command'] == '!tell' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['tell']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if len(arg) > 1:
-                        user = arg[0]
-                        message = ' '.join(arg[1:]).strip()
-                        found, victim, msg = self.player_found(user)
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], msg)
-                        else:
-                            self.game.rcon_tell(victim.get_player_num(), "^4%s: ^7%s" % (self.game.players[sar['player_num']].get_name(), message))
+                    warn_delay = 5
+                    if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                        self.game.rcon_tell(sar['player_num'], "^3You cannot warn an admin")
+                    elif victim.get_last_warn_time() + warn_delay > CLOCK.time():
+                        self.game.rcon_tell(sar['player_num'], "^3Only one warning per %d seconds can be issued" % warn_delay)
                     else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['tell']['syntax'])
+                        # clear if already expired
+                        if victim.get_last_warn_time() + self.warn_expiration < CLOCK.time():
+                            victim.clear_warning()
+                        show_alert = False
+                        ban_duration = 0
+                        if victim.get_warning() > 4:
+                            self.game.kick_player(victim.get_player_num(), reason='too many warnings')
+                            msg = "^1%s ^7was kicked, too many warnings" % victim.get_name()
+                        else:
+                            if reason in REASONS:
+                                warning = REASONS[reason]
+                                if reason == 'tk' and victim.get_warning() > 1:
+                                    ban_duration = victim.add_ban_point('tk, ban by %s' % self.game.players[sar['player_num']].get_name(), 1800)
+                                elif reason == 'lang' and victim.get_warning() > 1:
+                                    ban_duration = victim.add_ban_point('lang', 300)
+                                elif reason == 'spam' and victim.get_warning() > 1:
+                                    ban_duration = victim.add_ban_point('spam', 300)
+                                elif reason == 'racism' and victim.get_warning() > 1:
+                                    ban_duration = victim.add_ban_point('racism', 300)
+                            else:
+                                warning = reason
+                            victim.add_warning(warning)
+                            msg = "^1WARNING ^7[^3%d^7]: ^3%s^7: %s" % (victim.get_warning(), victim.get_name(), warning)
+                            # ban player if needed
+                            if ban_duration > 0:
+                                msg = "^1%s ^7banned for ^3%d minutes ^7for too many warnings" % (victim.get_name(), ban_duration)
+                                self.game.kick_player(victim.get_player_num(), reason='too many warnings')
+                            # show alert message for player with 3 warnings
+                            elif victim.get_warning() == 4:
+                                show_alert = True
+                        self.game.rcon_say(msg)
+                        if show_alert:
+                            self.game.rcon_say("^1ALERT: ^3%s ^7auto-kick from warnings if not cleared" % victim.get_name())
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['warn']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['warn']['syntax'])
+
+    def cmd_warnremove(self, sar, line):
+        """
+        remove a player's last warning
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                last_warning = victim.clear_last_warning()
+                if last_warning:
+                    self.game.rcon_say("^7Last warning removed for %s: ^3%s" % (victim.get_name(), last_warning))
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['tell']['syntax'])
+                    self.game.rcon_tell(sar['player_num'], "^3%s ^7has no active warning" % victim.get_name())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['warnremove']['syntax'])
+
+    def cmd_warns(self, sar, line):
+        """
+        list the warnings
+        """
+        keylist = REASONS.keys()
+        keylist.sort()
+        self.game.rcon_tell(sar['player_num'], "^7Warnings: ^3%s" % ", ^3".join([key for key in keylist]))
+
+    def cmd_warntest(self, sar, line):
+        """
+        test a warning
+        """
+        if line.split(sar['command'])[1]:
+            reason = line.split(sar['command'])[1].strip()
+            warning = REASONS[reason] if reason in REASONS else reason
+        else:
+            warning = 'behave yourself'
+        self.game.rcon_tell(sar['player_num'], "^1TEST: ^1WARNING ^7[^31^7]: ^4%s" % warning)
+
+    def cmd_admins(self, sar, line):
+        """
+        list all the online admins
+        """
+        msg = self.get_admins_online()
+        self.tell_say_message(sar, msg)
 
-            elif sar['command'] == '!exit' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['exit']['level']:
-                msg = "^3Last disconnected player: ^7%s" % self.last_disconnected_player.get_name() if self.last_disconnected_player else "^3No player left during this match"
+    def cmd_regulars(self, sar, line):
+        """
+        display the regular players online
+        """
+        liste = "%s" % ", ".join(["^3%s^7 [^3%d^7]" % (player.get_name(), player.get_admin_role()) for player in self.game.players.itervalues() if player.get_admin_role() == 2])
+        msg = "^7Regulars online: %s" % liste if liste else "^7No regulars online"
+        self.tell_say_message(sar, msg)
+
+    def cmd_aliases(self, sar, line):
+        """
+        list the aliases of a player
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
                 self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                msg = "^7Aliases of ^5%s: ^3%s" % (victim.get_name(), victim.get_aliases())
+                self.tell_say_message(sar, msg)
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['aliases']['syntax'])
 
-            # find - display the slot number of the player
-            elif sar['command'] == '!find' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['find']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
+    def cmd_bigtext(self, sar, line):
+        """
+        display big message on screen
+        """
+        if line.split(sar['command'])[1]:
+            self.game.rcon_bigtext("%s" % line.split(sar['command'])[1].strip())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['bigtext']['syntax'])
+
+    def cmd_say(self, sar, line):
+        """
+        say a message to all players
+        """
+        if line.split(sar['command'])[1]:
+            self.game.rcon_say("^2%s: ^7%s" % (self.game.players[sar['player_num']].get_name(), line.split(sar['command'])[1].strip()))
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['say']['syntax'])
+
+    def cmd_say_short(self, sar, line):
+        """
+        say a message to all players with !!<text>, allows spectators to talk to the players in-game
+        """
+        if line.split('!!')[1]:
+            self.game.rcon_say("^2%s: ^7%s" % (self.game.players[sar['player_num']].get_name(), line.split('!!', 1)[1].strip()))
+
+    def cmd_tell(self, sar, line):
+        """
+        tell a message to a specific player
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if len(arg) > 1:
+                user = arg[0]
+                message = ' '.join(arg[1:]).strip()
+                found, victim, msg = self.player_found(user)
+                if not found:
                     self.game.rcon_tell(sar['player_num'], msg)
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['find']['syntax'])
+                    self.game.rcon_tell(victim.get_player_num(), "^4%s: ^7%s" % (self.game.players[sar['player_num']].get_name(), message))
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['tell']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['tell']['syntax'])
 
-            # afk - force a player to spec, because he is away from keyboard - !afk <name>
-            elif sar['command'] == '!afk' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['afk']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].split()[0]
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        self.game.rcon_forceteam(victim.get_player_num(), 'spectator')
+    def cmd_exit(self, sar, line):
+        """
+        display last disconnected player
+        """
+        msg = "^3Last disconnected player: ^7%s" % self.last_disconnected_player.get_name() if self.last_disconnected_player else "^3No player left during this match"
+        self.game.rcon_tell(sar['player_num'], msg)
+
+    def cmd_find(self, sar, line):
+        """
+        display the slot number of a player
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            self.game.rcon_tell(sar['player_num'], msg)
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['find']['syntax'])
+
+    def cmd_afk(self, sar, line):
+        """
+        force a player to spec, because he is away from keyboard
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].split()[0]
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                self.game.rcon_forceteam(victim.get_player_num(), 'spectator')
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['afk']['syntax'])
+
+    def cmd_force(self, sar, line):
+        """
+        force a player to the given team
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if len(arg) > 1:
+                user = arg[0]
+                team = arg[1]
+                lock = False
+                if len(arg) > 2:
+                    lock = True if arg[2] == 'lock' else False
+                team_dict = {'red': 'red', 'r': 'red', 're': 'red',
+                             'blue': 'blue', 'b': 'blue', 'bl': 'blue', 'blu': 'blue',
+                             'spec': 'spectator', 'spectator': 'spectator', 's': 'spectator', 'sp': 'spectator', 'spe': 'spectator',
+                             'green': 'green'}
+                found, victim, msg = self.player_found(user)
+                if not found:
+                    self.game.rcon_tell(sar['player_num'], msg)
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['afk']['syntax'])
-
-            # force - force a player to the given team
-            elif sar['command'] == '!force' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['force']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if len(arg) > 1:
-                        user = arg[0]
-                        team = arg[1]
-                        lock = False
-                        if len(arg) > 2:
-                            lock = True if arg[2] == 'lock' else False
-                        team_dict = {'red': 'red', 'r': 'red', 're': 'red',
-                                     'blue': 'blue', 'b': 'blue', 'bl': 'blue', 'blu': 'blue',
-                                     'spec': 'spectator', 'spectator': 'spectator', 's': 'spectator', 'sp': 'spectator', 'spe': 'spectator',
-                                     'green': 'green'}
-                        found, victim, msg = self.player_found(user)
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], msg)
+                    if team in team_dict and victim.get_ip_address() != '0.0.0.0':
+                        victim_player_num = victim.get_player_num()
+                        self.game.rcon_forceteam(victim_player_num, team_dict[team])
+                        self.game.rcon_tell(victim_player_num, "^3You are forced to: ^7%s" % team_dict[team])
+                        # set team lock if defined
+                        if lock:
+                            victim.set_team_lock(team_dict[team])
                         else:
-                            if team in team_dict and victim.get_ip_address() != '0.0.0.0':
-                                victim_player_num = victim.get_player_num()
-                                self.game.rcon_forceteam(victim_player_num, team_dict[team])
-                                self.game.rcon_tell(victim_player_num, "^3You are forced to: ^7%s" % team_dict[team])
-                                # set team lock if defined
-                                if lock:
-                                    victim.set_team_lock(team_dict[team])
-                                else:
-                                    victim.set_team_lock(None)
-                            # release the player from a forced team
-                            elif team == "free":
-                                victim.set_team_lock(None)
-                            else:
-                                self.game.rcon_tell(sar['player_num'], COMMANDS['force']['syntax'])
+                            victim.set_team_lock(None)
+                    # release the player from a forced team
+                    elif team == "free":
+                        victim.set_team_lock(None)
                     else:
                         self.game.rcon_tell(sar['player_num'], COMMANDS['force']['syntax'])
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['force']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['force']['syntax'])
+
+    def cmd_nuke(self, sar, line):
+        """
+        nuke a player
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].split()[0]
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                    self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to nuke an admin")
+                else:
+                    self.game.send_rcon("nuke %d" % victim.get_player_num())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['nuke']['syntax'])
+
+    def cmd_kick(self, sar, line):
+        """
+        kick a player
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if self.game.players[sar['player_num']].get_admin_role() >= 80 and len(arg) == 1:
+                user = arg[0]
+                reason = '.'
+            elif len(arg) > 1:
+                user = arg[0]
+                reason = ' '.join(arg[1:])[:40].strip()
+            else:
+                user = reason = None
+            if user and reason:
+                found, victim, msg = self.player_found(user)
+                if not found:
+                    self.game.rcon_tell(sar['player_num'], msg)
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['force']['syntax'])
+                    if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                        self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to kick an admin")
+                    else:
+                        msg = "^1%s ^7was kicked by %s" % (victim.get_name(), self.game.players[sar['player_num']].get_name())
+                        if reason in REASONS:
+                            kick_reason = REASONS[reason]
+                            msg = "%s: ^3%s" % (msg, kick_reason)
+                        elif reason == '.':
+                            kick_reason = ''
+                        else:
+                            kick_reason = reason
+                            msg = "%s: ^3%s" % (msg, kick_reason)
+                        self.game.kick_player(victim.get_player_num(), reason=kick_reason)
+                        self.game.rcon_say(msg)
+            else:
+                self.game.rcon_tell(sar['player_num'], "^7You need to enter a reason: ^3!kick <name> <reason>")
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['kick']['syntax'])
+
+    def cmd_warnclear(self, sar, line):
+        """
+        clear the player warnings
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                victim.clear_warning()
+                for player in self.game.players.itervalues():
+                    player.clear_tk(victim.get_player_num())
+                self.game.rcon_say("^1All^7 warnings and team kills cleared for ^3%s" % victim.get_name())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['warnclear']['syntax'])
 
-            # nuke - nuke a player
-            elif sar['command'] == '!nuke' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['nuke']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].split()[0]
+    def cmd_tempban(self, sar, line):
+        """
+        ban a player temporary for the given period
+        """
+        if not self.auth_status or self.game.players[sar['player_num']].get_authname():
+            if line.split(sar['command'])[1]:
+                arg = line.split(sar['command'])[1].split()
+                if len(arg) > 1:
+                    user = arg[0]
+                    duration, duration_output = self.convert_time(arg[1])
+                    reason = ' '.join(arg[2:])[:40].strip() if len(arg) > 2 else 'tempban'
+                    kick_reason = REASONS[reason] if reason in REASONS else '' if reason == 'tempban' else reason
                     found, victim, msg = self.player_found(user)
                     if not found:
                         self.game.rcon_tell(sar['player_num'], msg)
                     else:
                         if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                            self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to nuke an admin")
+                            self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to ban an admin")
                         else:
-                            self.game.send_rcon("nuke %d" % victim.get_player_num())
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['nuke']['syntax'])
-
-            # kick - kick a player
-            elif (sar['command'] == '!kick' or sar['command'] == '!k') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['kick']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if self.game.players[sar['player_num']].get_admin_role() >= 80 and len(arg) == 1:
-                        user = arg[0]
-                        reason = '.'
-                    elif len(arg) > 1:
-                        user = arg[0]
-                        reason = ' '.join(arg[1:])[:40].strip()
-                    else:
-                        user = reason = None
-                    if user and reason:
-                        found, victim, msg = self.player_found(user)
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], msg)
-                        else:
-                            if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                                self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to kick an admin")
-                            else:
-                                msg = "^1%s ^7was kicked by %s" % (victim.get_name(), self.game.players[sar['player_num']].get_name())
-                                if reason in REASONS:
-                                    kick_reason = REASONS[reason]
+                            if victim.ban(duration=duration, reason=reason, admin=self.game.players[sar['player_num']].get_name(), adminauth=self.game.players[sar['player_num']].get_authname()):
+                                msg = "^3%s  ^1banned ^7for ^3%s ^7by %s" % (victim.get_name(), duration_output, self.game.players[sar['player_num']].get_name())
+                                if kick_reason:
                                     msg = "%s: ^3%s" % (msg, kick_reason)
-                                elif reason == '.':
-                                    kick_reason = ''
-                                else:
-                                    kick_reason = reason
-                                    msg = "%s: ^3%s" % (msg, kick_reason)
-                                self.game.kick_player(victim.get_player_num(), reason=kick_reason)
                                 self.game.rcon_say(msg)
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^7You need to enter a reason: ^3!kick <name> <reason>")
+                            else:
+                                self.game.rcon_tell(sar['player_num'], "^7This player has already a longer ban")
+                            self.game.kick_player(player_num=victim.get_player_num(), reason=kick_reason)
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['kick']['syntax'])
+                    self.game.rcon_tell(sar['player_num'], "^7You need to enter a duration: ^3!tempban <name> <duration> [<reason>]")
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['tempban']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You are not ^3Authenticated!^7 if ^2Auth^7 is down try again in a few mins ")
 
-            # warnclear - clear the user warnings
-            elif (sar['command'] == '!warnclear' or sar['command'] == '!wc') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['warnclear']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
+    def cmd_demo(self, sar, line):
+        """
+        Record a serverside demo of given player
+        """
+        if not self.auth_status or self.game.players[sar['player_num']].get_authname():
+            if line.split(sar['command'])[1]:
+                arg = line.split(sar['command'])[1].split()
+                if len(arg) > 1:
+                    user = arg[0]
+                    mode = arg[1]
                     found, victim, msg = self.player_found(user)
                     if not found:
                         self.game.rcon_tell(sar['player_num'], msg)
                     else:
-                        victim.clear_warning()
-                        for player in self.game.players.itervalues():
-                            player.clear_tk(victim.get_player_num())
-                        self.game.rcon_say("^1All^7 warnings and team kills cleared for ^3%s" % victim.get_name())
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['warnclear']['syntax'])
-
-            # tempban - ban a player temporary for the given period
-            elif (sar['command'] == '!tempban' or sar['command'] == '!tb') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['tempban']['level']:
-                if not self.auth_status or self.game.players[sar['player_num']].get_authname():
-                    if line.split(sar['command'])[1]:
-                        arg = line.split(sar['command'])[1].split()
-                        if len(arg) > 1:
-                            user = arg[0]
-                            duration, duration_output = self.convert_time(arg[1])
-                            reason = ' '.join(arg[2:])[:40].strip() if len(arg) > 2 else 'tempban'
-                            kick_reason = REASONS[reason] if reason in REASONS else '' if reason == 'tempban' else reason
-                            found, victim, msg = self.player_found(user)
-                            if not found:
-                                self.game.rcon_tell(sar['player_num'], msg)
-                            else:
-                                if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                                    self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to ban an admin")
-                                else:
-                                    if victim.ban(duration=duration, reason=reason, admin=self.game.players[sar['player_num']].get_name(), adminauth=self.game.players[sar['player_num']].get_authname()):
-                                        msg = "^3%s  ^1banned ^7for ^3%s ^7by %s" % (victim.get_name(), duration_output, self.game.players[sar['player_num']].get_name())
-                                        if kick_reason:
-                                            msg = "%s: ^3%s" % (msg, kick_reason)
-                                        self.game.rcon_say(msg)
-                                    else:
-                                        self.game.rcon_tell(sar['player_num'], "^7This player has already a longer ban")
-                                    self.game.kick_player(player_num=victim.get_player_num(), reason=kick_reason)
-                        else:
-                            self.game.rcon_tell(sar['player_num'], "^7You need to enter a duration: ^3!tempban <name> <duration> [<reason>]")
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['tempban']['syntax'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7You are not ^3Authenticated!^7 if ^2Auth^7 is down try again in a few mins ")
-                    
-            # serverside demos
-            elif sar['command'] == '!demo' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['demo']['level']:
-                if not self.auth_status or self.game.players[sar['player_num']].get_authname():
-                    if line.split(sar['command'])[1]:
-                        arg = line.split(sar['command'])[1].split()
-                        if len(arg) > 1:
-                            user = arg[0]
-                            mode = arg[1]
-                            found, victim, msg = self.player_found(user)
-                            if not found:
-                                self.game.rcon_tell(sar['player_num'], msg)
-                            else:
-                                player_num = victim.get_player_num()
-                                name = victim.get_name()
-                                if 'start' in mode:
-                                    self.game.send_rcon('startserverdemo %s' % (player_num))
-                                    self.game.rcon_tell(sar['player_num'], "^7Recording of %s  ^2Enabled!^7" % (name))
-                                elif 'stop' in mode:
-                                    self.game.send_rcon('stopserverdemo %s' % (player_num))
-                                    self.game.rcon_tell(sar['player_num'], "^7Recording of %s  ^1Disabled!^7" % (name))
-                                elif 'stopall' in mode:
-                                    self.game.send_rcon('stopserverdemo all')
-                                    self.game.rcon_tell(sar['player_num'], "^7Disabling ^1All ^7 demo recordings")
-                                else:
-                                    self.game.rcon_tell(sar['player_num'], COMMANDS['demo']['syntax'])
+                        player_num = victim.get_player_num()
+                        name = victim.get_name()
+                        if 'start' in mode:
+                            self.game.send_rcon('startserverdemo %s' % (player_num))
+                            self.game.rcon_tell(sar['player_num'], "^7Recording of %s  ^2Enabled!^7" % (name))
+                        elif 'stop' in mode:
+                            self.game.send_rcon('stopserverdemo %s' % (player_num))
+                            self.game.rcon_tell(sar['player_num'], "^7Recording of %s  ^1Disabled!^7" % (name))
+                        elif 'stopall' in mode:
+                            self.game.send_rcon('stopserverdemo all')
+                            self.game.rcon_tell(sar['player_num'], "^7Disabling ^1All ^7 demo recordings")
                         else:
                             self.game.rcon_tell(sar['player_num'], COMMANDS['demo']['syntax'])
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['tempban']['syntax'])
                 else:
-                    self.game.rcon_tell(sar['player_num'], "^7You are not ^3Authenticated!^7 if ^2Auth^7 is down try again in a few mins ")
-## full admin level 60
+                    self.game.rcon_tell(sar['player_num'], COMMANDS['demo']['syntax'])
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['tempban']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7You are not ^3Authenticated!^7 if ^2Auth^7 is down try again in a few mins ")
 
-            # !forgiveinfo <name> - display a player's team kills
-            elif (sar['command'] == '!forgiveinfo' or sar['command'] == '!fi') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['forgiveinfo']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        tks = len(victim.get_tk_victim_names())
-                        self.game.rcon_tell(sar['player_num'], "^3%s ^7killed ^1%s ^7teammate%s" % (victim.get_name(), tks, 's' if tks > 1 else '') if tks > 0 else "^3%s ^7has not killed teammates" % victim.get_name())
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['forgiveinfo']['syntax'])
+    def cmd_forgiveinfo(self, sar, line):
+        """
+        display a player's team kills
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                tks = len(victim.get_tk_victim_names())
+                self.game.rcon_tell(sar['player_num'], "^3%s ^7killed ^1%s ^7teammate%s" % (victim.get_name(), tks, 's' if tks > 1 else '') if tks > 0 else "^3%s ^7has not killed teammates" % victim.get_name())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['forgiveinfo']['syntax'])
 
-            # !forgiveclear [<name>] - clear a player's team kills
-            elif (sar['command'] == '!forgiveclear' or sar['command'] == '!fc') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['forgiveclear']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        victim.clear_all_killed_me()
-                        for player in self.game.players.itervalues():
-                            player.clear_tk(victim.get_player_num())
-                        self.game.rcon_say("^1All^7 team kills cleared for ^3%s" % victim.get_name())
-                else:
-                    for player in self.game.players.itervalues():
-                        player.clear_all_tk()
-                        player.clear_all_killed_me()
-                    self.game.rcon_say("^1All player team kills cleared")
-                    
-            # id - show the IP, guid and authname of a player - !id <name>
-            elif sar['command'] == '!id' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['id']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        msg = "^7[^1@%s^7] %s ^3%s ^7[^3%s^7] since ^3%s" % (victim.get_player_id(), victim.get_name(), victim.get_ip_address(), victim.get_authname() if victim.get_authname() else "---", victim.get_first_seen_date())
-                        self.game.rcon_tell(sar['player_num'], msg)
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['id']['syntax'])
+    def cmd_forgiveclear(self, sar, line):
+        """
+        clear a player's team kills
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                victim.clear_all_killed_me()
+                for player in self.game.players.itervalues():
+                    player.clear_tk(victim.get_player_num())
+                self.game.rcon_say("^1All^7 team kills cleared for ^3%s" % victim.get_name())
+        else:
+            for player in self.game.players.itervalues():
+                player.clear_all_tk()
+                player.clear_all_killed_me()
+            self.game.rcon_say("^1All player team kills cleared")
 
-            # !kickbots - kick all bots
-            elif (sar['command'] == '!kickbots' or sar['command'] == '!kb') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['kickbots']['level']:
-                self.game.send_rcon('kick allbots')
+    def cmd_id(self, sar, line):
+        """
+        show the IP, guid and authname of a player
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                msg = "^7[^1@%s^7] %s ^3%s ^7[^3%s^7] since ^3%s" % (victim.get_player_id(), victim.get_name(), victim.get_ip_address(), victim.get_authname() if victim.get_authname() else "---", victim.get_first_seen_date())
+                self.game.rcon_tell(sar['player_num'], msg)
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['id']['syntax'])
+
+    def cmd_kickbots(self, sar, line):
+        """
+        kick all bots
+        """
+        self.game.send_rcon('kick allbots')
+
+    def cmd_scream(self, sar, line):
+        """
+        scream a message in different colors to all players
+        """
+        if line.split(sar['command'])[1]:
+            self.game.rcon_say("^1%s" % line.split(sar['command'])[1].strip())
+            self.game.rcon_say("^2%s" % line.split(sar['command'])[1].strip())
+            self.game.rcon_say("^3%s" % line.split(sar['command'])[1].strip())
+            self.game.rcon_say("^5%s" % line.split(sar['command'])[1].strip())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['scream']['syntax'])
 
-            # scream - scream a message in different colors to all players
-            elif sar['command'] == '!scream' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['scream']['level']:
-                if line.split(sar['command'])[1]:
-                    self.game.rcon_say("^1%s" % line.split(sar['command'])[1].strip())
-                    self.game.rcon_say("^2%s" % line.split(sar['command'])[1].strip())
-                    self.game.rcon_say("^3%s" % line.split(sar['command'])[1].strip())
-                    self.game.rcon_say("^5%s" % line.split(sar['command'])[1].strip())
+    def cmd_slap(self, sar, line):
+        """
+        slap a player (a number of times)
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if len(arg) > 1:
+                user = arg[0]
+                number = arg[1]
+                if not number.isdigit():
+                    number = 1
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['scream']['syntax'])
-
-            # slap - slap a player (a number of times); (1-15 times)
-            elif sar['command'] == '!slap' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['slap']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if len(arg) > 1:
-                        user = arg[0]
-                        number = arg[1]
-                        if not number.isdigit():
-                            number = 1
-                        else:
-                            number = int(number)
-                        if number > 15:
-                            number = 15
-                    else:
-                        user = arg[0]
-                        number = 1
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                            self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to slap an admin")
-                        else:
-                            for _ in xrange(0, number):
-                                self.game.send_rcon("slap %d" % victim.get_player_num())
+                    number = int(number)
+                if number > 15:
+                    number = 15
+            else:
+                user = arg[0]
+                number = 1
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                    self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to slap an admin")
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['slap']['syntax'])
+                    for _ in xrange(0, number):
+                        self.game.send_rcon("slap %d" % victim.get_player_num())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['slap']['syntax'])
 
-            # swap - swap teams for player 1 and 2 (if in different teams)
-            elif sar['command'] == '!swap' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['swap']['level']:
-                if not self.ffa_lms_gametype:
-                    if line.split(sar['command'])[1]:
-                        arg = line.split(sar['command'])[1].split()
-                        # swap given player(s)
-                        if len(arg) >= 1:
-                            found1, victim1, _ = self.player_found(arg[0])
-                            found2, victim2, _ = (True, self.game.players[sar['player_num']], "") if len(arg) == 1 else self.player_found(arg[1])
-                            if not found1 or not found2:
-                                self.game.rcon_tell(sar['player_num'], '^3Player not found')
-                            else:
-                                team1 = victim1.get_team()
-                                team2 = victim2.get_team()
-                                if team1 == team2:
-                                    self.game.rcon_tell(sar['player_num'], "^7Cannot swap, both players are in the same team")
-                                else:
-                                    game_data = self.game.get_gamestats()
-                                    # remove team lock
-                                    victim1.set_team_lock(None)
-                                    victim2.set_team_lock(None)
-                                    if game_data[Player.teams[team1]] < game_data[Player.teams[team2]]:
-                                        self.game.rcon_forceteam(victim2.get_player_num(), Player.teams[team1])
-                                        self.game.rcon_forceteam(victim1.get_player_num(), Player.teams[team2])
-                                    else:
-                                        self.game.rcon_forceteam(victim1.get_player_num(), Player.teams[team2])
-                                        self.game.rcon_forceteam(victim2.get_player_num(), Player.teams[team1])
-                                    self.game.rcon_say('^7Swapped player ^3%s ^7with ^3%s' % (victim1.get_name(), victim2.get_name()))
-                        else:
-                            self.game.rcon_tell(sar['player_num'], COMMANDS['swap']['syntax'])
+    def cmd_swap(self, sar, line):
+        """
+        swap teams for player A and B
+        """
+        if not self.ffa_lms_gametype:
+            if line.split(sar['command'])[1]:
+                arg = line.split(sar['command'])[1].split()
+                # swap given player(s)
+                if len(arg) >= 1:
+                    found1, victim1, _ = self.player_found(arg[0])
+                    found2, victim2, _ = (True, self.game.players[sar['player_num']], "") if len(arg) == 1 else self.player_found(arg[1])
+                    if not found1 or not found2:
+                        self.game.rcon_tell(sar['player_num'], '^3Player not found')
                     else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['swap']['syntax'])
+                        team1 = victim1.get_team()
+                        team2 = victim2.get_team()
+                        if team1 == team2:
+                            self.game.rcon_tell(sar['player_num'], "^7Cannot swap, both players are in the same team")
+                        else:
+                            game_data = self.game.get_gamestats()
+                            # remove team lock
+                            victim1.set_team_lock(None)
+                            victim2.set_team_lock(None)
+                            # the smaller team receives its player first
+                            moves = ['forceteam %d %s' % (victim2.get_player_num(), Player.teams[team1]), 'forceteam %d %s' % (victim1.get_player_num(), Player.teams[team2])]
+                            if game_data[Player.teams[team1]] >= game_data[Player.teams[team2]]:
+                                moves.reverse()
+                            self.game.send_rcon_group('swap', moves)
+                            self.game.rcon_say('^7Swapped player ^3%s ^7with ^3%s' % (victim1.get_name(), victim2.get_name()))
                 else:
-                    self.game.rcon_tell(sar['player_num'], "^7Command is disabled for this game mode")
+                    self.game.rcon_tell(sar['player_num'], COMMANDS['swap']['syntax'])
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['swap']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7Command is disabled for this game mode")
 
-            # veto - stop voting process
-            elif sar['command'] == '!veto' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['veto']['level']:
-                self.game.send_rcon('veto')
+    def cmd_veto(self, sar, line):
+        """
+        stop voting process
+        """
+        self.game.send_rcon('veto')
 
-            # ci - kick player with connection interrupted
-            elif sar['command'] == '!ci' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['ci']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
+    def cmd_ci(self, sar, line):
+        """
+        kick player with connection interrupt
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                # update rcon status, the ping is checked when the server has responded
+                def kick_interrupted(players):
+                    if self.game.players.get(victim.get_player_num()) is not victim:
+                        return
                     player_ping = 0
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
+                    for player in players or []:
+                        if victim.get_player_num() == player.num:
+                            player_ping = player.ping
+                    if player_ping == 999:
+                        self.game.kick_player(victim.get_player_num(), reason='connection interrupted, try to reconnect')
+                        self.game.rcon_say("^1%s ^7was kicked: ^3connection interrupted" % (victim.get_name()))
                     else:
-                        # update rcon status
-                        self.game.quake.rcon_update()
-                        for player in self.game.quake.players:
-                            if victim.get_player_num() == player.num:
-                                player_ping = player.ping
-                        if player_ping == 999:
-                            self.game.kick_player(victim.get_player_num(), reason='connection interrupted, try to reconnect')
-                            self.game.rcon_say("^1%s ^7was kicked: ^3connection interrupted" % (victim.get_name()))
-                        else:
-                            self.game.rcon_tell(sar['player_num'], "^3%s has no connection interrupted" % victim.get_name())
+                        self.game.rcon_tell(sar['player_num'], "^3%s has no connection interrupted" % victim.get_name())
+                self.game.query_status(callback=kick_interrupted)
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['ci']['syntax'])
+
+    def cmd_ban(self, sar, line):
+        """
+        ban a player for several days
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if len(arg) == 1 and self.game.players[sar['player_num']].get_admin_role() >= 80:
+                user = arg[0]
+                reason = "tempban"
+            elif len(arg) > 1:
+                user = arg[0]
+                reason = ' '.join(arg[1:])[:40].strip()
+            else:
+                user = reason = None
+            if user and reason:
+                found, victim, msg = self.player_found(user)
+                kick_reason = REASONS[reason] if reason in REASONS else '' if reason == 'tempban' else reason
+                if not found:
+                    self.game.rcon_tell(sar['player_num'], msg)
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['ci']['syntax'])
-
-            # ban - ban a player for several days
-            elif (sar['command'] == '!ban' or sar['command'] == '!b') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['ban']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if len(arg) == 1 and self.game.players[sar['player_num']].get_admin_role() >= 80:
-                        user = arg[0]
-                        reason = "tempban"
-                    elif len(arg) > 1:
-                        user = arg[0]
-                        reason = ' '.join(arg[1:])[:40].strip()
+                    if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                        self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to ban an admin")
                     else:
-                        user = reason = None
-                    if user and reason:
-                        found, victim, msg = self.player_found(user)
-                        kick_reason = REASONS[reason] if reason in REASONS else '' if reason == 'tempban' else reason
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], msg)
+                        # ban for given duration in days
+                        if victim.ban(duration=(self.ban_duration * 86400), reason=reason, admin=self.game.players[sar['player_num']].get_name(), adminauth=self.game.players[sar['player_num']].get_authname()):
+                            msg = "^3%s  ^1banned ^7for ^3%d day%s ^7by %s" % (victim.get_name(), self.ban_duration, 's' if self.ban_duration > 1 else '', self.game.players[sar['player_num']].get_name())
+                            if kick_reason:
+                                msg = "%s: ^3%s" % (msg, kick_reason)
+                            self.game.rcon_say(msg)
                         else:
-                            if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                                self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to ban an admin")
-                            else:
-                                # ban for given duration in days
-                                if victim.ban(duration=(self.ban_duration * 86400), reason=reason, admin=self.game.players[sar['player_num']].get_name(), adminauth=self.game.players[sar['player_num']].get_authname()):
-                                    msg = "^3%s  ^1banned ^7for ^3%d day%s ^7by %s" % (victim.get_name(), self.ban_duration, 's' if self.ban_duration > 1 else '', self.game.players[sar['player_num']].get_name())
-                                    if kick_reason:
-                                        msg = "%s: ^3%s" % (msg, kick_reason)
-                                    self.game.rcon_say(msg)
-                                else:
-                                    self.game.rcon_tell(sar['player_num'], "^7This player has already a longer ban")
-                                self.game.kick_player(player_num=victim.get_player_num(), reason=kick_reason)
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^7You need to enter a reason: ^3!ban <name> <reason>")
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['ban']['syntax'])
+                            self.game.rcon_tell(sar['player_num'], "^7This player has already a longer ban")
+                        self.game.kick_player(player_num=victim.get_player_num(), reason=kick_reason)
+            else:
+                self.game.rcon_tell(sar['player_num'], "^7You need to enter a reason: ^3!ban <name> <reason>")
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['ban']['syntax'])
 
-            # baninfo - display active bans of a player
-            elif (sar['command'] == '!baninfo' or sar['command'] == '!bi') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['baninfo']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
-                        guid = victim.get_guid()
-                        values = (timestamp, guid)
-                        curs.execute("SELECT `expires` FROM `ban_list` WHERE `expires` > ? AND `guid` = ?", values)
-                        result = curs.fetchone()
-                        if result:
-                            self.game.rcon_tell(sar['player_num'], "^3%s ^7has an active ban until [^1%s^7]" % (victim.get_name(), str(result[0])))
-                        else:
-                            self.game.rcon_tell(sar['player_num'], "^3%s ^7has no active ban" % victim.get_name())
+    def cmd_baninfo(self, sar, line):
+        """
+        display active bans of a player
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time()))
+                guid = victim.get_guid()
+                values = (timestamp, guid)
+                curs.execute("SELECT `expires` FROM `ban_list` WHERE `expires` > ? AND `guid` = ?", values)
+                result = curs.fetchone()
+                if result:
+                    self.game.rcon_tell(sar['player_num'], "^3%s ^7has an active ban until [^1%s^7]" % (victim.get_name(), str(result[0])))
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['baninfo']['syntax'])
-
-## senior admin level 80
-            # !kickall <pattern> [<reason>]- kick all players matching <pattern>
-            elif (sar['command'] == '!kickall' or sar['command'] == '!kall') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['kickall']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    user = arg[0]
-                    reason = ' '.join(arg[1:])[:40].strip() if len(arg) > 1 else ''
-                    if len(user) > 2:
-                        pattern_list = [player for player in self.game.players.itervalues() if user.upper() in player.get_name().upper() and player.get_player_num() != BOT_PLAYER_NUM]
-                        if pattern_list:
-                            for player in pattern_list:
-                                if player.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                                    self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to kick an admin")
-                                else:
-                                    self.game.kick_player(player.get_player_num(), reason)
+                    self.game.rcon_tell(sar['player_num'], "^3%s ^7has no active ban" % victim.get_name())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['baninfo']['syntax'])
+
+    def cmd_kickall(self, sar, line):
+        """
+        kick all players matching pattern
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            user = arg[0]
+            reason = ' '.join(arg[1:])[:40].strip() if len(arg) > 1 else ''
+            if len(user) > 2:
+                pattern_list = self.game.player_index.find_partial(user)
+                if pattern_list:
+                    kicks = []
+                    for player in pattern_list:
+                        if player.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                            self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to kick an admin")
                         else:
-                            self.game.rcon_tell(sar['player_num'], "^3No Players found matching %s" % user)
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^3Pattern must be at least 3 characters long")
+                            kicks.append(self.game.get_kick_command(player.get_player_num(), reason))
+                    self.game.send_rcon_group('kickall', kicks, RCON_ENFORCE)
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['kickall']['syntax'])
-
-            # !banall <pattern> [<reason>]- ban all players matching <pattern>
-            elif (sar['command'] == '!banall' or sar['command'] == '!ball') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['banall']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    user = arg[0]
-                    reason = ' '.join(arg[1:])[:40].strip() if len(arg) > 1 else 'tempban'
-                    if len(user) > 2:
-                        pattern_list = [player for player in self.game.players.itervalues() if user.upper() in player.get_name().upper() and player.get_player_num() != BOT_PLAYER_NUM]
-                        if pattern_list:
-                            for player in pattern_list:
-                                if player.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                                    self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to ban an admin")
-                                else:
-                                    player.ban(duration=(self.ban_duration * 86400), reason=reason, admin=self.game.players[sar['player_num']].get_name(), adminauth=self.game.players[sar['player_num']].get_authname())
-                                    self.game.rcon_say("^1%s ^7banned ^7for ^3%d day%s ^7by %s" % (player.get_name(), self.ban_duration, 's' if self.ban_duration > 1 else '', self.game.players[sar['player_num']].get_name()))
+                    self.game.rcon_tell(sar['player_num'], "^3No Players found matching %s" % user)
+            else:
+                self.game.rcon_tell(sar['player_num'], "^3Pattern must be at least 3 characters long")
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['kickall']['syntax'])
+
+    def cmd_banall(self, sar, line):
+        """
+        ban all players matching pattern
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            user = arg[0]
+            reason = ' '.join(arg[1:])[:40].strip() if len(arg) > 1 else 'tempban'
+            if len(user) > 2:
+                pattern_list = self.game.player_index.find_partial(user)
+                if pattern_list:
+                    for player in pattern_list:
+                        if player.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                            self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to ban an admin")
                         else:
-                            self.game.rcon_tell(sar['player_num'], "^3No Players found matching %s" % user)
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^3Pattern must be at least 3 characters long")
+                            player.ban(duration=(self.ban_duration * 86400), reason=reason, admin=self.game.players[sar['player_num']].get_name(), adminauth=self.game.players[sar['player_num']].get_authname())
+                            self.game.rcon_say("^1%s ^7banned ^7for ^3%d day%s ^7by %s" % (player.get_name(), self.ban_duration, 's' if self.ban_duration > 1 else '', self.game.players[sar['player_num']].get_name()))
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['banall']['syntax'])
-
-            # !addbots
-            elif sar['command'] == '!addbots' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['addbots']['level']:
-                self.game.send_rcon('addbot boa 3 blue 50 BOT1')
-                self.game.send_rcon('addbot python 4 blue 50 BOT2')
-                self.game.send_rcon('addbot cheetah 3 red 50 BOT3')
-                self.game.send_rcon('addbot cobra 4 red 50 BOT4')
-
-            # !bots on/off
-            elif sar['command'] == '!bots' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['bots']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    if arg == "on":
-                        self.game.send_rcon('bot_enable 1')
-                        self.game.send_rcon('bot_minplayers 0')
-                        self.game.rcon_tell(sar['player_num'], "^7Bot support: ^2On")
-                        self.game.rcon_tell(sar['player_num'], "^3Map cycle may be required to enable bot support")
-                    elif arg == "off":
-                        self.game.send_rcon('bot_enable 0')
-                        self.game.send_rcon('kick allbots')
-                        self.game.rcon_tell(sar['player_num'], "^7Bot support: ^1Off")
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['bots']['syntax'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['bots']['syntax'])
+                    self.game.rcon_tell(sar['player_num'], "^3No Players found matching %s" % user)
+            else:
+                self.game.rcon_tell(sar['player_num'], "^3Pattern must be at least 3 characters long")
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['banall']['syntax'])
 
-            # kiss - clear all player warnings - !clear [<player>]
-            elif (sar['command'] == '!kiss' or sar['command'] == '!clear') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['kiss']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        victim.clear_warning()
-                        for player in self.game.players.itervalues():
-                            player.clear_tk(victim.get_player_num())
-                        self.game.rcon_say("^1All^7 warnings and team kills cleared for ^3%s" % victim.get_name())
-                else:
-                    for player in self.game.players.itervalues():
-                        player.clear_warning()
-                    self.game.rcon_say("^1All player warnings and team kills cleared")
-
-            # map - load given map
-            elif sar['command'] == '!map' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['map']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    found, newmap, msg = self.map_found(arg)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        self.game.send_rcon('g_nextmap %s' % newmap)
-                        self.game.next_mapname = newmap
-                        self.game.rcon_tell(sar['player_num'], "^7Changing Map to: ^3%s" % newmap)
-                        self.game.send_rcon('cyclemap')
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['map']['syntax'])
+    def cmd_addbots(self, sar, line):
+        """
+        add bots to the game
+        """
+        self.game.send_rcon_group('addbots', ['addbot boa 3 blue 50 BOT1', 'addbot python 4 blue 50 BOT2',
+                                              'addbot cheetah 3 red 50 BOT3', 'addbot cobra 4 red 50 BOT4'])
 
-            # maps - display all available maps
-            elif (sar['command'] == '!maps' or sar['command'] == '@maps') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['maps']['level']:
-                map_list = self.game.get_all_maps()
-                msg = "^7Available Maps [^1%s^7]: ^3%s" % (len(map_list), ', ^3'.join(map_list))
-                self.tell_say_message(sar, msg)
+    def cmd_bots(self, sar, line):
+        """
+        enables or disables bot support
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            if arg == "on":
+                self.game.send_rcon('bot_enable 1')
+                self.game.send_rcon('bot_minplayers 0')
+                self.game.rcon_tell(sar['player_num'], "^7Bot support: ^2On")
+                self.game.rcon_tell(sar['player_num'], "^3Map cycle may be required to enable bot support")
+            elif arg == "off":
+                self.game.send_rcon('bot_enable 0')
+                self.game.send_rcon('kick allbots')
+                self.game.rcon_tell(sar['player_num'], "^7Bot support: ^1Off")
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['bots']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['bots']['syntax'])
 
-            # maprestart - restart the map
-            elif (sar['command'] == '!maprestart' or sar['command'] == '!restart') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['maprestart']['level']:
-                self.game.send_rcon('restart')
-                self.stats_reset()
-
-            # moon - activate Moon mode (low gravity)
-            elif sar['command'] == '!moon' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['moon']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    if arg == "off":
-                        self.game.send_rcon('g_gravity 800')
-                        self.game.rcon_tell(sar['player_num'], "^7Moon mode: ^1Off")
-                    elif arg == "on":
-                        self.game.send_rcon('g_gravity 100')
-                        self.game.rcon_tell(sar['player_num'], "^7Moon mode: ^2On")
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['moon']['syntax'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['moon']['syntax'])
-
-            elif sar['command'] == '!instagib' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['instagib']['level']:
-                if self.urt_modversion >= 43:
-                    if line.split(sar['command'])[1]:
-                        arg = line.split(sar['command'])[1].strip()
-                        if arg == "off":
-                            self.game.send_rcon('g_instagib 0')
-                            self.game.rcon_tell(sar['player_num'], "^7Instagib: ^1Off")
-                            self.game.rcon_tell(sar['player_num'], "^7Instagib changed for next map")
-                        elif arg == "on":
-                            self.game.send_rcon('g_instagib 1')
-                            self.game.rcon_tell(sar['player_num'], "^7Instagib: ^2On")
-                            self.game.rcon_tell(sar['player_num'], "^7Instagib changed for next map")
-                        else:
-                            self.game.rcon_tell(sar['player_num'], COMMANDS['instagib']['syntax'])
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['instagib']['syntax'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7The command ^3!instagib ^7is not supported")
+    def cmd_kiss(self, sar, line):
+        """
+        clear all player warnings
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                victim.clear_warning()
+                for player in self.game.players.itervalues():
+                    player.clear_tk(victim.get_player_num())
+                self.game.rcon_say("^1All^7 warnings and team kills cleared for ^3%s" % victim.get_name())
+        else:
+            for player in self.game.players.itervalues():
+                player.clear_warning()
+            self.game.rcon_say("^1All player warnings and team kills cleared")
 
-            # cyclemap - start next map in rotation
-            elif sar['command'] == '!cyclemap' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['cyclemap']['level']:
+    def cmd_map(self, sar, line):
+        """
+        load given map
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            found, newmap, msg = self.map_found(arg)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                self.game.send_rcon('g_nextmap %s' % newmap)
+                self.game.next_mapname = newmap
+                self.game.rcon_tell(sar['player_num'], "^7Changing Map to: ^3%s" % newmap)
                 self.game.send_rcon('cyclemap')
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['map']['syntax'])
 
-            # setnextmap - set the given map as nextmap
-            elif sar['command'] == '!setnextmap' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['setnextmap']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    found, nextmap, msg = self.map_found(arg)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        self.game.send_rcon('g_nextmap %s' % nextmap)
-                        self.game.next_mapname = nextmap
-                        self.game.rcon_tell(sar['player_num'], "^7Next Map set to: ^3%s" % nextmap)
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['setnextmap']['syntax'])
-
-            # rebuild - sync up all available maps
-            elif sar['command'] == '!rebuild' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['rebuild']['level']:
-                # get full map list
-                self.game.set_all_maps()
-                self.game.rcon_tell(sar['player_num'], "^7Rebuild maps: ^3%s ^7maps found" % len(self.game.get_all_maps()))
-                # set current and next map
-                self.game.set_current_map()
-                self.game.rcon_tell(sar['player_num'], self.get_nextmap())
-
-            # swapteams - swap current teams
-            elif sar['command'] == '!swapteams' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['swapteams']['level']:
-                self.game.send_rcon('swapteams')
-
-            # exec - execute given config file
-            elif sar['command'] == '!exec' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['exec']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    self.game.send_rcon('exec %s' % arg)
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['exec']['syntax'])
-
-            # !gear - set allowed weapons
-            elif sar['command'] == '!gear' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['gear']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    # docs: http://www.urbanterror.info/support/180-server-cvars/#2
-                    if "all" in arg:
-                        self.game.send_rcon('g_gear 0')
-                        self.game.rcon_say("^7Gear: ^1All weapons enabled")
-                    elif "default" in arg:
-                        self.game.send_rcon('g_gear "%s"' % self.default_gear)
-                        self.game.rcon_say("^7Gear: ^1Server defaults enabled")
-                    elif "knife" in arg:
-                        self.game.send_rcon('g_gear "%s"' % 'FGHIJKLMNZacefghijklOQRSTUVWX' if self.urt_modversion > 41 else '63')
-                        self.game.rcon_say("^7Gear: ^1Knife only")
-                    elif "pistol" in arg:
-                        self.game.send_rcon('g_gear "%s"' % 'HIJKLMNZacehijkOQ' if self.urt_modversion > 41 else '55')
-                        self.game.rcon_say("^7Gear: ^1Pistols only")
-                    elif "shotgun" in arg:
-                        self.game.send_rcon('g_gear "%s"' % 'FGIJKLMNZacefghiklOQ' if self.urt_modversion > 41 else '59')
-                        self.game.rcon_say("^7Gear: ^1Shotguns only")
-                    elif "sniper" in arg:
-                        self.game.send_rcon('g_gear "%s"' % 'FGHIJKLMacefghjklOQ' if self.urt_modversion > 41 else '61')
-                        self.game.rcon_say("^7Gear: ^1Sniper rifles only")
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['gear']['syntax'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['gear']['syntax'])
-
-            # kill - kill a player
-            elif sar['command'] == '!kill' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['kill']['level']:
-                if self.urt_modversion > 41:
-                    if line.split(sar['command'])[1]:
-                        user = line.split(sar['command'])[1].strip()
-                        found, victim, msg = self.player_found(user)
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], msg)
-                        else:
-                            if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                                self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to kill an admin")
-                            else:
-                                self.game.send_rcon("smite %d" % victim.get_player_num())
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['kill']['syntax'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7The command ^3!kill ^7is not supported")
-
-            # lookup - search for player in database
-            elif (sar['command'] == '!lookup' or sar['command'] == '!l') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['lookup']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    search = '%' + arg + '%'
-                    lookup = (search,)
-                    result = curs.execute("SELECT `id`,`name`,`time_joined` FROM `player` WHERE `name` like ? ORDER BY `time_joined` DESC LIMIT 8", lookup).fetchall()
-                    for row in result:
-                        self.game.rcon_tell(sar['player_num'], "^7[^1@%s^7] %s ^7[^3%s^7]" % (str(row[0]), str(row[1]), str(row[2])), False)
-                    if not result:
-                        self.game.rcon_tell(sar['player_num'], "^3No Player found matching %s" % arg)
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['lookup']['syntax'])
-
-            # permban - ban a player permanent
-            elif (sar['command'] == '!permban' or sar['command'] == '!pb') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['permban']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if len(arg) > 1:
-                        user = arg[0]
-                        reason = ' '.join(arg[1:])[:40].strip()
-                        found, victim, msg = self.player_found(user)
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], msg)
-                        else:
-                            if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
-                                self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to ban an admin")
-                            else:
-                                # ban for 20 years
-                                victim.ban(duration=630720000, reason=reason, admin=self.game.players[sar['player_num']].get_name(), adminauth=self.game.players[sar['player_num']].get_authname())
-                                self.game.rcon_say("^8%s ^1banned permanently ^7by %s: ^3%s" % (victim.get_name(), self.game.players[sar['player_num']].get_name(), reason))
-                                self.game.kick_player(victim.get_player_num())
-                                # add IP address to bot-banlist.txt
-                                ip = victim.get_ip_address()
-                                ip_address = ''.join(ip.rpartition('.')[:2]) + '0:-1'
-                                with open(os.path.join(HOME, 'bot-banlist.txt'), 'a') as banlist:
-                                    banlist.write("%s // %s banned: %s  reason: %s\n" % (ip_address.ljust(20), victim.get_name().ljust(20), time.strftime("%d/%m/%Y (%H:%M)", time.localtime(time.time())), reason))    
-                    else:
-                        self.game.rcon_tell(sar['player_num'], "^7You need to enter a reason: ^3!permban <name> <reason>")
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['permban']['syntax'])
+    def cmd_maps(self, sar, line):
+        """
+        display all available maps
+        """
+        map_list = self.game.get_all_maps()
+        msg = "^7Available Maps [^1%s^7]: ^3%s" % (len(map_list), ', ^3'.join(map_list))
+        self.tell_say_message(sar, msg)
 
-            # makereg - make a player a regular (Level 2) user
-            elif (sar['command'] == '!makereg' or sar['command'] == '!mr') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['makereg']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        if victim.get_registered_user():
-                            if victim.get_admin_role() < 2:
-                                victim.update_db_admin_role(role=2)
-                                self.game.rcon_tell(sar['player_num'], "^1%s ^7put in group Regular" % victim.get_name())
-                            else:
-                                self.game.rcon_tell(sar['player_num'], "^3%s is already in a higher level group" % victim.get_name())
-                        else:
-                            # register new user in DB and set role to 2
-                            victim.register_user_db(role=2)
-                            self.game.rcon_tell(sar['player_num'], "^1%s ^7put in group Regular" % victim.get_name())
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['makereg']['syntax'])
+    def cmd_maprestart(self, sar, line):
+        """
+        restart the map
+        """
+        self.game.send_rcon('restart')
+        self.stats_reset()
 
-            # !unreg <player> - remove a player from the regular group
-            elif sar['command'] == '!unreg' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['unreg']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        if victim.get_admin_role() == 2:
-                            victim.update_db_admin_role(role=1)
-                            self.game.rcon_tell(sar['player_num'], "^1%s ^7put in group User" % victim.get_name())
-                        else:
-                            self.game.rcon_tell(sar['player_num'], "^3%s is not in the regular group" % victim.get_name())
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['unreg']['syntax'])
-
-            # putgroup - add a client to a group
-            elif sar['command'] == '!putgroup' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['putgroup']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].split()
-                    if len(arg) > 1:
-                        user = arg[0]
-                        right = arg[1]
-                        found, victim, msg = self.player_found(user)
-                        if not found:
-                            self.game.rcon_tell(sar['player_num'], msg)
-                        else:
-                            if victim.get_registered_user():
-                                new_role = victim.get_admin_role()
-                            else:
-                                # register new user in DB and set role to 1
-                                victim.register_user_db(role=1)
-                                new_role = 1
-
-                            if right == "user" and victim.get_admin_role() < 80:
-                                self.game.rcon_tell(sar['player_num'], "^3%s put in group ^7User" % victim.get_name())
-                                new_role = 1
-                            elif "reg" in right and victim.get_admin_role() < 80:
-                                self.game.rcon_tell(sar['player_num'], "^3%s put in group ^7Regular" % victim.get_name())
-                                new_role = 2
-                            elif "mod" in right and victim.get_admin_role() < 80:
-                                self.game.rcon_tell(sar['player_num'], "^3%s added as ^7Moderator" % victim.get_name())
-                                self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^7Moderator")
-                                new_role = 20
-                            elif right == "admin" and victim.get_admin_role() < 80:
-                                self.game.rcon_tell(sar['player_num'], "^3%s added as ^7Admin" % victim.get_name())
-                                self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^7Admin")
-                                new_role = 40
-                            elif "fulladmin" in right and victim.get_admin_role() < 80:
-                                self.game.rcon_tell(sar['player_num'], "^3%s added as ^7Full Admin" % victim.get_name())
-                                self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^7Full Admin")
-                                new_role = 60
-                            # Note: senioradmin level can only be set by head admin or super admin
-                            elif "senioradmin" in right and self.game.players[sar['player_num']].get_admin_role() >= 90 and victim.get_player_num() != sar['player_num']:
-                                self.game.rcon_tell(sar['player_num'], "^3%s added as ^6Senior Admin" % victim.get_name())
-                                self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^6Senior Admin")
-                                new_role = 80
-                            # Note: superadmin level can only be set by head admin
-                            elif "superadmin" in right and self.game.players[sar['player_num']].get_admin_role() == 100 and victim.get_player_num() != sar['player_num']:
-                                self.game.rcon_tell(sar['player_num'], "^3%s added as ^1Super Admin" % victim.get_name())
-                                self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^1Super Admin")
-                                new_role = 90
-                            else:
-                                self.game.rcon_tell(sar['player_num'], "^3Sorry, you cannot put %s in group <%s>" % (victim.get_name(), right))
-                            victim.update_db_admin_role(role=new_role)
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['putgroup']['syntax'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['putgroup']['syntax'])
-
-            # banlist - display the last active 10 bans
-            elif sar['command'] == '!banlist' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['banlist']['level']:
-                values = (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())),)
-                result = curs.execute("SELECT `id`,`name` FROM `ban_list` WHERE `expires` > ? ORDER BY `timestamp` DESC LIMIT 10", values).fetchall()
-                banlist = ['^7[^1@%s^7] %s' % (row[0], row[1]) for row in result]
-                msg = 'Currently no one is banned' if not banlist else str(", ".join(banlist))
-                self.game.rcon_tell(sar['player_num'], "^7Banlist: %s" % msg)
-
-            # lastbans - list the last 4 bans
-            elif (sar['command'] == '!lastbans' or sar['command'] == '!bans') and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['lastbans']['level']:
-                result = curs.execute("SELECT id,name,expires FROM `ban_list` ORDER BY `timestamp` DESC LIMIT 4").fetchall()
-                lastbanlist = ['^3[^1@%s^3] ^7%s ^3(^1%s^3)' % (row[0], row[1], row[2]) for row in result]
-                for item in lastbanlist:
-                    self.game.rcon_tell(sar['player_num'], str(item))
-
-            # unban - unban a player from the database via ID
-            elif sar['command'] == '!unban' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['unban']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip().lstrip('@')
-                    if arg.isdigit():
-                        values = (int(arg),)
-                        curs.execute("SELECT `guid`,`name`,`ip_address` FROM `ban_list` WHERE `id` = ?", values)
-                        result = curs.fetchone()
-                        if result:
-                            guid = result[0]
-                            name = str(result[1])
-                            ip_addr = str(result[2])
-                            curs.execute("DELETE FROM `ban_list` WHERE `id` = ?", values)
-                            conn.commit()
-                            self.game.rcon_tell(sar['player_num'], "^7Player ^1%s ^7unbanned" % name)
-                            values = (guid, ip_addr)
-                            curs.execute("DELETE FROM `ban_list` WHERE `guid` = ? OR ip_address = ?", values)
-                            conn.commit()
-                            self.game.rcon_tell(sar['player_num'], "^7Attempting to remove duplicates of [^1%s^7]" % ip_addr)
-                            ip_address = ''.join(ip_addr.rpartition('.')[:2])
-                            duplicate = 0
-                            with open(os.path.join(HOME, 'bot-banlist.txt'), 'r') as banlist:
-                                lines = banlist.readlines()
-                            with open(os.path.join(HOME, 'bot-banlist.txt'), 'w') as banlist:
-                                for line in lines:
-                                    if line.strip().startswith(ip_address):
-                                        duplicate += 1
-                                        continue
-                                    banlist.write(line)
-                            if duplicate > 0:
-                                self.game.rcon_tell(sar['player_num'], "^2Success!^7 Removed ^3%s^7 duplicate%s." % (duplicate, 's' if duplicate > 1 else ''))
-                            else:
-                                self.game.rcon_tell(sar['player_num'], "^3No duplicates where found")
-                        else:
-                            self.game.rcon_tell(sar['player_num'], "^7Invalid ID, no Player found")
-                    else:
-                        self.game.rcon_tell(sar['player_num'], COMMANDS['unban']['syntax'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['unban']['syntax'])
-
-## head admin level 100 or super admin level 90
-            # password - set private server password
-            elif sar['command'] == '!password' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['password']['level']:
-                if line.split(sar['command'])[1]:
-                    arg = line.split(sar['command'])[1].strip()
-                    self.game.send_rcon('g_password %s' % arg)
-                    self.game.rcon_tell(sar['player_num'], "^7Password set to '%s' - Server is private" % arg)
+    def cmd_moon(self, sar, line):
+        """
+        activate Moon mode (low gravity)
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            if arg == "off":
+                self.game.send_rcon('g_gravity 800')
+                self.game.rcon_tell(sar['player_num'], "^7Moon mode: ^1Off")
+            elif arg == "on":
+                self.game.send_rcon('g_gravity 100')
+                self.game.rcon_tell(sar['player_num'], "^7Moon mode: ^2On")
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['moon']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['moon']['syntax'])
+
+    def cmd_instagib(self, sar, line):
+        """
+        set Instagib mode
+        """
+        if self.urt_modversion >= 43:
+            if line.split(sar['command'])[1]:
+                arg = line.split(sar['command'])[1].strip()
+                if arg == "off":
+                    self.game.send_rcon('g_instagib 0')
+                    self.game.rcon_tell(sar['player_num'], "^7Instagib: ^1Off")
+                    self.game.rcon_tell(sar['player_num'], "^7Instagib changed for next map")
+                elif arg == "on":
+                    self.game.send_rcon('g_instagib 1')
+                    self.game.rcon_tell(sar['player_num'], "^7Instagib: ^2On")
+                    self.game.rcon_tell(sar['player_num'], "^7Instagib changed for next map")
                 else:
-                    self.game.send_rcon('g_password ""')
-                    self.game.rcon_tell(sar['player_num'], "^7Password removed - Server is public")
+                    self.game.rcon_tell(sar['player_num'], COMMANDS['instagib']['syntax'])
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['instagib']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], "^7The command ^3!instagib ^7is not supported")
 
-            # reload
-            elif sar['command'] == '!reload' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['reload']['level']:
-                self.game.send_rcon('reload')
+    def cmd_cyclemap(self, sar, line):
+        """
+        cycle to the next map
+        """
+        self.game.send_rcon('cyclemap')
 
-            # ungroup - remove the admin level from a player
-            elif sar['command'] == '!ungroup' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['ungroup']['level']:
-                if line.split(sar['command'])[1]:
-                    user = line.split(sar['command'])[1].strip()
-                    found, victim, msg = self.player_found(user)
-                    if not found:
-                        self.game.rcon_tell(sar['player_num'], msg)
-                    else:
-                        if (1 < victim.get_admin_role() < COMMANDS['ungroup']['level'] or self.game.players[sar['player_num']].get_admin_role() == 100) and victim.get_player_num() != sar['player_num']:
-                            self.game.rcon_tell(sar['player_num'], "^1%s ^7put in group User" % victim.get_name())
-                            victim.update_db_admin_role(role=1)
-                        else:
-                            self.game.rcon_tell(sar['player_num'], "^3Sorry, you cannot put %s in group User" % victim.get_name())
+    def cmd_setnextmap(self, sar, line):
+        """
+        set the next map
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            found, nextmap, msg = self.map_found(arg)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                self.game.send_rcon('g_nextmap %s' % nextmap)
+                self.game.next_mapname = nextmap
+                self.game.rcon_tell(sar['player_num'], "^7Next Map set to: ^3%s" % nextmap)
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['setnextmap']['syntax'])
+
+    def cmd_rebuild(self, sar, line):
+        """
+        sync up all available maps
+        """
+        # get full map list and fresh server values
+        self.game.reset_rcon_cache()
+        self.game.set_all_maps(lambda all_maps: self.game.rcon_tell(sar['player_num'], "^7Rebuild maps: ^3%s ^7maps found" % len(all_maps)))
+        # set current and next map
+        self.game.set_current_map(lambda: self.get_nextmap(lambda msg: self.game.rcon_tell(sar['player_num'], msg)))
+
+    def cmd_swapteams(self, sar, line):
+        """
+        swap the current teams
+        """
+        self.game.send_rcon('swapteams')
+
+    def cmd_exec(self, sar, line):
+        """
+        execute given config file
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            self.game.send_rcon('exec %s' % arg)
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['exec']['syntax'])
+
+    def cmd_gear(self, sar, line):
+        """
+        set allowed weapons
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            # docs: http://www.urbanterror.info/support/180-server-cvars/#2
+            if "all" in arg:
+                self.game.send_rcon('g_gear 0')
+                self.game.rcon_say("^7Gear: ^1All weapons enabled")
+            elif "default" in arg:
+                self.game.send_rcon('g_gear "%s"' % self.default_gear)
+                self.game.rcon_say("^7Gear: ^1Server defaults enabled")
+            elif "knife" in arg:
+                self.game.send_rcon('g_gear "%s"' % 'FGHIJKLMNZacefghijklOQRSTUVWX' if self.urt_modversion > 41 else '63')
+                self.game.rcon_say("^7Gear: ^1Knife only")
+            elif "pistol" in arg:
+                self.game.send_rcon('g_gear "%s"' % 'HIJKLMNZacehijkOQ' if self.urt_modversion > 41 else '55')
+                self.game.rcon_say("^7Gear: ^1Pistols only")
+            elif "shotgun" in arg:
+                self.game.send_rcon('g_gear "%s"' % 'FGIJKLMNZacefghiklOQ' if self.urt_modversion > 41 else '59')
+                self.game.rcon_say("^7Gear: ^1Shotguns only")
+            elif "sniper" in arg:
+                self.game.send_rcon('g_gear "%s"' % 'FGHIJKLMacefghjklOQ' if self.urt_modversion > 41 else '61')
+                self.game.rcon_say("^7Gear: ^1Sniper rifles only")
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['gear']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['gear']['syntax'])
+
+    def cmd_kill(self, sar, line):
+        """
+        kill a player
+        """
+        if self.urt_modversion > 41:
+            if line.split(sar['command'])[1]:
+                user = line.split(sar['command'])[1].strip()
+                found, victim, msg = self.player_found(user)
+                if not found:
+                    self.game.rcon_tell(sar['player_num'], msg)
                 else:
-                    self.game.rcon_tell(sar['player_num'], COMMANDS['ungroup']['syntax'])
-
-            # switch to gametype
-            elif sar['command'] == '!ffa' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['ffa']['level']:
-                self.game.send_rcon('g_gametype 0')
-                self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Free For All")
-                self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
-            elif sar['command'] == '!lms' and self.urt_modversion > 42 and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['lms']['level']:
-                self.game.send_rcon('g_gametype 1')
-                self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Last Man Standing")
-                self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
-            elif sar['command'] == '!tdm' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['tdm']['level']:
-                self.game.send_rcon('g_gametype 3')
-                self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Team Deathmatch")
-                self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
-            elif sar['command'] == '!ts' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['ts']['level']:
-                self.game.send_rcon('g_gametype 4')
-                self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Team Survivor")
-                self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
-            # 5: Follow The Leader
-            # 6: Capture And Hold
-            elif sar['command'] == '!ctf' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['ctf']['level']:
-                self.game.send_rcon('g_gametype 7')
-                self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Capture the Flag")
-                self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
-            elif sar['command'] == '!bomb' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['bomb']['level']:
-                self.game.send_rcon('g_gametype 8')
-                self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Bomb")
-                self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
-            elif sar['command'] == '!jump' and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['jump']['level']:
-                self.game.send_rcon('g_gametype 9')
-                self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Jump")
-                self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
-            # 10 Freeze Tag
-            elif sar['command'] == '!gungame' and self.urt_modversion > 42 and self.game.players[sar['player_num']].get_admin_role() >= COMMANDS['gungame']['level']:
-                self.game.send_rcon('g_gametype 11')
-                self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Gun Game")
-                self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
-## iamgod
-            # iamgod - register user as Head Admin
-            elif sar['command'] == '!iamgod':
-                if self.iamgod:
-                    if not self.game.players[sar['player_num']].get_registered_user():
-                        # register new user in DB and set admin role to 100
-                        self.game.players[sar['player_num']].register_user_db(role=100)
+                    if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                        self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to kill an admin")
                     else:
-                        self.game.players[sar['player_num']].update_db_admin_role(role=100)
-                    self.iamgod = False
-                    self.game.rcon_tell(sar['player_num'], "^7You are registered as ^6Head Admin")
-## unknown command
-            elif sar['command'].startswith('!') and len(sar['command']) > 1 and self.game.players[sar['player_num']].get_admin_role() > 20:
-                if sar['command'].lstrip('!') in self.superadmin_cmds:
-                    self.game.rcon_tell(sar['player_num'], "^7Insufficient privileges to use command ^3%s" % sar['command'])
-                else:
-                    self.game.rcon_tell(sar['player_num'], "^7Unknown command ^3%s" % sar['command'])
-## bad words
-            elif self.bad_words_autokick and [sample for sample in bad_words if sample in line.lower()] and self.game.players[sar['player_num']].get_admin_role() < 40:
-                victim = self.game.players[sar['player_num']]
-                victim.add_warning('bad language')
-                self.kick_high_warns(victim, 'bad language', 'Behave, stop using bad language')
-
-    def kick_high_warns(self, player, reason, text):
-        if player.get_warning() > 4:
-            self.game.rcon_say("^1%s ^7was kicked, %s" % (player.get_name(), reason))
-            self.game.kick_player(player.get_player_num(), reason=reason)
+                        self.game.send_rcon("smite %d" % victim.get_player_num())
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['kill']['syntax'])
         else:
-            self.game.rcon_tell(player.get_player_num(), "^1WARNING ^7[^3%d^7]: %s" % (player.get_warning(), text))
-            if player.get_warning() == 4:
-                self.game.rcon_say("^1ALERT: ^3%s ^7auto-kick from warnings if not cleared" % player.get_name())
+            self.game.rcon_tell(sar['player_num'], "^7The command ^3!kill ^7is not supported")
 
-    def get_admins_online(self):
+    def cmd_lookup(self, sar, line):
         """
-        return list of Admins online
+        search for a player in the database
         """
-        liste = "%s" % ", ".join(["^7%s ^7[^3%d^7]" % (player.get_name(), player.get_admin_role()) for player in self.game.players.itervalues() if player.get_admin_role() >= 20])
-        return "^3Admins online: %s" % liste if liste else "^7No admins online"
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            search = '%' + arg + '%'
+            lookup = (search,)
+            result = curs.execute("SELECT `id`,`name`,`time_joined` FROM `player` WHERE `name` like ? ORDER BY `time_joined` DESC LIMIT 8", lookup).fetchall()
+            for row in result:
+                self.game.rcon_tell(sar['player_num'], "^7[^1@%s^7] %s ^7[^3%s^7]" % (str(row[0]), str(row[1]), str(row[2])), False)
+            if not result:
+                self.game.rcon_tell(sar['player_num'], "^3No Player found matching %s" % arg)
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['lookup']['syntax'])
 
-    def get_nextmap(self):
+    def cmd_permban(self, sar, line):
         """
-        return the next map in the mapcycle
+        ban a player permanent
         """
-        g_nextmap = self.game.get_cvar('g_nextmap').split(" ")[0].strip().lower()
-        if g_nextmap in self.game.get_all_maps():
-            self.game.next_mapname = g_nextmap
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if len(arg) > 1:
+                user = arg[0]
+                reason = ' '.join(arg[1:])[:40].strip()
+                found, victim, msg = self.player_found(user)
+                if not found:
+                    self.game.rcon_tell(sar['player_num'], msg)
+                else:
+                    if victim.get_admin_role() >= self.game.players[sar['player_num']].get_admin_role():
+                        self.game.rcon_tell(sar['player_num'], "^3Insufficient privileges to ban an admin")
+                    else:
+                        # ban for 20 years
+                        victim.ban(duration=630720000, reason=reason, admin=self.game.players[sar['player_num']].get_name(), adminauth=self.game.players[sar['player_num']].get_authname())
+                        self.game.rcon_say("^8%s ^1banned permanently ^7by %s: ^3%s" % (victim.get_name(), self.game.players[sar['player_num']].get_name(), reason))
+                        self.game.kick_player(victim.get_player_num())
+                        # add IP address to bot-banlist.txt
+                        ip = victim.get_ip_address()
+                        ip_address = ''.join(ip.rpartition('.')[:2]) + '0:-1'
+                        with open(os.path.join(HOME, 'bot-banlist.txt'), 'a') as banlist:
+                            banlist.write("%s // %s banned: %s  reason: %s\n" % (ip_address.ljust(20), victim.get_name().ljust(20), time.strftime("%d/%m/%Y (%H:%M)", time.localtime(CLOCK.time())), reason))    
+            else:
+                self.game.rcon_tell(sar['player_num'], "^7You need to enter a reason: ^3!permban <name> <reason>")
         else:
-            g_nextmap = self.game.get_cvar('g_nextcyclemap').split(" ")[0].strip().lower()
-            self.game.next_mapname = g_nextmap
-            
-        msg = "^3Next Map: ^7%s" % self.game.next_mapname
-        return msg
+            self.game.rcon_tell(sar['player_num'], COMMANDS['permban']['syntax'])
 
-    def tell_say_message(self, sar, msg):
+    def cmd_makereg(self, sar, line):
         """
-        display message in private or global chat
+        make a player a regular (Level 2) user
         """
-        if sar['command'].startswith('@'):
-            self.game.rcon_say(msg)
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                if victim.get_registered_user():
+                    if victim.get_admin_role() < 2:
+                        victim.update_db_admin_role(role=2)
+                        self.game.rcon_tell(sar['player_num'], "^1%s ^7put in group Regular" % victim.get_name())
+                    else:
+                        self.game.rcon_tell(sar['player_num'], "^3%s is already in a higher level group" % victim.get_name())
+                else:
+                    # register new user in DB and set role to 2
+                    victim.register_user_db(role=2)
+                    self.game.rcon_tell(sar['player_num'], "^1%s ^7put in group Regular" % victim.get_name())
         else:
-            self.game.rcon_tell(sar['player_num'], msg)
+            self.game.rcon_tell(sar['player_num'], COMMANDS['makereg']['syntax'])
 
-    def convert_time(self, time_string):
+    def cmd_unreg(self, sar, line):
         """
-        convert time string in duration and time unit
+        remove a player from the regular group
         """
-        if time_string.endswith('d'):
-            duration_string = time_string.rstrip('d')
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                if victim.get_admin_role() == 2:
+                    victim.update_db_admin_role(role=1)
+                    self.game.rcon_tell(sar['player_num'], "^1%s ^7put in group User" % victim.get_name())
+                else:
+                    self.game.rcon_tell(sar['player_num'], "^3%s is not in the regular group" % victim.get_name())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['unreg']['syntax'])
+
+    def cmd_putgroup(self, sar, line):
+        """
+        add a client to a group
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].split()
+            if len(arg) > 1:
+                user = arg[0]
+                right = arg[1]
+                found, victim, msg = self.player_found(user)
+                if not found:
+                    self.game.rcon_tell(sar['player_num'], msg)
+                else:
+                    if victim.get_registered_user():
+                        new_role = victim.get_admin_role()
+                    else:
+                        # register new user in DB and set role to 1
+                        victim.register_user_db(role=1)
+                        new_role = 1
+
+                    if right == "user" and victim.get_admin_role() < 80:
+                        self.game.rcon_tell(sar['player_num'], "^3%s put in group ^7User" % victim.get_name())
+                        new_role = 1
+                    elif "reg" in right and victim.get_admin_role() < 80:
+                        self.game.rcon_tell(sar['player_num'], "^3%s put in group ^7Regular" % victim.get_name())
+                        new_role = 2
+                    elif "mod" in right and victim.get_admin_role() < 80:
+                        self.game.rcon_tell(sar['player_num'], "^3%s added as ^7Moderator" % victim.get_name())
+                        self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^7Moderator")
+                        new_role = 20
+                    elif right == "admin" and victim.get_admin_role() < 80:
+                        self.game.rcon_tell(sar['player_num'], "^3%s added as ^7Admin" % victim.get_name())
+                        self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^7Admin")
+                        new_role = 40
+                    elif "fulladmin" in right and victim.get_admin_role() < 80:
+                        self.game.rcon_tell(sar['player_num'], "^3%s added as ^7Full Admin" % victim.get_name())
+                        self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^7Full Admin")
+                        new_role = 60
+                    # Note: senioradmin level can only be set by head admin or super admin
+                    elif "senioradmin" in right and self.game.players[sar['player_num']].get_admin_role() >= 90 and victim.get_player_num() != sar['player_num']:
+                        self.game.rcon_tell(sar['player_num'], "^3%s added as ^6Senior Admin" % victim.get_name())
+                        self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^6Senior Admin")
+                        new_role = 80
+                    # Note: superadmin level can only be set by head admin
+                    elif "superadmin" in right and self.game.players[sar['player_num']].get_admin_role() == 100 and victim.get_player_num() != sar['player_num']:
+                        self.game.rcon_tell(sar['player_num'], "^3%s added as ^1Super Admin" % victim.get_name())
+                        self.game.rcon_tell(victim.get_player_num(), "^3You are added as ^1Super Admin")
+                        new_role = 90
+                    else:
+                        self.game.rcon_tell(sar['player_num'], "^3Sorry, you cannot put %s in group <%s>" % (victim.get_name(), right))
+                    victim.update_db_admin_role(role=new_role)
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['putgroup']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['putgroup']['syntax'])
+
+    def cmd_banlist(self, sar, line):
+        """
+        display the last active 10 bans
+        """
+        values = (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time())),)
+        result = curs.execute("SELECT `id`,`name` FROM `ban_list` WHERE `expires` > ? ORDER BY `timestamp` DESC LIMIT 10", values).fetchall()
+        banlist = ['^7[^1@%s^7] %s' % (row[0], row[1]) for row in result]
+        msg = 'Currently no one is banned' if not banlist else str(", ".join(banlist))
+        self.game.rcon_tell(sar['player_num'], "^7Banlist: %s" % msg)
+
+    def cmd_lastbans(self, sar, line):
+        """
+        list the last 4 bans
+        """
+        result = curs.execute("SELECT id,name,expires FROM `ban_list` ORDER BY `timestamp` DESC LIMIT 4").fetchall()
+        lastbanlist = ['^3[^1@%s^3] ^7%s ^3(^1%s^3)' % (row[0], row[1], row[2]) for row in result]
+        for item in lastbanlist:
+            self.game.rcon_tell(sar['player_num'], str(item))
+
+    def cmd_unban(self, sar, line):
+        """
+        unban a player from the database
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip().lstrip('@')
+            if arg.isdigit():
+                values = (int(arg),)
+                curs.execute("SELECT `guid`,`name`,`ip_address` FROM `ban_list` WHERE `id` = ?", values)
+                result = curs.fetchone()
+                if result:
+                    guid = result[0]
+                    name = str(result[1])
+                    ip_addr = str(result[2])
+                    curs.execute("DELETE FROM `ban_list` WHERE `id` = ?", values)
+                    conn.commit()
+                    self.game.rcon_tell(sar['player_num'], "^7Player ^1%s ^7unbanned" % name)
+                    values = (guid, ip_addr)
+                    curs.execute("DELETE FROM `ban_list` WHERE `guid` = ? OR ip_address = ?", values)
+                    conn.commit()
+                    self.game.rcon_tell(sar['player_num'], "^7Attempting to remove duplicates of [^1%s^7]" % ip_addr)
+                    ip_address = ''.join(ip_addr.rpartition('.')[:2])
+                    duplicate = 0
+                    with open(os.path.join(HOME, 'bot-banlist.txt'), 'r') as banlist:
+                        lines = banlist.readlines()
+                    with open(os.path.join(HOME, 'bot-banlist.txt'), 'w') as banlist:
+                        for line in lines:
+                            if line.strip().startswith(ip_address):
+                                duplicate += 1
+                                continue
+                            banlist.write(line)
+                    if duplicate > 0:
+                        self.game.rcon_tell(sar['player_num'], "^2Success!^7 Removed ^3%s^7 duplicate%s." % (duplicate, 's' if duplicate > 1 else ''))
+                    else:
+                        self.game.rcon_tell(sar['player_num'], "^3No duplicates where found")
+                else:
+                    self.game.rcon_tell(sar['player_num'], "^7Invalid ID, no Player found")
+            else:
+                self.game.rcon_tell(sar['player_num'], COMMANDS['unban']['syntax'])
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['unban']['syntax'])
+
+    def cmd_password(self, sar, line):
+        """
+        set private server password
+        """
+        if line.split(sar['command'])[1]:
+            arg = line.split(sar['command'])[1].strip()
+            self.game.send_rcon('g_password %s' % arg)
+            self.game.rcon_tell(sar['player_num'], "^7Password set to '%s' - Server is private" % arg)
+        else:
+            self.game.send_rcon('g_password ""')
+            self.game.rcon_tell(sar['player_num'], "^7Password removed - Server is public")
+
+    def cmd_reload(self, sar, line):
+        """
+        reload map
+        """
+        self.game.send_rcon('reload')
+
+    def cmd_ungroup(self, sar, line):
+        """
+        remove admin level from a player
+        """
+        if line.split(sar['command'])[1]:
+            user = line.split(sar['command'])[1].strip()
+            found, victim, msg = self.player_found(user)
+            if not found:
+                self.game.rcon_tell(sar['player_num'], msg)
+            else:
+                if (1 < victim.get_admin_role() < COMMANDS['ungroup']['level'] or self.game.players[sar['player_num']].get_admin_role() == 100) and victim.get_player_num() != sar['player_num']:
+                    self.game.rcon_tell(sar['player_num'], "^1%s ^7put in group User" % victim.get_name())
+                    victim.update_db_admin_role(role=1)
+                else:
+                    self.game.rcon_tell(sar['player_num'], "^3Sorry, you cannot put %s in group User" % victim.get_name())
+        else:
+            self.game.rcon_tell(sar['player_num'], COMMANDS['ungroup']['syntax'])
+
+    def cmd_ffa(self, sar, line):
+        """
+        change gametype to Free For All
+        """
+        self.game.send_rcon('g_gametype 0')
+        self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Free For All")
+        self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
+
+    def cmd_lms(self, sar, line):
+        """
+        change gametype to Last Man Standing
+        """
+        self.game.send_rcon('g_gametype 1')
+        self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Last Man Standing")
+        self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
+
+    def cmd_tdm(self, sar, line):
+        """
+        change gametype to Team Deathmatch
+        """
+        self.game.send_rcon('g_gametype 3')
+        self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Team Deathmatch")
+        self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
+
+    def cmd_ts(self, sar, line):
+        """
+        change gametype to Team Survivor
+        """
+        self.game.send_rcon('g_gametype 4')
+        self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Team Survivor")
+        self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
+
+    def cmd_ctf(self, sar, line):
+        """
+        change gametype to Capture the Flag
+        """
+        self.game.send_rcon('g_gametype 7')
+        self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Capture the Flag")
+        self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
+
+    def cmd_bomb(self, sar, line):
+        """
+        change gametype to Bomb
+        """
+        self.game.send_rcon('g_gametype 8')
+        self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Bomb")
+        self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
+
+    def cmd_jump(self, sar, line):
+        """
+        change gametype to Jump
+        """
+        self.game.send_rcon('g_gametype 9')
+        self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Jump")
+        self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
+
+    def cmd_gungame(self, sar, line):
+        """
+        change gametype to Gun Game
+        """
+        self.game.send_rcon('g_gametype 11')
+        self.game.rcon_tell(sar['player_num'], "^7Game Mode: ^1Gun Game")
+        self.game.rcon_tell(sar['player_num'], "^7Mode changed for next map")
+
+    def cmd_iamgod(self, sar, line):
+        """
+        register yourself as Head Admin, available as long as there is no Head Admin
+        """
+        if self.iamgod:
+            if not self.game.players[sar['player_num']].get_registered_user():
+                # register new user in DB and set admin role to 100
+                self.game.players[sar['player_num']].register_user_db(role=100)
+            else:
+                self.game.players[sar['player_num']].update_db_admin_role(role=100)
+            self.iamgod = False
+            self.game.rcon_tell(sar['player_num'], "^7You are registered as ^6Head Admin")
+
+    def report_posted(self, player_num, response):
+        """
+        tell the reporter the result of the posted report, runs in the background worker
+
+        @param player_num: The player number of the reporter
+        @type  player_num: Integer
+        @param response: The response of the webhook
+        """
+        if "204" in str(response):
+            self.game.rcon_tell(player_num, "^3Report: ^2success")
+        else:
+            self.game.rcon_tell(player_num, "^3Report: ^1Failed^7 with error %s" % (str(response)))
+
+    def kick_high_warns(self, player, reason, text):
+        if player.get_warning() > 4:
+            self.game.rcon_say("^1%s ^7was kicked, %s" % (player.get_name(), reason))
+            self.game.kick_player(player.get_player_num(), reason=reason)
+        else:
+            self.game.rcon_tell(player.get_player_num(), "^1WARNING ^7[^3%d^7]: %s" % (player.get_warning(), text))
+            if player.get_warning() == 4:
+                self.game.rcon_say("^1ALERT: ^3%s ^7auto-kick from warnings if not cleared" % player.get_name())
+
+    def get_admins_online(self):
+        """
+        return list of Admins online
+        """
+        liste = "%s" % ", ".join(["^7%s ^7[^3%d^7]" % (player.get_name(), player.get_admin_role()) for player in self.game.player_index.get_admins()])
+        return "^3Admins online: %s" % liste if liste else "^7No admins online"
+
+    def get_nextmap(self, callback):
+        """
+        get the next map in the mapcycle, the callback is called with the message once the server has responded
+
+        @param callback: Function called with the message
+        @type  callback: Function
+        """
+        def show_nextmap(value=None):
+            if value is not None:
+                self.game.next_mapname = value.split(" ")[0].strip().lower()
+            callback("^3Next Map: ^7%s" % self.game.next_mapname)
+
+        def check_nextmap(value):
+            g_nextmap = (value or '').split(" ")[0].strip().lower()
+            if g_nextmap in self.game.get_all_maps():
+                show_nextmap(g_nextmap)
+            else:
+                # g_nextcyclemap is used if g_nextmap is not set, the last known map if the server did not respond
+                self.game.query_cvar('g_nextcyclemap', show_nextmap)
+
+        if not self.game.live:
+            show_nextmap()
+        else:
+            self.game.query_cvar('g_nextmap', check_nextmap)
+
+    def tell_say_message(self, sar, msg):
+        """
+        display message in private or global chat
+        """
+        if sar['command'].startswith('@'):
+            self.game.rcon_say(msg)
+        else:
+            self.game.rcon_tell(sar['player_num'], msg)
+
+    def convert_time(self, time_string):
+        """
+        convert time string in duration and time unit
+        """
+        if time_string.endswith('d'):
+            duration_string = time_string.rstrip('d')
             duration = int(duration_string) * 86400 if duration_string.isdigit() else 86400
         elif time_string.endswith('h'):
             duration_string = time_string.rstrip('h')
@@ -3047,22 +3611,18 @@ class LogParser(object):
             append("%s second%s" % (secs, 's' if secs > 1 else ''))
         return duration, ' '.join(duration_output)
 
-    def handle_flag(self, line):
+    def handle_flag(self, event):
         """
         handle flag
         """
-        tmp = line.split()
-        player_num = int(tmp[0])
-        action = tmp[1]
+        player_num = event.player
+        action = event.action
         with self.players_lock:
             player = self.game.players[player_num]
-            if action == '0:':
-                player.dropped_flag()
-            elif action == '1:':
-                player.return_flag()
+            self.stats.count_flag(player, action)
+            if action == 1:
                 logger.debug("Player %d returned the flag", player_num)
-            elif action == '2:':
-                player.capture_flag()
+            elif action == 2:
                 cap_count = player.get_flags_captured()
                 self.game.send_rcon("^3%s^7 has captured ^3%s ^7flag%s" % (player.get_name(), cap_count, 's' if cap_count > 1 else ''))
                 logger.debug("Player %d captured the flag", player_num)
@@ -3084,9 +3644,7 @@ class LogParser(object):
                 self.handle_teams_ts_mode('Blue')
                 # kill all survived red players
                 if self.kill_survived_opponents and self.urt_modversion > 41:
-                    for player in self.game.players.itervalues():
-                        if player.get_team() == 1 and player.get_alive():
-                            self.game.send_rcon("smite %d" % player.get_player_num())
+                    self.game.send_rcon_group('smite red survivors', ["smite %d" % player.get_player_num() for player in self.game.player_index.get_alive(1)])
             elif action == 'Bomb was planted':
                 player.planted_bomb()
                 logger.debug("Player %d planted the bomb", player_num)
@@ -3098,13 +3656,13 @@ class LogParser(object):
                     self.game.rcon_bigtext("^7The ^1BOMB ^7has been planted by ^1%s^7!" % name)
             elif action == 'Bomb was tossed':
                 player.bomb_tossed()
-                for mate in self.game.players.itervalues():
-                    if mate.get_team() == 1 and mate.get_alive() and mate != player:
+                for mate in self.game.player_index.get_alive(1):
+                    if mate != player:
                         self.game.rcon_tell(mate.get_player_num(), "^7The ^1BOMB ^7is loose!")
             elif action == 'Bomb has been collected':
                 player.is_bombholder()
-                for mate in self.game.players.itervalues():
-                    if mate.get_team() == 1 and mate.get_alive() and mate != player:
+                for mate in self.game.player_index.get_alive(1):
+                    if mate != player:
                         self.game.rcon_tell(mate.get_player_num(), "^7Help ^1%s ^7to plant the ^1BOMB" % name)
             elif action == 'Bombholder':
                 player.is_bombholder()
@@ -3115,10 +3673,13 @@ class LogParser(object):
         """
         logger.debug("Bomb exploded!")
         if self.kill_survived_opponents and self.urt_modversion > 41:
-            # start Thread to kill all survived blue players
-            processor = Thread(target=self.kill_blue_team_bomb_exploded)
-            processor.setDaemon(True)
-            processor.start()
+            if self.replay_mode:
+                self.kill_blue_team_bomb_exploded()
+            else:
+                # start Thread to kill all survived blue players
+                processor = Thread(target=self.kill_blue_team_bomb_exploded)
+                processor.setDaemon(True)
+                processor.start()
         self.handle_teams_ts_mode('Red')
 
     def kill_blue_team_bomb_exploded(self):
@@ -3126,17 +3687,16 @@ class LogParser(object):
         Kill all survived blue players when the bomb exploded
         """
         self.game.rcon_say("^7Planted?")
-        time.sleep(1.3)
+        CLOCK.sleep(1.3)
         with self.players_lock:
-            for player in self.game.players.itervalues():
-                if player.get_team() == 2 and player.get_alive():
-                    self.game.send_rcon("smite %d" % player.get_player_num())
+            self.game.send_rcon_group('smite blue survivors', ["smite %d" % player.get_player_num() for player in self.game.player_index.get_alive(2)])
 
     def handle_teams_ts_mode(self, line):
         """
         handle team balance in Team Survivor mode
         """
         logger.debug("SurvivorWinner: %s", line)
+        self.game.announcer.flush()
         self.game.send_rcon("%s%s ^7team wins" % ('^1' if line == 'Red' else '^4', line) if 'Draw' not in line else "^7Draw")
         self.autobalancer()
         if self.ts_do_team_balance:
@@ -3177,23 +3737,19 @@ class LogParser(object):
                     logger.debug("Autobalancer performed team balance")
                 self.ts_do_team_balance = False
 
-    def handle_freeze(self, line):
+    def handle_freeze(self, event):
         """
         handle freeze
         """
-        info = line.split(":", 1)[0].split()
-        player_num = int(info[0])
         with self.players_lock:
-            self.game.players[player_num].freeze()
+            self.game.players[event.player].freeze()
 
-    def handle_thawout(self, line):
+    def handle_thawout(self, event):
         """
         handle thaw out
         """
-        info = line.split(":", 1)[0].split()
-        player_num = int(info[0])
         with self.players_lock:
-            self.game.players[player_num].thawout()
+            self.game.players[event.player].thawout()
 
 
 ### CLASS Player ###
@@ -3204,9 +3760,9 @@ class Player(object):
     teams = {0: "green", 1: "red", 2: "blue", 3: "spectator"}
     roles = {0: "Guest", 1: "User", 2: "Regular", 20: "Moderator", 40: "Admin", 60: "Full Admin", 80: "Senior Admin", 90: "Super Admin", 100: "Head Admin"}
 
-    def __init__(self, player_num, ip_address, guid, name, auth='', gear=''):
+    def __init__(self, player_num, ip_address, guid, name, auth='', gear='', lookup=True):
         """
-        create a new instance of Player
+        create a new instance of Player, the GeoIP and ban lookups are skipped if lookup is False
         """
         self.player_num = player_num
         self.guid = guid
@@ -3214,13 +3770,14 @@ class Player(object):
         self.authname = auth
         self.gear = gear
         self.player_id = 0
+        self.index = None
         self.aliases = []
         self.networks = []
         self.registered_user = False
         self.num_played = 0
         self.last_visit = 0
         self.admin_role = 0
-        self.first_seen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
+        self.first_seen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time()))
         self.kills = 0
         self.assists = 0
         self.db_assists = 0
@@ -3263,7 +3820,7 @@ class Player(object):
         self.address = ip_address
         self.team = 3
         self.team_lock = None
-        self.time_joined = time.time()
+        self.time_joined = CLOCK.time()
         self.welcome_msg = True
         self.country = None
         self.country_iso = None
@@ -3273,10 +3830,14 @@ class Player(object):
         self.respawn_time = 0
         self.monsterkill = {'time': 999, 'kills': 0}
         self.namechanges = 0
+        self.server_name = ''
 
         # set player name
         self.set_name(name)
         
+        if not lookup:
+            return
+
         # GeoIP lookup
         if ip_address not in ['0.0.0.0', '127.0.0.1']:
             info = GEOIP.country(ip_address)
@@ -3311,7 +3872,7 @@ class Player(object):
             reason = "%s, ban by %s" % (reason, admin)
             admin_name = '%s [%s]' % (admin, adminauth)
         try:
-            expire_date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() + duration))
+            expire_date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time() + duration))
         except ValueError:
             expire_date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(2527483647))
             
@@ -3321,12 +3882,8 @@ class Player(object):
             )
         image1 = 'https://lilpwny.com/downloads/vectto_icons/bullets.png'
 
-        config_file = os.path.join(HOME, 'conf', 'settings.conf')
-        config = ConfigParser.ConfigParser()
-        config.read(config_file)
-        
         embed.set_timestamp()
-        embed.set_author(name='%s' % (config.get('server', 'server_name')), icon_url=image1)
+        embed.set_author(name='%s' % (self.server_name), icon_url=image1)
         embed.set_footer(text='Banned by: %s ' % (admin_name if admin and not admin == 'bot' else 'SpunkyBot'))
         embed.add_embed_field(name='NAME', value='%s' % (self.name))
         embed.add_embed_field(name='PLAYER ID', value='@%s' % (self.player_id))
@@ -3337,11 +3894,9 @@ class Player(object):
         embed.add_embed_field(name='REASON', value='%s' % (comment))
         embed.add_embed_field(name='ALIASES', value='`%s`' % ('` `'.join(map(str, self.aliases))), inline=False)
         
-        banhook.add_embed(embed)
-        banhook.execute() 
-        banhook.remove_embed(0)
+        WORKER.post_webhook(banhook, embed)
 
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time()))
         values = (self.guid,)
         curs.execute("SELECT `expires` FROM `ban_list` WHERE `guid` = ?", values)
         result = curs.fetchone()
@@ -3364,7 +3919,7 @@ class Player(object):
 
     def add_ban_point(self, point_type, duration):
         try:
-            expire_date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() + duration))
+            expire_date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time() + duration))
         except ValueError:
             expire_date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(2147483647))
         values = (self.guid, point_type, expire_date)
@@ -3372,7 +3927,7 @@ class Player(object):
         curs.execute("INSERT INTO `ban_points` (`guid`,`point_type`,`expires`) VALUES (?,?,?)", values)
         conn.commit()
         # check amount of ban_points
-        values = (self.guid, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
+        values = (self.guid, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time())))
         curs.execute("SELECT COUNT(*) FROM `ban_points` WHERE `guid` = ? AND `expires` > ?", values)
         # ban player when he gets more than 1 ban_point
         if curs.fetchone()[0] > 1:
@@ -3416,7 +3971,9 @@ class Player(object):
         self.respawn_time = 0
         self.monsterkill = {'time': 999, 'kills': 0}
         self.namechanges = 0
-        
+        if self.index:
+            self.index.update_status(self)
+
     def reset_xlr(self):    
         # check XLRSTATS table
         values = (self.guid,)
@@ -3457,8 +4014,25 @@ class Player(object):
                 curs.execute("UPDATE `xlrstats` SET `gear` = ? WHERE `guid` =?", gear_values)
             conn.commit()
 
+    def get_xlr_stats(self):
+        return (self.db_kills, self.db_deaths, self.db_head_shots, self.db_tk_count, self.db_team_death, self.db_killing_streak,
+                self.db_suicide, self.db_flags_captured, self.db_flags_returned, self.db_flags_dropped, self.db_assists)
+
+    def clear_xlr_stats(self):
+        self.db_kills = 0
+        self.db_deaths = 0
+        self.db_head_shots = 0
+        self.db_tk_count = 0
+        self.db_team_death = 0
+        self.db_killing_streak = 0
+        self.db_suicide = 0
+        self.db_flags_captured = 0
+        self.db_flags_returned = 0
+        self.db_flags_dropped = 0
+        self.db_assists = 0
+
     def check_database(self):
-        now = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
+        now = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time()))
         # check player table
         values = (self.guid,)
         curs.execute("SELECT COUNT(*) FROM `player` WHERE `guid` = ?", values)
@@ -3558,805 +4132,3307 @@ class Player(object):
             self.admin_role = result[1]
             self.registered_user = True
 
-    def register_user_db(self, role=1):
-        if not self.registered_user:
-            now = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
-            values = (self.guid, self.name, self.address, now, now, role)
-            curs.execute("INSERT INTO `xlrstats` (`guid`,`name`,`ip_address`,`first_seen`,`last_played`,`num_played`,`admin_role`) VALUES (?,?,?,?,?,1,?)", values)
-            conn.commit()
-            self.registered_user = True
-            self.admin_role = role
-            self.welcome_msg = False
-            self.first_seen = now
-            self.last_visit = now
+    def register_user_db(self, role=1):
+        if not self.registered_user:
+            now = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time()))
+            values = (self.guid, self.name, self.address, now, now, role)
+            curs.execute("INSERT INTO `xlrstats` (`guid`,`name`,`ip_address`,`first_seen`,`last_played`,`num_played`,`admin_role`) VALUES (?,?,?,?,?,1,?)", values)
+            conn.commit()
+            self.registered_user = True
+            self.set_admin_role(role)
+            self.welcome_msg = False
+            self.first_seen = now
+            self.last_visit = now
+
+    def update_db_admin_role(self, role):
+        values = (role, self.guid)
+        curs.execute("UPDATE `xlrstats` SET `admin_role` = ? WHERE `guid` = ?", values)
+        conn.commit()
+        # overwrite admin role in game, no reconnect of player required
+        self.set_admin_role(role)
+
+    def get_ban_id(self):
+        return self.ban_id
+
+    def get_ban_msg(self):
+        return REASONS[self.ban_msg] if self.ban_msg in REASONS else self.ban_msg
+
+    def set_name(self, name):
+        # remove whitespaces
+        self.name = name.replace(' ', '')
+        # remove color character
+        for item in xrange(10):
+            self.name = self.name.replace('^%d' % item, '')
+        # limit length of name to 20 character
+        self.name = self.name[:20]
+        self.namechanges += 1
+        if self.index:
+            self.index.add(self)
+       
+    def set_gear(self, gear):
+        # remove empty gearslots from string
+        gear_str = gear.replace('A', '')
+        while len(gear_str) < 5:
+            gear_str += 'A'
+            if len(gear_str) == 5:
+                break
+        self.gear = gear_str
+            
+
+    def get_gear(self):
+        return self.gear
+
+    def get_name(self):
+        return self.name
+        
+    def get_namechanges(self):
+        return self.namechanges
+
+    def set_authname(self, authname):
+        self.authname = authname
+        if self.index:
+            self.index.add(self)
+
+    def get_authname(self):
+        return self.authname
+
+    def get_aliases(self):
+        if len(self.aliases) == 15:
+            self.aliases.append("and more...")
+        return str(", ^3".join(self.aliases))
+
+    def set_server_name(self, server_name):
+        self.server_name = server_name
+
+    def set_guid(self, guid):
+        self.guid = guid
+
+    def get_guid(self):
+        return self.guid
+
+    def get_player_num(self):
+        return self.player_num
+
+    def get_player_id(self):
+        return self.player_id
+
+    def set_team(self, team):
+        self.team = team
+        if self.index:
+            self.index.update_status(self)
+
+    def get_team(self):
+        return self.team
+
+    def get_team_lock(self):
+        return self.team_lock
+
+    def set_team_lock(self, team):
+        self.team_lock = team
+
+    def get_num_played(self):
+        return self.num_played
+
+    def get_last_visit(self):
+        return str(self.last_visit)
+
+    def get_first_seen_date(self):
+        return str(self.first_seen)
+
+    def get_db_kills(self):
+        return self.db_kills
+
+    def get_kills(self):
+        return self.kills
+
+    def get_db_assists(self):
+        return self.db_assists
+
+    def get_assists(self):
+        return self.assists
+
+    def get_db_deaths(self):
+        return self.db_deaths
+        
+    def get_db_flags_captured(self):
+        return self.db_flags_captured
+
+    def get_db_flags_returned(self):
+        return self.db_flags_returned
+
+    def get_db_flags_dropped(self):
+        return self.db_flags_dropped
+
+    def get_deaths(self):
+        return self.deaths
+
+    def get_db_headshots(self):
+        return self.db_head_shots
+
+    def get_headshots(self):
+        return self.head_shots
+
+    def disable_welcome_msg(self):
+        self.welcome_msg = False
+
+    def get_welcome_msg(self):
+        return self.welcome_msg
+
+    def get_country(self):
+        return self.country
+
+    def get_registered_user(self):
+        return self.registered_user
+
+    def set_admin_role(self, role):
+        self.admin_role = role
+        if self.index:
+            self.index.update_status(self)
+
+    def get_admin_role(self):
+        return self.admin_role
+
+    def get_ip_address(self):
+        return self.address
+
+    def get_time_joined(self):
+        return self.time_joined
+
+    def get_max_kill_streak(self):
+        return self.max_kill_streak
+
+    def kill(self):
+        now = CLOCK.time()
+        self.killing_streak += 1
+        self.kills += 1
+        self.db_kills += 1
+        if now - self.monsterkill['time'] < 5:
+            self.monsterkill['kills'] += 1
+        else:
+            self.monsterkill['time'] = now
+            self.monsterkill['kills'] = 1
+
+    def assist(self):
+        self.assists += 1
+        self.db_assists += 1
+
+    def die(self):
+        if self.killing_streak > self.max_kill_streak:
+            self.max_kill_streak = self.killing_streak
+        if self.max_kill_streak > self.db_killing_streak:
+            self.db_killing_streak = self.max_kill_streak
+        self.killing_streak = 0
+        self.deaths += 1
+        self.db_deaths += 1
+        self.monsterkill = {'time': 999, 'kills': 0}
+
+    def get_monsterkill(self):
+        return self.monsterkill['kills']
+
+    def set_alive(self, status):
+        self.alive = status
+        if status:
+            self.respawn_time = CLOCK.time()
+        if self.index:
+            self.index.update_status(self)
+
+    def get_alive(self):
+        return self.alive
+
+    def get_respawn_time(self):
+        return self.respawn_time
+
+    def suicide(self):
+        self.db_suicide += 1
+
+    def headshot(self):
+        self.head_shots += 1
+        self.db_head_shots += 1
+
+    def set_hitzones(self, part):
+        self.hitzone[part] += 1
+
+    def get_hitzones(self, part):
+        return self.hitzone[part]
+
+    def set_all_hits(self):
+        self.all_hits += 1
+
+    def get_all_hits(self):
+        return self.all_hits
+
+    def set_he_kill(self):
+        self.he_kills += 1
+
+    def get_he_kills(self):
+        return self.he_kills
+
+    def set_knife_kill(self):
+        self.knife_kills += 1
+
+    def get_knife_kills(self):
+        return self.knife_kills
+
+    def get_killing_streak(self):
+        return self.killing_streak
+
+    def get_db_tks(self):
+        return self.db_tk_count
+
+    def get_team_kill_count(self):
+        return self.tk_count
+
+    def add_killed_me(self, killer):
+        self.tk_killer_names.append(killer)
+
+    def get_killed_me(self):
+        return self.tk_killer_names
+
+    def clear_killed_me(self, victim):
+        while self.tk_victim_names.count(victim) > 0:
+            self.warn_list.remove("stop team killing")
+            self.tk_victim_names.remove(victim)
+
+    def add_tk_victims(self, victim):
+        self.tk_victim_names.append(victim)
+
+    def get_tk_victim_names(self):
+        return self.tk_victim_names
+
+    def set_grudge(self, killer):
+        self.grudged_player.append(killer)
+        self.clear_tk(killer)
+
+    def get_grudged_player(self):
+        return self.grudged_player
+
+    def clear_grudged_player(self, killer):
+        while self.grudged_player.count(killer) > 0:
+            self.grudged_player.remove(killer)
+
+    def clear_tk(self, killer):
+        while self.tk_killer_names.count(killer) > 0:
+            self.tk_killer_names.remove(killer)
+
+    def clear_all_tk(self):
+        self.tk_killer_names = []
+
+    def clear_all_killed_me(self):
+        self.tk_victim_names = []
+        self.clear_specific_warning("stop team killing")
+
+    def add_high_ping(self, value):
+        self.warn_list.append('fix your ping')
+        self.ping_value = value
+        
+    def get_ping_value(self):
+        return self.ping_value
+
+    def clear_specific_warning(self, warning):
+        while self.warn_list.count(warning) > 0:
+            self.warn_list.remove(warning)
+
+    def add_warning(self, warning, timer=True):
+        self.warn_list.append(warning)
+        if timer:
+            self.last_warn_time = CLOCK.time()
+
+    def get_warning(self):
+        return len(self.warn_list)
+
+    def get_all_warn_msg(self):
+        return list(set(self.warn_list))
+
+    def get_last_warn_msg(self):
+        return self.warn_list[-1] if self.warn_list else ''
+
+    def get_last_warn_time(self):
+        return self.last_warn_time
+
+    def clear_last_warning(self):
+        if self.warn_list:
+            last_warning = self.warn_list[-1]
+            self.warn_list.pop()
+            self.last_warn_time = self.last_warn_time - 60 if self.warn_list else 0
+            if "stop team killing" in last_warning:
+                self.tk_victim_names.pop()
+            return last_warning
+
+    def clear_warning(self):
+        self.warn_list = []
+        self.tk_victim_names = []
+        self.tk_killer_names = []
+        self.last_warn_time = 0
+        # clear ban_points
+        now = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(CLOCK.time()))
+        values = (self.guid, now)
+        curs.execute("DELETE FROM `ban_points` WHERE `guid` = ? and `expires` > ?", values)
+        conn.commit()
+
+    def team_death(self):
+        # increase team death counter
+        self.db_team_death += 1
+
+    def team_kill(self):
+        # increase teamkill counter
+        self.tk_count += 1
+        self.db_tk_count += 1
+
+# CTF Mode
+    def capture_flag(self):
+        self.flags_captured += 1
+        self.db_flags_captured += 1
+
+    def get_flags_captured(self):
+        return self.flags_captured
+
+    def return_flag(self):
+        self.flags_returned += 1
+        self.db_flags_returned += 1
+        
+    def dropped_flag(self):
+        self.flags_dropped += 1
+        self.db_flags_dropped += 1
+        
+    def get_flags_returned(self):
+        return self.flags_returned
+        
+    def get_flags_dropped(self):
+        return self.flags_dropped    
+        
+    def set_flag_capture_time(self, cap_time):
+        if cap_time < self.flag_capture_time:
+            self.flag_capture_time = cap_time
+
+    def get_flag_capture_time(self):
+        if self.flag_capture_time == 999:
+            return 0
+        return self.flag_capture_time
+
+# Bomb Mode
+    def is_bombholder(self):
+        self.bombholder = True
+
+    def bomb_tossed(self):
+        self.bombholder = False
+
+    def get_bombholder(self):
+        return self.bombholder
+
+    def kill_bomb_carrier(self):
+        self.bomb_carrier_killed += 1
+
+    def get_bomb_carrier_kills(self):
+        return self.bomb_carrier_killed
+
+    def kills_with_bomb(self):
+        self.killed_with_bomb += 1
+
+    def get_kills_with_bomb(self):
+        return self.killed_with_bomb
+
+    def planted_bomb(self):
+        self.bomb_planted += 1
+        self.bombholder = False
+
+    def get_planted_bomb(self):
+        return self.bomb_planted
+
+    def defused_bomb(self):
+        self.bomb_defused += 1
+
+    def get_defused_bomb(self):
+        return self.bomb_defused
+
+# Freeze Tag
+    def freeze(self):
+        self.froze += 1
+
+    def get_freeze(self):
+        return self.froze
+
+    def thawout(self):
+        self.thawouts += 1
+
+    def get_thawout(self):
+        return self.thawouts
+
+
+### CLASS Player Index ###
+class PlayerIndex(object):
+    """
+    index of the online players by name, slot number, @id and auth name,
+    and the player numbers of each team, of the admins and of the living players
+    """
+    def __init__(self):
+        """
+        create a new instance of PlayerIndex
+        """
+        # player number: (upper case name, player, keys)
+        self.players = {}
+        self.names = {}
+        self.ids = {}
+        self.authnames = {}
+        self.team_of = {}
+        self.teams = dict((team, set()) for team in Player.teams)
+        self.admins = set()
+        self.alive = set()
+
+    def add(self, player):
+        """
+        add a player or update the keys of an indexed player
+
+        @param player: The instance of the player
+        @type  player: Instance
+        """
+        player_num = player.get_player_num()
+        self.remove(player_num)
+        player.index = self
+        name = player.get_name().upper()
+        keys = ((self.names, name), (self.ids, '@%d' % player.get_player_id()), (self.authnames, player.get_authname()))
+        self.players[player_num] = (name, player, keys)
+        for table, key in keys:
+            if key:
+                table.setdefault(key, []).append(player_num)
+        self.update_status(player)
+
+    def update_status(self, player):
+        """
+        update the team, admin and alive sets of an indexed player
+
+        @param player: The instance of the player
+        @type  player: Instance
+        """
+        player_num = player.get_player_num()
+        if player_num not in self.players:
+            return
+        team = player.get_team()
+        if self.team_of.get(player_num) != team:
+            if player_num in self.team_of:
+                self.teams[self.team_of[player_num]].discard(player_num)
+            self.teams[team].add(player_num)
+            self.team_of[player_num] = team
+        if player.get_admin_role() >= 20:
+            self.admins.add(player_num)
+        else:
+            self.admins.discard(player_num)
+        if player.get_alive():
+            self.alive.add(player_num)
+        else:
+            self.alive.discard(player_num)
+
+    def remove(self, player_num):
+        """
+        remove a player from the index
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        """
+        entry = self.players.pop(player_num, None)
+        if entry:
+            for table, key in entry[2]:
+                if key in table:
+                    table[key].remove(player_num)
+                    if not table[key]:
+                        del table[key]
+            if player_num in self.team_of:
+                self.teams[self.team_of.pop(player_num)].discard(player_num)
+            self.admins.discard(player_num)
+            self.alive.discard(player_num)
+            entry[1].index = None
+
+    def find_exact(self, user):
+        """
+        return the player whose name, slot number, @id or auth name equals the search term, or None
+
+        @param user: The search term
+        @type  user: String
+        """
+        player_nums = self.names.get(user.upper()) or self.ids.get(user) or self.authnames.get(user.lower())
+        if player_nums:
+            return self.players[min(player_nums)][1]
+        if user.isdigit() and user == str(int(user)) and int(user) in self.players:
+            return self.players[int(user)][1]
+        return None
+
+    def find_partial(self, user):
+        """
+        return the players whose name contains the search term, names starting
+        with the search term first, then shorter names and lower slot numbers
+
+        @param user: The search term
+        @type  user: String
+        """
+        user = user.upper()
+        matches = [(not name.startswith(user), len(name), player_num, player) for player_num, (name, player, _) in self.players.iteritems() if user in name]
+        matches.sort()
+        return [match[3] for match in matches]
+
+    def get_team(self, team):
+        """
+        return the players of a team ordered by player number
+
+        @param team: The team number
+        @type  team: Integer
+        """
+        return [self.players[player_num][1] for player_num in sorted(self.teams[team])]
+
+    def get_alive(self, team):
+        """
+        return the living players of a team ordered by player number
+
+        @param team: The team number
+        @type  team: Integer
+        """
+        return [self.players[player_num][1] for player_num in sorted(self.teams[team] & self.alive)]
+
+    def get_admins(self):
+        """
+        return the admins online ordered by player number
+        """
+        return [self.players[player_num][1] for player_num in sorted(self.admins)]
+
+    def count(self, team):
+        """
+        return the number of players of a team
+
+        @param team: The team number
+        @type  team: Integer
+        """
+        return len(self.teams[team])
+
+
+### CLASS Game ###
+class Game(object):
+    """
+    Game class
+    """
+    def __init__(self, config_file, urt_modversion, quake=None):
+        """
+        create a new instance of Game
+
+        @param config_file: The full path of the bot configuration file
+        @type  config_file: String
+        @param quake: Stand-in for the RCON connection, the queued commands are sent by flush_rcon
+        @type  quake: Instance
+        """
+        self.all_maps_list = []
+        self.next_mapname = ''
+        self.mapname = ''
+        self.maplist = []
+        self.last_maps_list = []
+        self.players = {}
+        self.player_index = PlayerIndex()
+        self.live = False
+        self.urt_modversion = urt_modversion
+        game_cfg = ConfigParser.ConfigParser()
+        game_cfg.read(config_file)
+        self.server_name = game_cfg.get('server', 'server_name')
+        self.queue = RconQueue(RCON_MAX_WAIT)
+        # list of (query, callback) waiting for the response
+        self.callbacks = []
+        self.callback_lock = RLock()
+        # number of completed command groups and the longest completion time
+        self.group_stats = [0, 0]
+        self.cache = RconCache()
+        self.cvar_ttl = game_cfg.getfloat('server', 'cvar_cache_ttl') if game_cfg.has_option('server', 'cvar_cache_ttl') else RCON_CVAR_TTL
+        self.status_ttl = game_cfg.getfloat('server', 'status_cache_ttl') if game_cfg.has_option('server', 'status_cache_ttl') else RCON_STATUS_TTL
+        # headshot announcements and HIT Stats are sent at most once per player and window, 0 = every message
+        announce_interval = game_cfg.getint('bot', 'announce_interval') if game_cfg.has_option('bot', 'announce_interval') else 10
+        # headshot announcements: summary, milestones or off
+        headshot_announcements = game_cfg.get('bot', 'headshot_announcements') if game_cfg.has_option('bot', 'headshot_announcements') else 'summary'
+        self.announcer = Announcer(self, announce_interval, headshot_announcements)
+        # set whenever a command is queued, the RCON thread waits for it
+        self.rcon_wakeup = Event()
+        if quake:
+            self.quake = quake
+            self.pacer = None
+        else:
+            # the queued commands are sent by the RCON thread of the server host
+            self.quake = PyQuake3("%s:%s" % (game_cfg.get('server', 'server_ip'), game_cfg.get('server', 'server_port')), game_cfg.get('server', 'rcon_password'))
+            rcon_rate = game_cfg.getint('server', 'rcon_rate') if game_cfg.has_option('server', 'rcon_rate') else RCON_RATE
+            rcon_window = game_cfg.getfloat('server', 'rcon_window') if game_cfg.has_option('server', 'rcon_window') else RCON_WINDOW
+            rcon_burst = game_cfg.getint('server', 'rcon_burst') if game_cfg.has_option('server', 'rcon_burst') else RCON_BURST
+            # the rate adapts between the bounds, equal bounds keep a fixed rate
+            rcon_min_rate = game_cfg.getint('server', 'rcon_min_rate') if game_cfg.has_option('server', 'rcon_min_rate') else min(RCON_MIN_RATE, rcon_rate)
+            rcon_max_rate = game_cfg.getint('server', 'rcon_max_rate') if game_cfg.has_option('server', 'rcon_max_rate') else rcon_rate
+            rcon_target_rtt = game_cfg.getfloat('server', 'rcon_target_rtt') if game_cfg.has_option('server', 'rcon_target_rtt') else RCON_TARGET_RTT
+            rcon_server_limit = game_cfg.getint('server', 'rcon_server_limit') if game_cfg.has_option('server', 'rcon_server_limit') else RCON_SERVER_LIMIT
+            self.pacer = RconPacer(rcon_rate, rcon_window, rcon_burst, min_rate=rcon_min_rate, max_rate=rcon_max_rate, target_rtt=rcon_target_rtt,
+                                   server_limit=rcon_server_limit)
+            self.group_burst = game_cfg.getint('server', 'rcon_group_burst') if game_cfg.has_option('server', 'rcon_group_burst') else RCON_GROUP_BURST
+            logger.info("Opening RCON socket   : OK")
+
+        # dynamic mapcycle
+        self.dynamic_mapcycle = game_cfg.getboolean('mapcycle', 'dynamic_mapcycle') if game_cfg.has_option('mapcycle', 'dynamic_mapcycle') else False
+        if self.dynamic_mapcycle:
+            self.switch_count = game_cfg.getint('mapcycle', 'switch_count') if game_cfg.has_option('mapcycle', 'switch_count') else 4
+            self.big_cycle = filter(None, game_cfg.get('mapcycle', 'big_cycle').replace(' ', '').split(',')) if game_cfg.has_option('mapcycle', 'big_cycle') else []
+            self.small_cycle = filter(None, game_cfg.get('mapcycle', 'small_cycle').replace(' ', '').split(',')) if game_cfg.has_option('mapcycle', 'small_cycle') else []
+
+        # add Spunky Bot as player 'World' to the game
+        spunky_bot = Player(BOT_PLAYER_NUM, '127.0.0.1', 'NONE', 'World')
+        self.add_player(spunky_bot)
+        logger.info("Activating the Bot    : OK")
+        logger.info("Startup completed     : Let's get ready to rumble!")
+        logger.info("Spunky Bot is running until you are closing this session or pressing CTRL + C to abort this process.")
+        logger.info("*** Note: Use the provided initscript to run Spunky Bot as daemon ***")
+
+    def send_queued_rcon(self):
+        """
+        send the next queued RCON command if the flood limit allows it, called by the RCON thread
+        of the server host. Return the seconds until the next command may be sent, or None if
+        there is no command to send.
+        """
+        if self.queue.empty() or not self.live:
+            return None
+        # the queue is only locked to take the command, the commands are queued while this thread waits for the server
+        with self.queue.lock:
+            priority = self.queue.next_priority()
+            if priority is None:
+                return None
+            # keep a token for kicks and other enforcement commands
+            reserve = 0 if priority == RCON_ENFORCE else 1
+            command = None
+            if not isinstance(self.queue.peek(priority), RconGroup):
+                delay = self.pacer.get_delay(reserve=reserve)
+                if delay == 0:
+                    command = self.queue.get(priority)
+            else:
+                delay = self.pacer.get_group_delay()
+                if delay == 0:
+                    command = self.queue.get(priority)
+                elif self.queue.has_command(priority):
+                    # a command queued behind a waiting group is sent in between
+                    command_delay = self.pacer.get_delay(reserve=reserve)
+                    delay = min(delay, command_delay)
+                    if command_delay == 0:
+                        command = self.queue.get_command(priority)
+            if command is None:
+                return delay
+        if isinstance(command, RconGroup):
+            self.send_group_burst(command)
+            return 0
+        self.pacer.consume()
+        try:
+            if isinstance(command, RconQuery):
+                command.execute(self.quake, self.pacer)
+            else:
+                start = time.time()
+                if command != 'status':
+                    self.quake.rcon(command)
+                else:
+                    self.quake.rcon_update()
+                self.pacer.record_response(time.time() - start)
+        except Exception as err:
+            self.pacer.record_loss()
+            logger.error(err, exc_info=True)
+        return 0
+
+    def query(self, request, check=None, parse=None, callback=None):
+        """
+        queue an RCON request and return the query at once. The caller waits for the response
+        with the result method of the query, or the callback is called with the value by
+        run_callbacks in the thread handling the events.
+
+        @param request: Function sending the request with the PyQuake3 connection and returning the response
+        @type  request: Function
+        @param check: Function returning True if the response belongs to the request
+        @type  check: Function
+        @param parse: Function returning the value of the response
+        @type  parse: Function
+        @param callback: Function called with the value of the response
+        @type  callback: Function
+        """
+        query = RconQuery(request, check, parse)
+        if not self.live:
+            query.finished.set()
+        elif not self.pacer:
+            # without RCON thread the request is sent at once
+            query.execute(self.quake)
+        else:
+            self.queue.put(query, RCON_CONTROL)
+            self.rcon_wakeup.set()
+        if callback:
+            self.add_callback(query, callback)
+        return query
+
+    def cached_query(self, key, ttl, create, callback=None):
+        """
+        return the cached query of the key, a new query is created if there is none
+
+        @param key: The key of the query in the cache
+        @type  key: String or Tuple
+        @param ttl: The seconds a new query is reused
+        @type  ttl: Float
+        @param create: Function returning the new query
+        @type  create: Function
+        @param callback: Function called with the value of the response
+        @type  callback: Function
+        """
+        query = self.cache.get(key)
+        if query is None:
+            query = create()
+            self.cache.put(key, query, ttl)
+        if callback:
+            self.add_callback(query, callback)
+        return query
+
+    def add_callback(self, query, callback):
+        """
+        call the callback with the value of the query once the server has responded
+
+        @param query: The query
+        @type  query: RconQuery
+        @param callback: Function called with the value of the response
+        @type  callback: Function
+        """
+        with self.callback_lock:
+            self.callbacks.append((query, callback))
+        if query.done():
+            self.run_callbacks()
+
+    def add_callback_all(self, queries, callback):
+        """
+        call the callback with the list of values once the server has responded to all queries
+
+        @param queries: The queries
+        @type  queries: List
+        @param callback: Function called with the values of the responses
+        @type  callback: Function
+        """
+        def check_queries(_):
+            for query in queries:
+                if not query.done():
+                    self.add_callback(query, check_queries)
+                    return
+            callback([query.value for query in queries])
+        check_queries(None)
+
+    def run_callbacks(self):
+        """
+        call the callbacks of the answered queries
+        """
+        answered = []
+        with self.callback_lock:
+            callbacks = self.callbacks
+            self.callbacks = []
+            for query, callback in callbacks:
+                if query.done():
+                    answered.append((query, callback))
+                else:
+                    self.callbacks.append((query, callback))
+        for query, callback in answered:
+            try:
+                callback(query.value)
+            except Exception as err:
+                logger.error(err, exc_info=True)
+
+    def query_cvar(self, name, callback=None):
+        """
+        query a CVAR value, the value is None if the server did not respond
+
+        @param name: The name of the CVAR
+        @type  name: String
+        @param callback: Function called with the value
+        @type  callback: Function
+        """
+        return self.cached_query(('cvar', name.lower()), self.cvar_ttl,
+                                 lambda: self.query(lambda quake: quake.rcon(name),
+                                                    check=lambda response: ('"%s"' % name.lower()) in response[1].lower(),
+                                                    parse=lambda response: response[1].split(':')[1].split('^7')[0].lstrip('"')),
+                                 callback)
+
+    def query_status(self, callback=None):
+        """
+        query the RCON status, the value is the list of players with number and ping
+
+        @param callback: Function called with the list of players
+        @type  callback: Function
+        """
+        def request(quake):
+            quake.rcon_update()
+            return list(quake.players)
+        return self.cached_query('status', self.status_ttl, lambda: self.query(request), callback)
+
+    def query_serverinfo(self, callback=None):
+        """
+        query the server variables, the value is a dictionary of the variables
+
+        @param callback: Function called with the dictionary of the variables
+        @type  callback: Function
+        """
+        def request(quake):
+            quake.update()
+            return dict(quake.variables)
+        return self.cached_query('serverinfo', self.cvar_ttl, lambda: self.query(request), callback)
+
+    def reset_rcon_cache(self, serverinfo=None):
+        """
+        clear the cached queries, the server info of an InitGame event replaces the query
+
+        @param serverinfo: The server settings of the InitGame event
+        @type  serverinfo: Dict
+        """
+        self.cache.invalidate()
+        if serverinfo:
+            self.cache.set_value('serverinfo', dict(serverinfo), self.cvar_ttl)
+
+    def get_number_players(self):
+        """
+        get the number of online players
+        """
+        return len(self.players) - 1  # bot is counted as player
+
+    def get_mapcycle(self, callback):
+        """
+        get the maps of the mapcycle.txt file, the callback is called with the list of maps
+        once the server has responded
+
+        @param callback: Function called with the list of maps
+        @type  callback: Function
+        """
+        # get path of fs_homepath and fs_basepath
+        if not self.live:
+            callback([])
+            return
+        queries = [self.query_cvar(name) for name in ('fs_homepath', 'fs_basepath', 'fs_game', 'g_mapcycle')]
+        self.add_callback_all(queries, lambda values: callback(self.read_mapcycle(*values)))
+
+    def read_mapcycle(self, fs_homepath, fs_basepath, fs_game, mapcycle_file):
+        """
+        return the maps of the mapcycle.txt file in the home or base path of the server
+        """
+        maplist = []
+        logger.debug("fs_homepath           : %s", fs_homepath)
+        logger.debug("fs_basepath           : %s", fs_basepath)
+        try:
+            # set full path of mapcycle.txt
+            mc_home_path = os.path.join(fs_homepath, fs_game, mapcycle_file) if fs_homepath else ""
+            mc_base_path = os.path.join(fs_basepath, fs_game, mapcycle_file) if fs_basepath else ""
+        except TypeError:
+            logger.error("ERROR: Server did not respond to mapcycle path request, use !rebuild or restart the Bot")
+            return maplist
+        if os.path.isfile(mc_home_path):
+            mapcycle_path = mc_home_path
+        elif os.path.isfile(mc_base_path):
+            mapcycle_path = mc_base_path
+        else:
+            mapcycle_path = None
+        if mapcycle_path:
+            logger.info("Mapcycle path         : %s", mapcycle_path)
+            with open(mapcycle_path, 'r') as file_handle:
+                lines = [line for line in file_handle if line != '\n']
+            try:
+                while 1:
+                    tmp = lines.pop(0).strip()
+                    if tmp[0] == '{':
+                        while tmp[0] != '}':
+                            tmp = lines.pop(0).strip()
+                        tmp = lines.pop(0).strip()
+                    maplist.append(tmp)
+            except IndexError:
+                pass
+        return maplist
+
+    def send_rcon(self, command, priority=None):
+        """
+        send RCON command
+
+        @param command: The RCON command
+        @type  command: String
+        @param priority: The priority class, by default derived from the command
+        @type  priority: Integer
+        """
+        if self.live:
+            self.invalidate_cvars(command)
+            self.queue.put(command, self.get_rcon_priority(command) if priority is None else priority)
+            self.rcon_wakeup.set()
+
+    def send_rcon_group(self, name, commands, priority=None):
+        """
+        send related RCON commands as one unit, the commands are sent back to back in bursts
+        within the flood limit. Return the group, which records the completion time.
+
+        @param name: The name of the operation used in the log
+        @type  name: String
+        @param commands: The RCON commands
+        @type  commands: List
+        @param priority: The priority class, by default derived from the first command
+        @type  priority: Integer
+        """
+        group = RconGroup(name, commands, priority)
+        if not self.live or not group.pending:
+            group.finish()
+            return group
+        for command in group.pending:
+            self.invalidate_cvars(command)
+        if group.priority is None:
+            group.priority = self.get_rcon_priority(group.pending[0])
+        self.queue.put(group, group.priority)
+        self.rcon_wakeup.set()
+        return group
+
+    def send_group_burst(self, group):
+        """
+        send the next burst of a group, up to rcon_group_burst commands within the server limit.
+        The remaining commands are queued again behind their class, so a kick queued in the
+        meantime is sent before the next burst.
+
+        @param group: The group of commands
+        @type  group: RconGroup
+        """
+        group.start()
+        for command in group.take(max(1, min(self.pacer.get_group_allowance(), self.group_burst))):
+            self.pacer.record_send()
+            start = time.time()
+            try:
+                self.quake.rcon(command)
+                self.pacer.record_response(time.time() - start)
+            except Exception as err:
+                self.pacer.record_loss()
+                logger.error(err, exc_info=True)
+        if group.pending:
+            self.queue.put(group, group.priority)
+        else:
+            self.finish_group(group)
+
+    def finish_group(self, group):
+        """
+        record the completion time of a group
+
+        @param group: The group of commands
+        @type  group: RconGroup
+        """
+        group.finish()
+        self.group_stats[0] += 1
+        self.group_stats[1] = max(self.group_stats[1], group.get_duration())
+        logger.debug("RCON group %s: %d commands completed in %.0f ms", group.name, group.sent, group.get_duration() * 1000)
+
+    def get_group_stats(self):
+        """
+        return the number of completed groups and the longest completion time since the last call
+        """
+        stats = tuple(self.group_stats)
+        self.group_stats = [0, 0]
+        return stats
+
+    def get_rcon_priority(self, command):
+        """
+        return the priority class of an RCON command
+
+        @param command: The RCON command
+        @type  command: String
+        """
+        return RCON_CHAT if command.startswith('^') else RCON_COMMAND_CLASSES.get(command.split(' ', 1)[0], RCON_CONTROL)
+
+    def invalidate_cvars(self, command):
+        """
+        remove the CVAR set by an RCON command from the query cache
+
+        @param command: The RCON command
+        @type  command: String
+        """
+        verb, _, args = command.partition(' ')
+        if verb in RCON_SET_COMMANDS:
+            self.cache.invalidate_cvar(args.split(' ', 1)[0])
+        elif args and verb not in RCON_COMMAND_CLASSES and not command.startswith('^'):
+            # <cvar> <value>
+            self.cache.invalidate_cvar(verb)
+
+    def flush_rcon(self):
+        """
+        send all queued RCON commands immediately, used if there is no RCON thread
+        """
+        while not self.queue.empty():
+            command = self.queue.get()
+            if isinstance(command, RconQuery):
+                command.execute(self.quake)
+            elif isinstance(command, RconGroup):
+                for group_command in command.take(len(command.pending)):
+                    self.quake.rcon(group_command)
+                self.finish_group(command)
+            elif command != 'status':
+                self.quake.rcon(command)
+            else:
+                self.quake.rcon_update()
+
+    def rcon_say(self, msg, priority=RCON_CHAT):
+        """
+        display message in global chat
+
+        @param msg: The message to display in global chat
+        @type  msg: String
+        @param priority: The priority class
+        @type  priority: Integer
+        """
+        # wrap long messages into shorter list elements
+        lines = textwrap.wrap(msg, 140)
+        for line in lines:
+            self.send_rcon('say %s' % line, priority)
+
+    def rcon_tell(self, player_num, msg, pm_tag=True):
+        """
+        tell message to a specific player
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        @param msg: The message to display in private chat
+        @type  msg: String
+        @param pm_tag: Display '[pm]' (private message) in front of the message
+        @type  pm_tag: bool
+        """
+        self.rcon_tell_lines(player_num, textwrap.wrap(msg, 128), pm_tag)
+
+    def rcon_tell_lines(self, player_num, lines, pm_tag=True):
+        """
+        tell a message already wrapped into lines to a specific player
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        @param lines: The lines of the message, at most 128 characters each
+        @type  lines: List
+        @param pm_tag: Display '[pm]' (private message) in front of the message
+        @type  pm_tag: bool
+        """
+        prefix = "^4[pm] "
+        for line in lines:
+            if pm_tag:
+                self.send_rcon('tell %d %s%s' % (player_num, prefix, line), RCON_REPLY)
+                prefix = ""
+            else:
+                self.send_rcon('tell %d %s' % (player_num, line), RCON_REPLY)
+
+    def rcon_bigtext(self, msg):
+        """
+        display bigtext message
+
+        @param msg: The message to display in global chat
+        @type  msg: String
+        """
+        self.send_rcon('bigtext "%s"' % msg, RCON_CHAT)
+
+    def rcon_forceteam(self, player_num, team):
+        """
+        force player to given team
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        @param team: The team (red, blue, spectator)
+        @type  team: String
+        """
+        self.send_rcon('forceteam %d %s' % (player_num, team), RCON_CONTROL)
+
+    def rcon_clear(self):
+        """
+        clear RCON queue
+        """
+        self.queue.clear()
+        self.announcer.clear()
+
+    def rcon_drop_player(self, player_num):
+        """
+        drop the queued RCON commands addressed to a player
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        """
+        self.queue.drop_player(player_num)
+
+    def kick_player(self, player_num, reason=''):
+        """
+        kick player
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        @param reason: Reason for kick
+        @type  reason: String
+        """
+        self.send_rcon(self.get_kick_command(player_num, reason), RCON_ENFORCE)
+
+    def get_kick_command(self, player_num, reason=''):
+        """
+        return the RCON command kicking a player
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        @param reason: Reason for kick
+        @type  reason: String
+        """
+        return 'kick %d "%s"' % (player_num, reason) if reason and self.urt_modversion > 41 else 'kick %d' % player_num
+
+    def go_live(self):
+        """
+        go live
+        """
+        self.live = True
+        # send the commands queued before going live
+        self.rcon_wakeup.set()
+        # the map settings are completed once the server has responded
+        self.set_all_maps(lambda all_maps: logger.info("Total number of maps  : %s", len(all_maps)))
+
+        def set_mapcycle(maplist):
+            self.maplist = filter(None, maplist)
+            logger.info("Mapcycle: %s", ', '.join(self.maplist))
+            self.set_current_map(lambda: logger.info("*** Live tracking: Current map: %s / Next map: %s ***", self.mapname, self.next_mapname))
+
+        def show_cvars(values):
+            logger.info("Server CVAR g_logsync : %s", values[0])
+            logger.info("Server CVAR g_loghits : %s", values[1])
+
+        self.get_mapcycle(set_mapcycle)
+        self.rcon_say("^7Powered by Spunky Bot ^3[%s]" % __version__)
+        self.add_callback_all([self.query_cvar('g_logsync'), self.query_cvar('g_loghits')], show_cvars)
+
+    def set_current_map(self, callback=None):
+        """
+        set the current and next map in rotation once the server info is known
+
+        @param callback: Function called when the maps are set
+        @type  callback: Function
+        """
+        if self.mapname:
+            self.last_maps_list = self.last_maps_list[-3:] + [self.mapname]
+        self.query_serverinfo(lambda serverinfo: self.set_maps((serverinfo or {}).get('mapname', self.next_mapname), callback))
+
+    def set_maps(self, mapname, callback=None):
+        """
+        set the current map and the next map in rotation
+
+        @param mapname: The name of the current map
+        @type  mapname: String
+        @param callback: Function called when the maps are set
+        @type  callback: Function
+        """
+        self.mapname = mapname
+
+        if self.dynamic_mapcycle:
+            self.maplist = filter(None, (self.small_cycle if self.get_number_players() < self.switch_count else self.big_cycle))
+            logger.debug("Players online: %s / Mapcycle: %s", self.get_number_players(), self.maplist)
+
+        if self.maplist:
+            if self.mapname in self.maplist:
+                if self.maplist.index(self.mapname) < (len(self.maplist) - 1):
+                    self.next_mapname = self.maplist[self.maplist.index(self.mapname) + 1]
+                else:
+                    self.next_mapname = self.maplist[0]
+            else:
+                self.next_mapname = self.maplist[0]
+        else:
+            self.next_mapname = self.mapname
+            
+        logger.debug("Current map: %s / Next map: %s", self.mapname, self.next_mapname)
+
+        if self.dynamic_mapcycle:
+            self.send_rcon('set g_nextmap %s' % self.next_mapname)
+            if self.mapname != self.next_mapname:
+                self.rcon_say("^3Next Map: ^7%s" % self.next_mapname)
+        if callback:
+            callback()
+
+    def set_all_maps(self, callback=None):
+        """
+        set a list of all available maps once the server has responded
+
+        @param callback: Function called with the list of all maps
+        @type  callback: Function
+        """
+        if not self.live:
+            if callback:
+                callback(self.all_maps_list)
+            return
+        all_maps = []
+        # number of responses with a directory header
+        count = [0]
+
+        def add_maps(response):
+            if response is None:
+                logger.error("ERROR: Server did not respond to the map list request")
+            else:
+                ret_val = response[1].split()
+                if "Directory" in ret_val:
+                    count[0] += 1
+                if count[0] < 2:
+                    all_maps.extend(ret_val)
+                    self.add_callback(self.query(lambda quake: quake.rcon("dir map bsp")), add_maps)
+                    return
+                all_maps_list = list(set([maps.replace("/", "").replace(".bsp", "") for maps in all_maps if maps.startswith("/")]))
+                all_maps_list.sort()
+                if all_maps_list:
+                    self.all_maps_list = all_maps_list
+            if callback:
+                callback(self.all_maps_list)
+
+        self.add_callback(self.query(lambda quake: quake.rcon("dir map bsp")), add_maps)
+
+    def get_all_maps(self):
+        """
+        get a list of all available maps
+        """
+        return self.all_maps_list
+
+    def get_last_maps(self):
+        """
+        get a list of the last played maps
+        """
+        return self.last_maps_list
+
+    def add_player(self, player):
+        """
+        add a player to the game
+
+        @param player: The instance of the player
+        @type  player: Instance
+        """
+        self.players[player.get_player_num()] = player
+        player.set_server_name(self.server_name)
+        # check DB for real players and exclude bots which have IP 0.0.0.0
+        if player.get_ip_address() != '0.0.0.0':
+            player.check_database()
+        if player.get_player_num() != BOT_PLAYER_NUM:
+            self.player_index.add(player)
+
+    def get_gamestats(self):
+        """
+        get number of players in red team, blue team and spectator
+        """
+        return {Player.teams[1]: self.player_index.count(1), Player.teams[2]: self.player_index.count(2), Player.teams[3]: self.player_index.count(3)}
+
+    def balance_teams(self, game_data):
+        """
+        balance teams if needed
+
+        @param game_data: Dictionary of players in each team
+        @type  game_data: dict
+        """
+        if (game_data[Player.teams[1]] - game_data[Player.teams[2]]) > 1:
+            team1 = 1
+            team2 = 2
+        elif (game_data[Player.teams[2]] - game_data[Player.teams[1]]) > 1:
+            team1 = 2
+            team2 = 1
+        else:
+            self.rcon_say("^7Teams are already balanced")
+            return
+        num_ptm = math.floor((game_data[Player.teams[team1]] - game_data[Player.teams[team2]]) / 2)
+        player_list = [player for player in self.player_index.get_team(team1) if not player.get_team_lock()]
+        player_list.sort(cmp=lambda player1, player2: cmp(player2.get_time_joined(), player1.get_time_joined()))
+        self.send_rcon_group('balance teams', ['forceteam %d %s' % (player.get_player_num(), Player.teams[team2]) for player in player_list[:int(num_ptm)]])
+        self.rcon_say("^7Autobalance complete!")
+
+### CLASS RCON Pacer ###
+class RconPacer(object):
+    """
+    token bucket limiting the RCON commands of a game server to a number of commands per
+    time window, a burst of commands after a quiet period is sent without delay. The send
+    times of the latest commands are kept to verify the rate. The rate adapts between the
+    minimum and maximum rate to the round trip times and lost responses of the server.
+    No command is sent above the number of requests per second the server accepts.
+    """
+    def __init__(self, rate, window, burst, history=1000, min_rate=RCON_MIN_RATE, max_rate=None, target_rtt=RCON_TARGET_RTT,
+                 server_limit=RCON_SERVER_LIMIT):
+        """
+        create a new instance of RconPacer
+
+        @param rate: The initial number of commands per window
+        @type  rate: Integer
+        @param window: The length of the window in seconds
+        @type  window: Float
+        @param burst: The number of commands sent without delay
+        @type  burst: Integer
+        @param history: The number of send times kept
+        @type  history: Integer
+        @param min_rate: The lowest number of commands per window
+        @type  min_rate: Integer
+        @param max_rate: The highest number of commands per window, by default the initial rate
+        @type  max_rate: Integer
+        @param target_rtt: The highest smoothed round trip time in seconds before the rate is lowered
+        @type  target_rtt: Float
+        @param server_limit: The number of requests per second the server accepts
+        @type  server_limit: Integer
+        """
+        self.min_rate = min_rate if min_rate > 0 else 1
+        self.max_rate = max(max_rate if max_rate else rate, self.min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.window = window if window > 0 else RCON_WINDOW
+        self.burst = burst if burst > 0 else 1
+        self.interval = self.window / self.rate
+        self.tokens = float(self.burst)
+        self.last_refill = time.time()
+        self.send_times = deque(maxlen=history)
+        self.sent = 0
+        self.target_rtt = target_rtt
+        self.rtts = deque(maxlen=RCON_RTT_SAMPLES)
+        self.srtt = None
+        self.losses = 0
+        self.last_adjust = time.time()
+        # one request is kept for kicks while a group is sent
+        self.server_limit = max(server_limit, 2)
+
+    def set_rate(self, rate):
+        """
+        change the number of commands per window, the tokens earned so far are kept
+
+        @param rate: The number of commands per window
+        @type  rate: Integer
+        """
+        self.refill()
+        self.rate = rate
+        self.interval = self.window / rate
+        self.last_adjust = time.time()
+
+    def record_response(self, rtt):
+        """
+        record the round trip time of a response, the rate is adjusted by one at most once per window
+
+        @param rtt: The seconds between request and response
+        @type  rtt: Float
+        """
+        self.rtts.append(rtt)
+        self.srtt = rtt if self.srtt is None else 0.875 * self.srtt + 0.125 * rtt
+        if time.time() - self.last_adjust < self.window:
+            return
+        if self.srtt > self.target_rtt and self.rate > self.min_rate:
+            self.set_rate(self.rate - 1)
+        elif self.srtt <= self.target_rtt and self.rate < self.max_rate:
+            self.set_rate(self.rate + 1)
+
+    def record_loss(self):
+        """
+        record a request without response, the rate is halved
+        """
+        self.losses += 1
+        if self.rate > self.min_rate:
+            self.set_rate(max(self.min_rate, self.rate // 2))
+
+    def get_rtt_stats(self):
+        """
+        return the 50th, 90th and 99th percentile of the latest round trip times in seconds
+        and the number of lost responses since the last call
+        """
+        rtts = sorted(self.rtts)
+        losses = self.losses
+        self.losses = 0
+        if not rtts:
+            return None, None, None, losses
+        return tuple([rtts[int(round(percent * (len(rtts) - 1)))] for percent in (0.5, 0.9, 0.99)]) + (losses,)
+
+    def refill(self):
+        """
+        add the tokens earned since the last refill
+        """
+        now = time.time()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) / self.interval)
+        self.last_refill = now
+
+    def get_delay(self, reserve=0):
+        """
+        return the seconds until the next command may be sent
+
+        @param reserve: The number of tokens which must remain for other commands, limited by the burst
+        @type  reserve: Integer
+        """
+        self.refill()
+        needed = 1 + min(reserve, self.burst - 1)
+        delay = 0 if self.tokens >= needed else (needed - self.tokens) * self.interval
+        return max(delay, self.get_server_delay(self.server_limit))
+
+    def get_server_delay(self, limit):
+        """
+        return the seconds until less than limit commands have been sent within the last second
+
+        @param limit: The number of commands
+        @type  limit: Integer
+        """
+        if len(self.send_times) < limit:
+            return 0
+        return max(0, self.send_times[-limit] + RCON_SERVER_WINDOW - time.time())
+
+    def get_group_delay(self):
+        """
+        return the seconds until the next command of a group may be sent, groups take no tokens
+        """
+        return self.get_server_delay(self.server_limit - 1)
+
+    def get_group_allowance(self):
+        """
+        return the number of commands of a group which may be sent now
+        """
+        now = time.time()
+        recent = 0
+        for send_time in reversed(self.send_times):
+            if now - send_time >= RCON_SERVER_WINDOW:
+                break
+            recent += 1
+        return max(0, self.server_limit - 1 - recent)
+
+    def consume(self):
+        """
+        take a token for a command which is sent now
+        """
+        self.tokens -= 1
+        self.record_send()
 
-    def update_db_admin_role(self, role):
-        values = (role, self.guid)
-        curs.execute("UPDATE `xlrstats` SET `admin_role` = ? WHERE `guid` = ?", values)
-        conn.commit()
-        # overwrite admin role in game, no reconnect of player required
-        self.set_admin_role(role)
+    def record_send(self):
+        """
+        record the send time of a command
+        """
+        self.sent += 1
+        self.send_times.append(time.time())
 
-    def get_ban_id(self):
-        return self.ban_id
+    def get_send_times(self):
+        """
+        return the send times of the latest commands
+        """
+        return list(self.send_times)
 
-    def get_ban_msg(self):
-        return REASONS[self.ban_msg] if self.ban_msg in REASONS else self.ban_msg
+    def get_rate_stats(self):
+        """
+        return the number of commands since the last call and the highest number
+        of these commands sent within one window
+        """
+        commands = self.sent
+        self.sent = 0
+        send_times = self.get_send_times()[-commands:] if commands else []
+        peak = 0
+        first = 0
+        for last in xrange(len(send_times)):
+            while send_times[last] - send_times[first] >= self.window:
+                first += 1
+            peak = max(peak, last - first + 1)
+        return commands, peak
 
-    def set_name(self, name):
-        # remove whitespaces
-        self.name = name.replace(' ', '')
-        # remove color character
-        for item in xrange(10):
-            self.name = self.name.replace('^%d' % item, '')
-        # limit length of name to 20 character
-        self.name = self.name[:20]
-        self.namechanges += 1
-       
-    def set_gear(self, gear):
-        # remove empty gearslots from string
-        gear_str = gear.replace('A', '')
-        while len(gear_str) < 5:
-            gear_str += 'A'
-            if len(gear_str) == 5:
-                break
-        self.gear = gear_str
-            
 
-    def get_gear(self):
-        return self.gear
+### CLASS RCON Query ###
+class RconQuery(object):
+    """
+    RCON request sent by the RCON thread of the server host, the caller waits for the
+    response with result. Requests without response or with a response belonging to
+    another request are repeated.
+    """
+    def __init__(self, request, check=None, parse=None):
+        """
+        create a new instance of RconQuery
 
-    def get_name(self):
-        return self.name
-        
-    def get_namechanges(self):
-        return self.namechanges
+        @param request: Function sending the request with the PyQuake3 connection and returning the response
+        @type  request: Function
+        @param check: Function returning True if the response belongs to the request
+        @type  check: Function
+        @param parse: Function returning the value of the response
+        @type  parse: Function
+        """
+        self.request = request
+        self.check = check
+        self.parse = parse
+        self.value = None
+        self.finished = Event()
 
-    def set_authname(self, authname):
-        self.authname = authname
+    def execute(self, quake, pacer=None):
+        """
+        send the request and set the value of the response
 
-    def get_authname(self):
-        return self.authname
+        @param quake: The RCON connection
+        @type  quake: PyQuake3
+        @param pacer: The pacer recording the round trip times and lost responses
+        @type  pacer: RconPacer
+        """
+        for _ in xrange(RCON_QUERY_RETRIES + 1):
+            start = time.time()
+            try:
+                response = self.request(quake)
+            except Exception as err:
+                logger.debug("RCON request failed: %s", err)
+                if pacer:
+                    pacer.record_loss()
+                continue
+            if pacer:
+                pacer.record_response(time.time() - start)
+            if self.check is None or self.check(response):
+                try:
+                    self.value = self.parse(response) if self.parse else response
+                except (IndexError, KeyError, TypeError):
+                    self.value = None
+                break
+            logger.debug("RCON response belongs to another request: %s", response)
+        self.finished.set()
 
-    def get_aliases(self):
-        if len(self.aliases) == 15:
-            self.aliases.append("and more...")
-        return str(", ^3".join(self.aliases))
+    def done(self):
+        """
+        return True if the query has been answered or has failed
+        """
+        return self.finished.is_set()
 
-    def set_guid(self, guid):
-        self.guid = guid
+    def result(self, timeout=RCON_QUERY_TIMEOUT):
+        """
+        wait for the response and return its value, or None if the server did not respond in time
 
-    def get_guid(self):
-        return self.guid
+        @param timeout: The seconds to wait
+        @type  timeout: Float
+        """
+        self.finished.wait(timeout)
+        return self.value
 
-    def get_player_num(self):
-        return self.player_num
 
-    def get_player_id(self):
-        return self.player_id
+### CLASS RCON Cache ###
+class RconCache(object):
+    """
+    RCON queries reused until their time to live expires, a running query is shared by all callers
+    """
+    def __init__(self):
+        """
+        create a new instance of RconCache
+        """
+        # key: (expiry time, query), keys are 'status', 'serverinfo' or ('cvar', <name>)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = RLock()
 
-    def set_team(self, team):
-        self.team = team
+    def get(self, key):
+        """
+        return the cached query or None if it has expired or failed
 
-    def get_team(self):
-        return self.team
+        @param key: The key of the query
+        @type  key: String or Tuple
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and CLOCK.time() < entry[0] and not (entry[1].done() and entry[1].value is None):
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
 
-    def get_team_lock(self):
-        return self.team_lock
+    def put(self, key, query, ttl):
+        """
+        cache a query
 
-    def set_team_lock(self, team):
-        self.team_lock = team
+        @param key: The key of the query
+        @type  key: String or Tuple
+        @param query: The query
+        @type  query: RconQuery
+        @param ttl: The seconds the query is reused, 0 = not cached
+        @type  ttl: Float
+        """
+        if ttl > 0:
+            with self.lock:
+                self.entries[key] = (CLOCK.time() + ttl, query)
 
-    def get_num_played(self):
-        return self.num_played
+    def set_value(self, key, value, ttl):
+        """
+        cache a value known without request, e.g. from an event of the games.log
 
-    def get_last_visit(self):
-        return str(self.last_visit)
+        @param key: The key of the query
+        @type  key: String or Tuple
+        @param value: The value
+        @param ttl: The seconds the value is reused
+        @type  ttl: Float
+        """
+        query = RconQuery(None)
+        query.value = value
+        query.finished.set()
+        self.put(key, query, ttl)
 
-    def get_first_seen_date(self):
-        return str(self.first_seen)
+    def invalidate(self, key=None):
+        """
+        remove a query or all queries from the cache
 
-    def get_db_kills(self):
-        return self.db_kills
+        @param key: The key of the query, None = all queries
+        @type  key: String or Tuple
+        """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
 
-    def get_kills(self):
-        return self.kills
+    def invalidate_cvar(self, name):
+        """
+        remove a CVAR and the server info containing the CVAR from the cache
 
-    def get_db_assists(self):
-        return self.db_assists
+        @param name: The name of the CVAR
+        @type  name: String
+        """
+        with self.lock:
+            self.entries.pop(('cvar', name.lower()), None)
+            entry = self.entries.get('serverinfo')
+            if entry and entry[1].done() and name.lower() in [variable.lower() for variable in (entry[1].value or {})]:
+                del self.entries['serverinfo']
 
-    def get_assists(self):
-        return self.assists
+    def get_stats(self):
+        """
+        return the number of cache hits and misses since the last call
+        """
+        with self.lock:
+            hits, misses = self.hits, self.misses
+            self.hits = self.misses = 0
+            return hits, misses
 
-    def get_db_deaths(self):
-        return self.db_deaths
-        
-    def get_db_flags_captured(self):
-        return self.db_flags_captured
 
-    def get_db_flags_returned(self):
-        return self.db_flags_returned
+### CLASS RCON Group ###
+class RconGroup(object):
+    """
+    related RCON commands sent as one unit in short bursts, e.g. the smites at the end of a round
+    """
+    def __init__(self, name, commands, priority=None):
+        """
+        create a new instance of RconGroup
 
-    def get_db_flags_dropped(self):
-        return self.db_flags_dropped
+        @param name: The name of the operation used in the log
+        @type  name: String
+        @param commands: The RCON commands
+        @type  commands: List
+        @param priority: The priority class
+        @type  priority: Integer
+        """
+        self.name = name
+        self.pending = list(commands)
+        self.priority = priority
+        self.sent = 0
+        self.queue_time = time.time()
+        self.start_time = None
+        self.finish_time = None
+        self.finished = Event()
 
-    def get_deaths(self):
-        return self.deaths
+    def start(self):
+        """
+        record the time the first command is sent
+        """
+        if self.start_time is None:
+            self.start_time = time.time()
 
-    def get_db_headshots(self):
-        return self.db_head_shots
+    def take(self, count):
+        """
+        remove and return the next commands to send
 
-    def get_headshots(self):
-        return self.head_shots
+        @param count: The highest number of commands
+        @type  count: Integer
+        """
+        commands = self.pending[:count]
+        del self.pending[:count]
+        self.sent += len(commands)
+        return commands
 
-    def disable_welcome_msg(self):
-        self.welcome_msg = False
+    def remove(self, condition):
+        """
+        remove the pending commands matching a condition and return their number
 
-    def get_welcome_msg(self):
-        return self.welcome_msg
+        @param condition: Function returning True for the commands to remove
+        @type  condition: Function
+        """
+        kept = [command for command in self.pending if not condition(command)]
+        removed = len(self.pending) - len(kept)
+        self.pending = kept
+        return removed
 
-    def get_country(self):
-        return self.country
+    def finish(self):
+        """
+        record the completion of the group
+        """
+        self.finish_time = time.time()
+        self.finished.set()
 
-    def get_registered_user(self):
-        return self.registered_user
+    def get_duration(self):
+        """
+        return the seconds between queueing the group and sending its last command
+        """
+        return (self.finish_time or time.time()) - self.queue_time
 
-    def set_admin_role(self, role):
-        self.admin_role = role
 
-    def get_admin_role(self):
-        return self.admin_role
+### CLASS RCON Queue ###
+class RconQueue(object):
+    """
+    send queue of the RCON commands of a game server with priority classes, the commands of
+    a class are sent in order. A command of a lower class is sent before the higher classes
+    once it has waited longer than the starvation limit.
+    """
+    def __init__(self, max_wait):
+        """
+        create a new instance of RconQueue
 
-    def get_ip_address(self):
-        return self.address
+        @param max_wait: The seconds a command waits at most behind higher classes
+        @type  max_wait: Float
+        """
+        self.max_wait = max_wait
+        # one queue of (queue time, command) per class
+        self.queues = [deque() for _ in RCON_CLASSES]
+        self.max_waits = [0.0] * len(RCON_CLASSES)
+        # number of commands saved by coalescing
+        self.saved = {'bigtext': 0, 'say': 0, 'disconnect': 0}
+        self.lock = RLock()
 
-    def get_time_joined(self):
-        return self.time_joined
+    def put(self, command, priority):
+        """
+        queue a command
 
-    def get_max_kill_streak(self):
-        return self.max_kill_streak
+        @param command: The RCON command, query or group
+        @type  command: String, RconQuery or RconGroup
+        @param priority: The priority class
+        @type  priority: Integer
+        """
+        with self.lock:
+            queue = self.queues[priority]
+            if not isinstance(command, basestring):
+                # queries and groups are never merged
+                pass
+            elif command.startswith('bigtext '):
+                # only the newest bigtext is displayed
+                self.saved['bigtext'] += self.remove(queue, lambda queued: queued.startswith('bigtext '))
+            elif command.startswith('say ') and queue and isinstance(queue[-1][1], basestring) and queue[-1][1].startswith('say ') and len(queue[-1][1]) + len(RCON_SAY_SEPARATOR) + len(command) - 8 <= RCON_SAY_WIDTH:
+                queue[-1] = (queue[-1][0], "%s%s%s" % (queue[-1][1], RCON_SAY_SEPARATOR, command[4:]))
+                self.saved['say'] += 1
+                return
+            queue.append((time.time(), command))
 
-    def kill(self):
-        now = time.time()
-        self.killing_streak += 1
-        self.kills += 1
-        self.db_kills += 1
-        if now - self.monsterkill['time'] < 5:
-            self.monsterkill['kills'] += 1
-        else:
-            self.monsterkill['time'] = now
-            self.monsterkill['kills'] = 1
+    def remove(self, queue, condition):
+        """
+        remove the matching commands from a class and return their number
 
-    def assist(self):
-        self.assists += 1
-        self.db_assists += 1
+        @param queue: The queue of the class
+        @type  queue: deque
+        @param condition: Function returning True for the commands to remove, queries and groups are kept
+        @type  condition: Function
+        """
+        kept = [entry for entry in queue if not isinstance(entry[1], basestring) or not condition(entry[1])]
+        removed = len(queue) - len(kept)
+        if removed:
+            queue.clear()
+            queue.extend(kept)
+        return removed
 
-    def die(self):
-        if self.killing_streak > self.max_kill_streak:
-            self.max_kill_streak = self.killing_streak
-        if self.max_kill_streak > self.db_killing_streak:
-            self.db_killing_streak = self.max_kill_streak
-        self.killing_streak = 0
-        self.deaths += 1
-        self.db_deaths += 1
-        self.monsterkill = {'time': 999, 'kills': 0}
+    def drop_player(self, player_num):
+        """
+        remove the queued commands addressed to a player who has disconnected
 
-    def get_monsterkill(self):
-        return self.monsterkill['kills']
+        @param player_num: The player number
+        @type  player_num: Integer
+        """
+        number = str(player_num)
 
-    def set_alive(self, status):
-        self.alive = status
-        if status:
-            self.respawn_time = time.time()
+        def addressed(command):
+            parts = command.split(' ', 2)
+            return parts[0] in RCON_PLAYER_COMMANDS and len(parts) > 1 and parts[1] == number
 
-    def get_alive(self):
-        return self.alive
+        with self.lock:
+            for queue in self.queues:
+                self.saved['disconnect'] += self.remove(queue, addressed)
+                for _, group in [entry for entry in queue if isinstance(entry[1], RconGroup)]:
+                    self.saved['disconnect'] += group.remove(addressed)
 
-    def get_respawn_time(self):
-        return self.respawn_time
+    def next_priority(self):
+        """
+        return the class of the command which is sent next, or None if the queue is empty
+        """
+        with self.lock:
+            now = time.time()
+            next_class = None
+            for priority, queue in enumerate(self.queues):
+                if not queue:
+                    continue
+                if next_class is None:
+                    next_class = priority
+                # the oldest starving command of a lower class goes first
+                elif now - queue[0][0] > self.max_wait and queue[0][0] < self.queues[next_class][0][0]:
+                    next_class = priority
+            return next_class
 
-    def suicide(self):
-        self.db_suicide += 1
+    def peek(self, priority):
+        """
+        return the first command of a class without removing it, or None if the class is empty
 
-    def headshot(self):
-        self.head_shots += 1
-        self.db_head_shots += 1
+        @param priority: The priority class, see next_priority
+        @type  priority: Integer
+        """
+        with self.lock:
+            queue = self.queues[priority]
+            return queue[0][1] if queue else None
 
-    def set_hitzones(self, part):
-        self.hitzone[part] += 1
+    def has_command(self, priority):
+        """
+        return True if a class contains a command or query which is not part of a group
 
-    def get_hitzones(self, part):
-        return self.hitzone[part]
+        @param priority: The priority class
+        @type  priority: Integer
+        """
+        with self.lock:
+            return any(not isinstance(command, RconGroup) for _, command in self.queues[priority])
 
-    def set_all_hits(self):
-        self.all_hits += 1
+    def get_command(self, priority):
+        """
+        remove and return the first command or query of a class which is not part of a group,
+        used to send a kick while the group in front of it waits for the server limit
 
-    def get_all_hits(self):
-        return self.all_hits
+        @param priority: The priority class
+        @type  priority: Integer
+        """
+        with self.lock:
+            queue = self.queues[priority]
+            for entry in queue:
+                if not isinstance(entry[1], RconGroup):
+                    queue.remove(entry)
+                    self.max_waits[priority] = max(self.max_waits[priority], time.time() - entry[0])
+                    return entry[1]
+            return None
 
-    def set_he_kill(self):
-        self.he_kills += 1
+    def get(self, priority=None):
+        """
+        remove and return the command which is sent next, or None if the queue is empty
 
-    def get_he_kills(self):
-        return self.he_kills
+        @param priority: The priority class, by default the class returned by next_priority
+        @type  priority: Integer
+        """
+        with self.lock:
+            if priority is None:
+                priority = self.next_priority()
+            if priority is None or not self.queues[priority]:
+                return None
+            queue_time, command = self.queues[priority].popleft()
+            self.max_waits[priority] = max(self.max_waits[priority], time.time() - queue_time)
+            return command
 
-    def set_knife_kill(self):
-        self.knife_kills += 1
+    def empty(self):
+        """
+        return True if no command is queued
+        """
+        return not any(self.queues)
 
-    def get_knife_kills(self):
-        return self.knife_kills
+    def clear(self):
+        """
+        remove all queued commands
+        """
+        with self.lock:
+            for queue in self.queues:
+                queue.clear()
 
-    def get_killing_streak(self):
-        return self.killing_streak
+    def get_wait_stats(self):
+        """
+        return the longest wait of each class since the last call
+        """
+        with self.lock:
+            max_waits = self.max_waits
+            self.max_waits = [0.0] * len(RCON_CLASSES)
+            return max_waits
+
+    def get_saved_stats(self):
+        """
+        return the number of commands saved by coalescing since the last call
+        """
+        with self.lock:
+            saved = self.saved
+            self.saved = dict.fromkeys(saved, 0)
+            return saved
 
-    def get_db_tks(self):
-        return self.db_tk_count
 
-    def get_team_kill_count(self):
-        return self.tk_count
+### CLASS Announcer ###
+class Announcer(object):
+    """
+    aggregate the headshot announcements and the HIT Stats of the players, the first message
+    after a quiet period is sent at once and opens a window, the messages within the window
+    are combined into one message per player when the window has passed
+    """
+    def __init__(self, game, interval, headshots='summary'):
+        """
+        create a new instance of Announcer
+
+        @param game: The game
+        @type  game: Game
+        @param interval: The length of the window in seconds
+        @type  interval: Integer
+        @param headshots: Announce the headshots of each player (summary), only when the player reaches a milestone (milestones) or not at all (off)
+        @type  headshots: String
+        """
+        self.game = game
+        self.interval = interval
+        self.headshots = headshots
+        self.window_end = 0
+        # player number: (player, headshots, percentage)
+        self.pending_headshots = {}
+        # player number: player
+        self.pending_hit_stats = {}
+        self.saved = 0
+
+    def add_headshots(self, player, headshots, percentage):
+        """
+        announce the headshots of a player
+
+        @param player: The player
+        @type  player: Player
+        @param headshots: The number of headshots
+        @type  headshots: Integer
+        @param percentage: The headshots in percent of all hits
+        @type  percentage: Integer
+        """
+        if self.headshots == 'off' or (self.headshots == 'milestones' and headshots not in HS_MSG):
+            return
+        if player.get_player_num() in self.pending_headshots:
+            self.saved += 1
+        self.pending_headshots[player.get_player_num()] = (player, headshots, percentage)
+        self.flush_due()
 
-    def add_killed_me(self, killer):
-        self.tk_killer_names.append(killer)
+    def add_hit_stats(self, player):
+        """
+        tell the HIT Stats to a player
 
-    def get_killed_me(self):
-        return self.tk_killer_names
+        @param player: The player
+        @type  player: Player
+        """
+        if player.get_player_num() in self.pending_hit_stats:
+            self.saved += 1
+        self.pending_hit_stats[player.get_player_num()] = player
+        self.flush_due()
 
-    def clear_killed_me(self, victim):
-        while self.tk_victim_names.count(victim) > 0:
-            self.warn_list.remove("stop team killing")
-            self.tk_victim_names.remove(victim)
+    def flush_due(self):
+        """
+        send the pending messages if the window has passed
+        """
+        if (self.pending_headshots or self.pending_hit_stats) and CLOCK.time() >= self.window_end:
+            self.flush()
 
-    def add_tk_victims(self, victim):
-        self.tk_victim_names.append(victim)
+    def flush(self):
+        """
+        send the pending messages and open a new window
+        """
+        if not (self.pending_headshots or self.pending_hit_stats):
+            return
+        messages = []
+        for player_num, (player, headshots, percentage) in sorted(self.pending_headshots.iteritems()):
+            if self.game.players.get(player_num) is player:
+                messages.append("^3%s^7 has made ^3%d ^7%s (%d percent)" % (player.get_name(), headshots, "headshots" if headshots > 1 else "headshot", percentage))
+        # combine the announcements into as few lines as possible
+        line = ''
+        for msg in messages:
+            if line and len(line) + len(RCON_SAY_SEPARATOR) + len(msg) > RCON_SAY_WIDTH:
+                self.game.send_rcon(line, RCON_CHAT)
+                line = ''
+            line = "%s%s%s" % (line, RCON_SAY_SEPARATOR, msg) if line else msg
+        if line:
+            self.game.send_rcon(line, RCON_CHAT)
+        for player_num, player in sorted(self.pending_hit_stats.iteritems()):
+            if self.game.players.get(player_num) is player:
+                self.game.rcon_tell(player_num, "^1HIT Stats: ^7HS:^3%s ^7BODY:^3%s ^7ARMS:^3%s ^7LEGS:^3%s ^7TOTAL:^3%s" % (player.get_headshots(), player.get_hitzones('body'), player.get_hitzones('arms'), player.get_hitzones('legs'), player.get_all_hits()))
+        self.pending_headshots = {}
+        self.pending_hit_stats = {}
+        self.window_end = CLOCK.time() + self.interval
+
+    def clear(self):
+        """
+        drop the pending messages
+        """
+        self.pending_headshots = {}
+        self.pending_hit_stats = {}
+
+    def get_saved(self):
+        """
+        return the number of messages saved by the aggregation since the last call
+        """
+        saved = self.saved
+        self.saved = 0
+        return saved
+
+
+### CLASS Server Host ###
+class ServerHost(object):
+    """
+    run one or more game servers in one process. The game servers share the event queue,
+    one thread reading all games.log files, one thread for the rotating messages and the
+    event handling in the main thread, which is the only user of the database connection.
+    Each game server has its own RCON thread, so a server which does not respond only
+    delays its own commands.
+    """
+    def __init__(self):
+        """
+        create a new instance of ServerHost
+        """
+        self.servers = []
+        # game servers displaying rotating messages and rules
+        self.rules_servers = []
+        self.event_queue = EventQueue(EVENT_QUEUE_SIZE)
 
-    def get_tk_victim_names(self):
-        return self.tk_victim_names
+    def add_server(self, server):
+        """
+        add a game server, the games.log must be positioned where reading starts
 
-    def set_grudge(self, killer):
-        self.grudged_player.append(killer)
-        self.clear_tk(killer)
+        @param server: The game server
+        @type  server: LogParser
+        """
+        self.servers.append(server)
 
-    def get_grudged_player(self):
-        return self.grudged_player
+    def add_rules(self, server):
+        """
+        display the rotating messages and rules of a game server
 
-    def clear_grudged_player(self, killer):
-        while self.grudged_player.count(killer) > 0:
-            self.grudged_player.remove(killer)
+        @param server: The game server
+        @type  server: LogParser
+        """
+        self.rules_servers.append(server)
 
-    def clear_tk(self, killer):
-        while self.tk_killer_names.count(killer) > 0:
-            self.tk_killer_names.remove(killer)
+    def run(self):
+        """
+        start all game servers and handle the events of the games.log files
+        """
+        if not self.servers:
+            logger.error("*** Aborting Spunky Bot, no game server to run ***")
+            return
+        for server in self.servers:
+            server.start_log()
+            rcon = Thread(target=self.rcon_process, args=(server.game,))
+            rcon.setDaemon(True)
+            rcon.start()
+        schedule.every(10).minutes.do(self.report_ingest_stats)
+        logger.info("Game servers running  : %d", len(self.servers))
+        if self.rules_servers:
+            rules = Thread(target=self.rules_process)
+            rules.setDaemon(True)
+            rules.start()
+
+        # the games.log files are read and decoded in one thread, the events are handled in this thread
+        ingest = Thread(target=self.ingest_logs)
+        ingest.setDaemon(True)
+        ingest.start()
 
-    def clear_all_tk(self):
-        self.tk_killer_names = []
+        while 1:
+            if not ingest.is_alive() and self.event_queue.get_depth() == 0:
+                logger.error("*** Aborting Spunky Bot, the Gamelog reader has stopped ***")
+                return
+            schedule.run_pending()
+            for read_time, server, action, event, inode, offset, line in self.event_queue.get_batch(timeout=1):
+                server.handle_queued_event(read_time, action, event, inode, offset, line)
+            for server in self.servers:
+                server.game.run_callbacks()
 
-    def clear_all_killed_me(self):
-        self.tk_victim_names = []
-        self.clear_specific_warning("stop team killing")
+    def ingest_logs(self):
+        """
+        read the games.log files in turns and sleep until one of the game servers appends to its games.log.
+        Read errors are logged and the games.log is read again after a delay, any other error ends the
+        thread and the main loop stops the process.
+        """
+        tails = [server.log_tail for server in self.servers]
+        try:
+            while 1:
+                busy = False
+                failed = False
+                for server in self.servers:
+                    try:
+                        if server.ingest_log():
+                            busy = True
+                    except (IOError, OSError) as err:
+                        logger.error("Reading the Gamelog file '%s' failed: %s", server.log_tail.filename, err, exc_info=True)
+                        failed = True
+                if failed:
+                    time.sleep(LOG_RETRY_DELAY)
+                elif not busy:
+                    try:
+                        if all(tail.inotify for tail in tails):
+                            select.select([tail.inotify.fd for tail in tails], [], [], 1)
+                        else:
+                            time.sleep(LOG_POLL_DELAY)
+                        # read the pending inotify events
+                        for tail in tails:
+                            tail.wait(0)
+                    except (IOError, OSError, select.error) as err:
+                        logger.error("Waiting for the Gamelog files failed: %s", err, exc_info=True)
+                        time.sleep(LOG_RETRY_DELAY)
+        except Exception as err:
+            logger.error("Gamelog reader stopped: %s", err, exc_info=True)
+
+    def rules_process(self):
+        """
+        display the rotating messages and rules of all game servers, each game server shows
+        the next line of its rules file after its own rules frequency
+        """
+        # initial wait, then [next display time, game server, remaining lines of the rules file]
+        rotations = [[time.time() + 30, server, []] for server in self.rules_servers]
+        while rotations:
+            rotation = min(rotations, key=lambda rotation: rotation[0])
+            delay = rotation[0] - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            server = rotation[1]
+            if not rotation[2]:
+                try:
+                    with open(server.rules_file, 'r') as filehandle:
+                        rotation[2] = filehandle.readlines()
+                except IOError as err:
+                    logger.error("ERROR: Rotating messages stopped, file '%s' cannot be read: %s", server.rules_file, err)
+                if not rotation[2]:
+                    rotations.remove(rotation)
+                    continue
+            try:
+                server.rotating_message(rotation[2].pop(0))
+            except Exception as err:
+                logger.error(err, exc_info=True)
+            # wait for given delay in the config file
+            rotation[0] = time.time() + server.rules_frequency
 
-    def add_high_ping(self, value):
-        self.warn_list.append('fix your ping')
-        self.ping_value = value
-        
-    def get_ping_value(self):
-        return self.ping_value
+    def rcon_process(self, game):
+        """
+        send the queued RCON commands of a game server within its flood limit, the thread
+        sleeps until a command is queued or the flood limit allows the next command
 
-    def clear_specific_warning(self, warning):
-        while self.warn_list.count(warning) > 0:
-            self.warn_list.remove(warning)
+        @param game: The game of the game server
+        @type  game: Game
+        """
+        while 1:
+            game.rcon_wakeup.clear()
+            delay = game.send_queued_rcon()
+            if delay is None:
+                game.rcon_wakeup.wait()
+            elif delay > 0:
+                game.rcon_wakeup.wait(delay)
+
+    def report_ingest_stats(self):
+        """
+        report the latency between reading and handling of the games.log lines and the state of the event queue
+        """
+        lines, avg_latency, max_latency = self.event_queue.get_latency_stats()
+        if lines:
+            logger.info("Gamelog ingest: %d lines, latency avg %.1f ms, max %.1f ms", lines, avg_latency * 1000, max_latency * 1000)
+        logger.info("Event queue: depth %d (max %d), oldest event %.1f ms, reader stalls %d (%.2f s), background tasks %d",
+                    self.event_queue.get_depth(), self.event_queue.max_depth, self.event_queue.get_oldest_age() * 1000,
+                    self.event_queue.stalls, self.event_queue.stall_time, WORKER.get_pending())
+        self.event_queue.max_depth = 0
+        for server in self.servers:
+            if server.game.pacer:
+                commands, peak = server.game.pacer.get_rate_stats()
+                if commands:
+                    logger.info("RCON commands: %d, peak %d per %.1f s, limit %d (%d-%d) + burst %d (%s)", commands, peak, server.game.pacer.window,
+                                server.game.pacer.rate, server.game.pacer.min_rate, server.game.pacer.max_rate, server.game.pacer.burst, server.game.server_name)
+                    logger.info("RCON max wait: %s", ', '.join(["%s %.0f ms" % (RCON_CLASSES[priority], max_wait * 1000) for priority, max_wait in enumerate(server.game.queue.get_wait_stats())]))
+                p50, p90, p99, losses = server.game.pacer.get_rtt_stats()
+                if p50 is not None:
+                    logger.info("RCON round trip: p50 %.0f ms, p90 %.0f ms, p99 %.0f ms, %d lost responses", p50 * 1000, p90 * 1000, p99 * 1000, losses)
+                saved = server.game.queue.get_saved_stats()
+                saved['announcement'] = server.game.announcer.get_saved()
+                if any(saved.itervalues()):
+                    logger.info("RCON commands saved: %d superseded bigtext, %d merged say, %d to disconnected players, %d aggregated announcements",
+                                saved['bigtext'], saved['say'], saved['disconnect'], saved['announcement'])
+            groups, slowest = server.game.get_group_stats()
+            if groups:
+                logger.info("RCON groups: %d completed, slowest %.0f ms (%s)", groups, slowest * 1000, server.game.server_name)
+            hits, misses = server.game.cache.get_stats()
+            if hits or misses:
+                logger.info("RCON query cache: %d hits, %d misses (%s)", hits, misses, server.game.server_name)
+            if server.log_tail.rotations or server.log_tail.truncations:
+                logger.info("Gamelog rotations: %d, truncations: %d (%s)", server.log_tail.rotations, server.log_tail.truncations, server.log_tail.filename)
+
+
+### CLASS Inotify ###
+class Inotify(object):
+    """
+    minimal binding of the Linux inotify API
+    """
+    IN_MODIFY = 0x00000002
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
 
-    def add_warning(self, warning, timer=True):
-        self.warn_list.append(warning)
-        if timer:
-            self.last_warn_time = time.time()
+    def __init__(self):
+        """
+        create a new inotify instance, raise OSError if inotify is not available
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            self.inotify_add_watch = libc.inotify_add_watch
+            self.inotify_rm_watch = libc.inotify_rm_watch
+            self.fd = libc.inotify_init1(os.O_NONBLOCK)
+        except (OSError, AttributeError):
+            raise OSError("inotify is not supported on this platform")
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
 
-    def get_warning(self):
-        return len(self.warn_list)
+    def add_watch(self, path, mask):
+        """
+        watch the given path for the events in mask and return the watch descriptor
 
-    def get_all_warn_msg(self):
-        return list(set(self.warn_list))
+        @param path: The full path of the file or directory
+        @type  path: String
+        @param mask: The inotify event mask
+        @type  mask: Integer
+        """
+        wd = self.inotify_add_watch(self.fd, path, mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed for %s" % path)
+        return wd
 
-    def get_last_warn_msg(self):
-        return self.warn_list[-1] if self.warn_list else ''
+    def rm_watch(self, wd):
+        """
+        remove the watch with the given watch descriptor
 
-    def get_last_warn_time(self):
-        return self.last_warn_time
+        @param wd: The watch descriptor
+        @type  wd: Integer
+        """
+        self.inotify_rm_watch(self.fd, wd)
 
-    def clear_last_warning(self):
-        if self.warn_list:
-            last_warning = self.warn_list[-1]
-            self.warn_list.pop()
-            self.last_warn_time = self.last_warn_time - 60 if self.warn_list else 0
-            if "stop team killing" in last_warning:
-                self.tk_victim_names.pop()
-            return last_warning
+    def wait(self, timeout):
+        """
+        wait for events and return a list of tuples (watch descriptor, mask, name)
 
-    def clear_warning(self):
-        self.warn_list = []
-        self.tk_victim_names = []
-        self.tk_killer_names = []
-        self.last_warn_time = 0
-        # clear ban_points
-        now = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
-        values = (self.guid, now)
-        curs.execute("DELETE FROM `ban_points` WHERE `guid` = ? and `expires` > ?", values)
-        conn.commit()
+        @param timeout: The maximum time to wait in seconds
+        @type  timeout: Float
+        """
+        events = []
+        if select.select([self.fd], [], [], timeout)[0]:
+            while 1:
+                try:
+                    data = os.read(self.fd, 65536)
+                except OSError:
+                    # EAGAIN, all events read
+                    break
+                pos = 0
+                while pos + 16 <= len(data):
+                    wd, mask, _, length = struct.unpack_from('iIII', data, pos)
+                    events.append((wd, mask, data[pos + 16:pos + 16 + length].rstrip('\0')))
+                    pos += 16 + length
+        return events
 
-    def team_death(self):
-        # increase team death counter
-        self.db_team_death += 1
+    def close(self):
+        """
+        close the inotify instance
+        """
+        os.close(self.fd)
 
-    def team_kill(self):
-        # increase teamkill counter
-        self.tk_count += 1
-        self.db_tk_count += 1
 
-# CTF Mode
-    def capture_flag(self):
-        self.flags_captured += 1
-        self.db_flags_captured += 1
+### CLASS LogTail ###
+class LogTail(object):
+    """
+    follow the games.log file, woken up by inotify or by polling as fallback
+    """
+    def __init__(self, filename):
+        """
+        create a new instance of LogTail
+
+        @param filename: The full path of the games.log file
+        @type  filename: String
+        """
+        self.filename = filename
+        self.log_file = open(filename, 'rb')
+        stat = os.fstat(self.log_file.fileno())
+        # identity of the open file, used to detect a replaced games.log
+        self.inode = (stat.st_dev, stat.st_ino)
+        # incomplete last line, kept until the game server has written the rest of it
+        self.partial = ''
+        # file position behind the last complete line
+        self.offset = 0
+        # file position of the first line returned by read_lines
+        self.batch_offset = 0
+        # line in front of the position set by seek
+        self.last_line = ''
+        self.rotations = 0
+        self.truncations = 0
+        self.file_watch = None
+        try:
+            self.inotify = Inotify()
+            self.file_watch = self.inotify.add_watch(filename, Inotify.IN_MODIFY)
+            # a new games.log created by logrotate shows up in the directory
+            self.inotify.add_watch(os.path.dirname(os.path.abspath(filename)), Inotify.IN_CREATE | Inotify.IN_MOVED_TO)
+            self.backend = 'inotify'
+        except OSError as err:
+            logger.debug("inotify not available, polling the games.log: %s", err)
+            self.inotify = None
+            self.backend = 'poll'
 
-    def get_flags_captured(self):
-        return self.flags_captured
+    def seek_end(self):
+        """
+        go to the end of the file
+        """
+        self.log_file.seek(0, 2)
+        self.seek(self.log_file.tell())
 
-    def return_flag(self):
-        self.flags_returned += 1
-        self.db_flags_returned += 1
-        
-    def dropped_flag(self):
-        self.flags_dropped += 1
-        self.db_flags_dropped += 1
-        
-    def get_flags_returned(self):
-        return self.flags_returned
-        
-    def get_flags_dropped(self):
-        return self.flags_dropped    
-        
-    def set_flag_capture_time(self, cap_time):
-        if cap_time < self.flag_capture_time:
-            self.flag_capture_time = cap_time
+    def seek(self, offset):
+        """
+        go to the given position of the file, the position must be the start of a line
 
-    def get_flag_capture_time(self):
-        if self.flag_capture_time == 999:
-            return 0
-        return self.flag_capture_time
+        @param offset: The file position
+        @type  offset: Integer
+        """
+        self.last_line = self.get_line_before(offset)
+        self.log_file.seek(offset)
+        self.partial = ''
+        self.offset = offset
 
-# Bomb Mode
-    def is_bombholder(self):
-        self.bombholder = True
+    def get_line_before(self, offset):
+        """
+        return the line which ends in front of the given position, the file position is changed
 
-    def bomb_tossed(self):
-        self.bombholder = False
+        @param offset: The position behind the line
+        @type  offset: Integer
+        """
+        start = max(0, offset - 4096)
+        self.log_file.seek(start)
+        data = self.log_file.read(offset - start)
+        return data[:-1].rsplit('\n', 1)[-1] if data.endswith('\n') else ''
 
-    def get_bombholder(self):
-        return self.bombholder
+    def wait(self, timeout):
+        """
+        wait until the game server appends to the games.log
 
-    def kill_bomb_carrier(self):
-        self.bomb_carrier_killed += 1
+        @param timeout: The maximum time to wait in seconds
+        @type  timeout: Float
+        """
+        if self.inotify:
+            self.inotify.wait(timeout)
+        else:
+            time.sleep(min(timeout, LOG_POLL_DELAY))
 
-    def get_bomb_carrier_kills(self):
-        return self.bomb_carrier_killed
+    def read_lines(self):
+        """
+        return the next batch of complete lines of the games.log, read in blocks of
+        LOG_CHUNK_SIZE bytes. An empty list is returned if no complete line is available.
+        """
+        self.check_truncation()
+        while 1:
+            chunk = self.log_file.read(LOG_CHUNK_SIZE)
+            if not chunk:
+                # all data of the current file read, continue with a new games.log if rotated
+                if self.check_replaced():
+                    continue
+                return []
+            lines = (self.partial + chunk).split('\n')
+            # the last element is empty or an incomplete line
+            self.partial = lines.pop()
+            if lines:
+                self.batch_offset = self.offset
+                self.offset = self.log_file.tell() - len(self.partial)
+                return lines
 
-    def kills_with_bomb(self):
-        self.killed_with_bomb += 1
+    def check_truncation(self):
+        """
+        start from the beginning if the games.log has been truncated, e.g. by logrotate with copytruncate
+        """
+        if os.fstat(self.log_file.fileno()).st_size < self.offset + len(self.partial):
+            logger.info("Gamelog file truncated: %s, reading from the beginning", self.filename)
+            self.log_file.seek(0)
+            self.partial = ''
+            self.offset = 0
+            self.truncations += 1
 
-    def get_kills_with_bomb(self):
-        return self.killed_with_bomb
+    def check_replaced(self):
+        """
+        reopen the games.log if it has been replaced by a new file, return True if reopened
+        """
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            # moved away and not created yet
+            return False
+        if (stat.st_dev, stat.st_ino) == self.inode:
+            return False
+        try:
+            log_file = open(self.filename, 'rb')
+        except IOError:
+            return False
+        logger.info("Gamelog file replaced: %s, reading the new file", self.filename)
+        self.log_file.close()
+        self.log_file = log_file
+        stat = os.fstat(self.log_file.fileno())
+        self.inode = (stat.st_dev, stat.st_ino)
+        self.partial = ''
+        self.offset = 0
+        self.rotations += 1
+        if self.inotify:
+            self.inotify.rm_watch(self.file_watch)
+            self.file_watch = self.inotify.add_watch(self.filename, Inotify.IN_MODIFY)
+        return True
+
+    def verify_checkpoint(self, inode, offset, line_hash):
+        """
+        return the position to resume from for a stored checkpoint, or None if the checkpoint does not match the games.log
+
+        @param inode: The inode of the games.log at the checkpoint
+        @type  inode: Integer
+        @param offset: The position behind the last handled line
+        @type  offset: Integer
+        @param line_hash: The SHA1 hash of the last handled line
+        @type  line_hash: String
+        """
+        if inode != self.inode[1]:
+            # the games.log has been rotated since the checkpoint, the new file is unread
+            logger.info("Gamelog file replaced since last checkpoint, reading from the beginning")
+            return 0
+        if os.fstat(self.log_file.fileno()).st_size < offset:
+            logger.info("Gamelog file truncated since last checkpoint, reading from the beginning")
+            return 0
+        if offset == 0:
+            return 0
+        if hashlib.sha1(self.get_line_before(offset)).hexdigest() == line_hash:
+            return offset
+        logger.warning("Gamelog checkpoint does not match the games.log, ignoring checkpoint")
+        return None
+
+    def iter_lines(self, start, end):
+        """
+        iterate over the complete lines between two positions of the file, the file position is changed
+
+        @param start: The position of the first line
+        @type  start: Integer
+        @param end: The position behind the last line
+        @type  end: Integer
+        """
+        self.log_file.seek(start)
+        partial = ''
+        remaining = end - start
+        while remaining > 0:
+            chunk = self.log_file.read(min(LOG_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            lines = (partial + chunk).split('\n')
+            partial = lines.pop()
+            for line in lines:
+                yield line
 
-    def planted_bomb(self):
-        self.bomb_planted += 1
-        self.bombholder = False
 
-    def get_planted_bomb(self):
-        return self.bomb_planted
+### CLASS Event Queue ###
+class EventQueue(object):
+    """
+    bounded queue of decoded events between the games.log reader and the event handler
+    """
+    def __init__(self, maxsize):
+        """
+        create a new instance of EventQueue
 
-    def defused_bomb(self):
-        self.bomb_defused += 1
+        @param maxsize: The maximum number of queued events
+        @type  maxsize: Integer
+        """
+        self.queue = Queue(maxsize)
+        # number of times and total time the reader had to wait for a full queue
+        self.stalls = 0
+        self.stall_time = 0.0
+        self.max_depth = 0
+        self.events_handled = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
 
-    def get_defused_bomb(self):
-        return self.bomb_defused
+    def put(self, item):
+        """
+        add an event, wait if the queue is full
 
-# Freeze Tag
-    def freeze(self):
-        self.froze += 1
+        @param item: The event, the first element is the time the event was read
+        @type  item: Tuple
+        """
+        try:
+            self.queue.put_nowait(item)
+        except Full:
+            start = time.time()
+            self.stalls += 1
+            self.queue.put(item)
+            self.stall_time += time.time() - start
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
 
-    def get_freeze(self):
-        return self.froze
+    def get_batch(self, timeout):
+        """
+        return all queued events, wait up to timeout seconds for the first event
 
-    def thawout(self):
-        self.thawouts += 1
+        @param timeout: The maximum time to wait in seconds
+        @type  timeout: Float
+        """
+        try:
+            batch = [self.queue.get(True, timeout)]
+        except Empty:
+            return []
+        try:
+            while 1:
+                batch.append(self.queue.get_nowait())
+        except Empty:
+            pass
+        return batch
 
-    def get_thawout(self):
-        return self.thawouts
+    def event_handled(self, read_time):
+        """
+        record the latency of an event, measured since it has been read from the games.log
 
+        @param read_time: The time the event was read
+        @type  read_time: Float
+        """
+        latency = time.time() - read_time
+        self.events_handled += 1
+        self.latency_sum += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
 
-### CLASS Game ###
-class Game(object):
-    """
-    Game class
-    """
-    def __init__(self, config_file, urt_modversion):
+    def get_latency_stats(self):
         """
-        create a new instance of Game
+        return number of events, average and maximum latency and reset the counters
+        """
+        stats = (self.events_handled, self.latency_sum / self.events_handled if self.events_handled else 0.0, self.latency_max)
+        self.events_handled = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        return stats
 
-        @param config_file: The full path of the bot configuration file
-        @type  config_file: String
+    def get_depth(self):
         """
-        self.all_maps_list = []
-        self.next_mapname = ''
-        self.mapname = ''
-        self.maplist = []
-        self.last_maps_list = []
-        self.players = {}
-        self.live = False
-        self.urt_modversion = urt_modversion
-        game_cfg = ConfigParser.ConfigParser()
-        game_cfg.read(config_file)
-        self.quake = PyQuake3("%s:%s" % (game_cfg.get('server', 'server_ip'), game_cfg.get('server', 'server_port')), game_cfg.get('server', 'rcon_password'))
-        self.queue = Queue()
-        self.rcon_lock = RLock()
-        self.thread_rcon()
-        logger.info("Opening RCON socket   : OK")
+        return number of queued events
+        """
+        return self.queue.qsize()
 
-        # dynamic mapcycle
-        self.dynamic_mapcycle = game_cfg.getboolean('mapcycle', 'dynamic_mapcycle') if game_cfg.has_option('mapcycle', 'dynamic_mapcycle') else False
-        if self.dynamic_mapcycle:
-            self.switch_count = game_cfg.getint('mapcycle', 'switch_count') if game_cfg.has_option('mapcycle', 'switch_count') else 4
-            self.big_cycle = filter(None, game_cfg.get('mapcycle', 'big_cycle').replace(' ', '').split(',')) if game_cfg.has_option('mapcycle', 'big_cycle') else []
-            self.small_cycle = filter(None, game_cfg.get('mapcycle', 'small_cycle').replace(' ', '').split(',')) if game_cfg.has_option('mapcycle', 'small_cycle') else []
+    def get_oldest_age(self):
+        """
+        return the time in seconds the oldest queued event is waiting
+        """
+        with self.queue.mutex:
+            return time.time() - self.queue.queue[0][0] if self.queue.queue else 0.0
 
-        # add Spunky Bot as player 'World' to the game
-        spunky_bot = Player(BOT_PLAYER_NUM, '127.0.0.1', 'NONE', 'World')
-        self.add_player(spunky_bot)
-        logger.info("Activating the Bot    : OK")
-        logger.info("Startup completed     : Let's get ready to rumble!")
-        logger.info("Spunky Bot is running until you are closing this session or pressing CTRL + C to abort this process.")
-        logger.info("*** Note: Use the provided initscript to run Spunky Bot as daemon ***")
 
-    def thread_rcon(self):
+### CLASS Worker ###
+class Worker(object):
+    """
+    run slow tasks like HTTP requests in a background thread, so they do not delay the event handling
+    """
+    def __init__(self, offline=False):
         """
-        Thread process for starting method rcon_process
+        create a new instance of Worker
+
+        @param offline: Discard all tasks, used for the replay of a games.log
+        @type  offline: Boolean
         """
-        # start Thread
-        processor = Thread(target=self.rcon_process)
-        processor.setDaemon(True)
-        processor.start()
+        self.tasks = Queue()
+        self.offline = offline
+        # HTTP sessions used by the tasks of all game servers, the connections are kept alive
+        self.session = requests.Session()
+        with requests_cache.disabled():
+            self.uncached_session = requests.Session()
+        if not offline:
+            processor = Thread(target=self.process)
+            processor.setDaemon(True)
+            processor.start()
 
-    def rcon_process(self):
+    def process(self):
         """
-        Thread process
+        run the submitted tasks one after the other
         """
         while 1:
-            if not self.queue.empty():
-                if self.live:
-                    with self.rcon_lock:
-                        try:
-                            command = self.queue.get()
-                            if command != 'status':
-                                self.quake.rcon(command)
-                            else:
-                                self.quake.rcon_update()
-                        except Exception as err:
-                            logger.error(err, exc_info=True)
-            time.sleep(RCON_DELAY)
+            func, args = self.tasks.get()
+            try:
+                func(*args)
+            except Exception as err:
+                logger.error(err, exc_info=True)
 
-    def get_quake_value(self, value):
+    def submit(self, func, *args):
         """
-        get Quake3 value
+        run func with the given arguments in the background
 
-        @param value: The Quake3 value
-        @type  value: String
+        @param func: The function to call
+        @type  func: Function
         """
-        if self.live:
-            with self.rcon_lock:
-                self.quake.update()
-                return self.quake.variables[value]
+        if not self.offline:
+            self.tasks.put((func, args))
 
-    def get_rcon_output(self, value):
+    def get_pending(self):
         """
-        get RCON output for value
+        return number of waiting tasks
+        """
+        return self.tasks.qsize()
 
-        @param value: The RCON output for value
-        @type  value: String
+    def post_webhook(self, hook, embed, callback=None, *args):
         """
-        if self.live:
-            with self.rcon_lock:
-                return self.quake.rcon(value)
+        post a Discord embed in the background and call callback(*args, response) when done
 
-    def get_cvar(self, value):
+        @param hook: The Discord webhook
+        @type  hook: DiscordWebhook
+        @param embed: The embed to post
+        @type  embed: DiscordEmbed
+        @param callback: The function to call with the response
+        @type  callback: Function
         """
-        get CVAR value
+        self.submit(self.execute_webhook, hook, embed, callback, args)
 
-        @param value: The CVAR value
-        @type  value: String
+    def execute_webhook(self, hook, embed, callback, args):
         """
-        if self.live:
-            with self.rcon_lock:
-                try:
-                    ret_val = self.quake.rcon(value)[1].split(':')[1].split('^7')[0].lstrip('"')
-                except IndexError:
-                    ret_val = None
-                time.sleep(RCON_DELAY)
-                return ret_val
+        post a Discord embed, the webhooks are only used by the worker thread
+        """
+        hook.add_embed(embed)
+        try:
+            response = hook.execute()
+        finally:
+            # remove embed after posting
+            hook.remove_embed(0)
+        if callback:
+            callback(*(args + (response,)))
 
-    def get_number_players(self):
+
+### CLASS Clock ###
+class Clock(object):
+    """
+    time source of the event handlers
+    """
+    def time(self):
         """
-        get the number of online players
+        return the current time in seconds since the epoch
         """
-        return len(self.players) - 1  # bot is counted as player
+        return time.time()
 
-    def get_mapcycle_path(self):
+    def sleep(self, seconds):
         """
-        get the full path of mapcycle.txt file
+        wait for the given number of seconds
         """
-        maplist = []
-        # get path of fs_homepath and fs_basepath
-        fs_homepath = self.get_cvar('fs_homepath')
-        logger.debug("fs_homepath           : %s", fs_homepath)
-        fs_basepath = self.get_cvar('fs_basepath')
-        logger.debug("fs_basepath           : %s", fs_basepath)
-        fs_game = self.get_cvar('fs_game')
-        # get file name of mapcycle.txt
-        mapcycle_file = self.get_cvar('g_mapcycle')
-        try:
-            # set full path of mapcycle.txt
-            mc_home_path = os.path.join(fs_homepath, fs_game, mapcycle_file) if fs_homepath else ""
-            mc_base_path = os.path.join(fs_basepath, fs_game, mapcycle_file) if fs_basepath else ""
-        except TypeError:
-            raise Exception('Server did not respond to mapcycle path request, please restart the Bot')
-        if os.path.isfile(mc_home_path):
-            mapcycle_path = mc_home_path
-        elif os.path.isfile(mc_base_path):
-            mapcycle_path = mc_base_path
-        else:
-            mapcycle_path = None
-        if mapcycle_path:
-            logger.info("Mapcycle path         : %s", mapcycle_path)
-            with open(mapcycle_path, 'r') as file_handle:
-                lines = [line for line in file_handle if line != '\n']
-            try:
-                while 1:
-                    tmp = lines.pop(0).strip()
-                    if tmp[0] == '{':
-                        while tmp[0] != '}':
-                            tmp = lines.pop(0).strip()
-                        tmp = lines.pop(0).strip()
-                    maplist.append(tmp)
-            except IndexError:
-                pass
-        return maplist
+        time.sleep(seconds)
 
-    def send_rcon(self, command):
+
+class VirtualClock(Clock):
+    """
+    time source for the replay of a games.log, driven by the game time of the replayed lines
+    """
+    def __init__(self, start):
         """
-        send RCON command
+        create a new instance of VirtualClock
 
-        @param command: The RCON command
-        @type  command: String
+        @param start: The time of the first line in seconds since the epoch
+        @type  start: Float
         """
-        if self.live:
-            with self.rcon_lock:
-                self.queue.put(command)
+        self.now = start
+        self.base = start
+        self.last_game_time = 0
 
-    def rcon_say(self, msg):
+    def set_game_time(self, line):
         """
-        display message in global chat
+        set the clock to the game time of a games.log line
 
-        @param msg: The message to display in global chat
-        @type  msg: String
+        @param line: The line of the games.log, starting with the game time, e.g. ' 12:34 '
+        @type  line: String
         """
-        # wrap long messages into shorter list elements
-        lines = textwrap.wrap(msg, 140)
-        for line in lines:
-            self.send_rcon('say %s' % line)
+        try:
+            minutes, seconds = line[:7].split(':')
+            game_time = int(minutes) * 60 + int(seconds)
+        except ValueError:
+            return
+        if game_time < self.last_game_time:
+            # the game time starts again at 0:00 after a map change or server restart
+            self.base += self.last_game_time
+        self.last_game_time = game_time
+        self.now = self.base + game_time
 
-    def rcon_tell(self, player_num, msg, pm_tag=True):
+    def time(self):
         """
-        tell message to a specific player
+        return the virtual time in seconds since the epoch
+        """
+        return self.now
 
-        @param player_num: The player number
-        @type  player_num: Integer
-        @param msg: The message to display in private chat
-        @type  msg: String
-        @param pm_tag: Display '[pm]' (private message) in front of the message
-        @type  pm_tag: bool
+    def sleep(self, seconds):
         """
-        lines = textwrap.wrap(msg, 128)
-        prefix = "^4[pm] "
-        for line in lines:
-            if pm_tag:
-                self.send_rcon('tell %d %s%s' % (player_num, prefix, line))
-                prefix = ""
-            else:
-                self.send_rcon('tell %d %s' % (player_num, line))
+        do not wait, the virtual time only advances with the replayed lines
+        """
+        pass
 
-    def rcon_bigtext(self, msg):
+
+### CLASS Recording Quake ###
+class RecordingQuake(object):
+    """
+    stand-in for the RCON connection of PyQuake3 used by the replay, records all RCON commands
+    """
+    def __init__(self):
         """
-        display bigtext message
+        create a new instance of RecordingQuake
+        """
+        # list of (virtual time, command)
+        self.transcript = []
+        self.variables = {}
+        self.players = []
+        self.maps = set()
 
-        @param msg: The message to display in global chat
-        @type  msg: String
+    def set_server_info(self, values):
         """
-        self.send_rcon('bigtext "%s"' % msg)
+        set the server variables of an InitGame event
 
-    def rcon_forceteam(self, player_num, team):
+        @param values: The server settings of the InitGame event
+        @type  values: Dict
         """
-        force player to given team
+        self.variables.update(values)
+        if 'mapname' in values:
+            self.maps.add(values['mapname'])
 
-        @param player_num: The player number
-        @type  player_num: Integer
-        @param team: The team (red, blue, spectator)
-        @type  team: String
+    def rcon(self, command):
+        """
+        record RCON command and return a response like the game server
         """
-        self.send_rcon('forceteam %d %s' % (player_num, team))
+        self.transcript.append((CLOCK.time(), command))
+        if command.startswith('dir map'):
+            return 'print', "Directory %s" % ' '.join(["/%s.bsp" % mapname for mapname in sorted(self.maps)])
+        if ' ' not in command:
+            # request of a server variable
+            return 'print', '"%s" is:"%s^7" default:"^7"' % (command, self.variables.get(command, ''))
+        return 'print', ''
 
-    def rcon_clear(self):
+    def update(self):
         """
-        clear RCON queue
+        the server variables are taken from the InitGame events
         """
-        self.queue.queue.clear()
+        pass
 
-    def kick_player(self, player_num, reason=''):
+    def rcon_update(self):
         """
-        kick player
+        record status request
+        """
+        self.transcript.append((CLOCK.time(), 'status'))
 
-        @param player_num: The player number
-        @type  player_num: Integer
-        @param reason: Reason for kick
-        @type  reason: String
+
+### CLASS Event Decoder ###
+class EventDecoder(object):
+    """
+    decode the lines of the games.log into the event name and a typed event record
+    """
+    # Kill: <killer> <victim> <mod>: <killer name> killed <victim name> by <mod name>
+    KILL_PATTERN = re.compile(r'(\d+) (\d+) (\d+): (\S*)')
+    # Hit: <victim> <hitter> <zone> <item>: <hitter name> hit <victim name> in the <zone name>
+    HIT_PATTERN = re.compile(r'(\d+) (\d+) (\d+) (\d+)')
+    # Flag: <player> <action>: ...
+    FLAG_PATTERN = re.compile(r'(\d+) (\d+):')
+    # FlagCaptureTime: <player>: <milliseconds>
+    CAPTURE_PATTERN = re.compile(r'(\d+): (\d+)$')
+    # leading player number of ClientBegin, ClientSpawn, ClientDisconnect, Freeze, ThawOutFinished and Assist
+    CLIENT_PATTERN = re.compile(r'(\d+)\b')
+
+    def __init__(self):
         """
-        if reason and self.urt_modversion > 41:
-            self.send_rcon('kick %d "%s"' % (player_num, reason))
-        else:
-            self.send_rcon('kick %d' % player_num)
+        create a new instance of EventDecoder
+        """
+        self.decoders = {'Kill': self.decode_kill, 'Hit': self.decode_hit, 'Flag': self.decode_flag,
+                         'FlagCaptureTime': self.decode_capture_time, 'ClientBegin': self.decode_client,
+                         'ClientSpawn': self.decode_client, 'ClientDisconnect': self.decode_client,
+                         'Freeze': self.decode_client, 'ThawOutFinished': self.decode_client, 'Assist': self.decode_client}
 
-    def go_live(self):
+    def decode(self, string):
         """
-        go live
+        return the event name and the event record of a line, or None and None
+        if the line is not a valid event. Events without a typed record return
+        the text behind the event name.
+
+        @param string: The line of the games.log
+        @type  string: String
         """
-        self.live = True
-        self.set_all_maps()
-        self.maplist = filter(None, self.get_mapcycle_path())
-        self.set_current_map()
-        self.rcon_say("^7Powered by Spunky Bot ^3[%s]" % __version__)
-        logger.info("Mapcycle: %s", ', '.join(self.maplist))
-        logger.info("*** Live tracking: Current map: %s / Next map: %s ***", self.mapname, self.next_mapname)
-        logger.info("Total number of maps  : %s", len(self.get_all_maps()))
-        logger.info("Server CVAR g_logsync : %s", self.get_cvar('g_logsync'))
-        logger.info("Server CVAR g_loghits : %s", self.get_cvar('g_loghits'))
+        # the line starts with the game time, e.g. '  0:00 '
+        tmp = string[7:].split(":", 1)
+        action = tmp[0].strip()
+        line = tmp[1].strip() if len(tmp) > 1 else tmp[0].strip()
+        if action in self.decoders:
+            event = self.decoders[action](line)
+            if event is None:
+                return None, None
+            return action, event
+        return action, line
 
-    def set_current_map(self):
+    def decode_kill(self, line):
         """
-        set the current and next map in rotation
+        decode kill event
         """
-        if self.mapname:
-            self.last_maps_list = self.last_maps_list[-3:] + [self.mapname]
-        try:
-            self.mapname = self.get_quake_value('mapname')
-        except KeyError:
-            self.mapname = self.next_mapname
+        match = self.KILL_PATTERN.match(line)
+        if match:
+            killer_id, victim_id, mod, killer_name = match.groups()
+            # killed by World
+            return Kill(BOT_PLAYER_NUM if killer_name == "<non-client>" else int(killer_id), int(victim_id), int(mod))
 
-        if self.dynamic_mapcycle:
-            self.maplist = filter(None, (self.small_cycle if self.get_number_players() < self.switch_count else self.big_cycle))
-            logger.debug("Players online: %s / Mapcycle: %s", self.get_number_players(), self.maplist)
+    def decode_hit(self, line):
+        """
+        decode hit event
+        """
+        match = self.HIT_PATTERN.match(line)
+        if match:
+            victim_id, hitter_id, zone, item = match.groups()
+            return Hit(int(victim_id), int(hitter_id), int(zone), int(item))
 
-        if self.maplist:
-            if self.mapname in self.maplist:
-                if self.maplist.index(self.mapname) < (len(self.maplist) - 1):
-                    self.next_mapname = self.maplist[self.maplist.index(self.mapname) + 1]
-                else:
-                    self.next_mapname = self.maplist[0]
+    def decode_flag(self, line):
+        """
+        decode flag event
+        """
+        match = self.FLAG_PATTERN.match(line)
+        if match:
+            return Flag(int(match.group(1)), int(match.group(2)))
+
+    def decode_capture_time(self, line):
+        """
+        decode flag capture time event
+        """
+        match = self.CAPTURE_PATTERN.match(line)
+        if match:
+            return FlagCaptureTime(int(match.group(1)), int(match.group(2)))
+
+    def decode_client(self, line):
+        """
+        decode event of a single player
+        """
+        match = self.CLIENT_PATTERN.match(line)
+        if match:
+            return ClientEvent(int(match.group(1)))
+
+    def explode_line(self, line):
+        """
+        return the key/value pairs of a line with backslash separated settings
+        """
+        arr = line.lstrip().lstrip('\\').split('\\')
+        key = True
+        key_val = None
+        values = {}
+        for item in arr:
+            if key:
+                key_val = item
+                key = False
             else:
-                self.next_mapname = self.maplist[0]
-        else:
-            self.next_mapname = self.mapname
-            
-        logger.debug("Current map: %s / Next map: %s", self.mapname, self.next_mapname)
+                values[key_val.rstrip()] = item.rstrip()
+                key_val = None
+                key = True
+        return values
 
-        if self.dynamic_mapcycle:
-            self.send_rcon('set g_nextmap %s' % self.next_mapname)
-            if self.mapname != self.next_mapname:
-                self.rcon_say("^3Next Map: ^7%s" % self.next_mapname)
 
-    def set_all_maps(self):
+### CLASS Stats Counter ###
+class StatsCounter(object):
+    """
+    count the statistics of kills, hits and flags, shared by the live game
+    and the import of archived games.log files
+    """
+    def __init__(self):
         """
-        set a list of all available maps
+        create a new instance of StatsCounter
         """
-        try:
-            all_maps = []
-            count = 0
-            while True:
-                ret_val = self.get_rcon_output("dir map bsp")[1].split()
-                if "Directory" in ret_val:
-                    count += 1
-                if count >= 2:
-                    break
-                else:
-                    all_maps += ret_val
-            all_maps_list = list(set([maps.replace("/", "").replace(".bsp", "") for maps in all_maps if maps.startswith("/")]))
-            all_maps_list.sort()
-            if all_maps_list:
-                self.all_maps_list = all_maps_list
-        except Exception as err:
-            logger.error(err, exc_info=True)
+        # hit zone support for UrT > 4.2.013
+        self.hit_points = {0: "HEAD", 1: "HEAD", 2: "HELMET", 3: "TORSO", 4: "VEST", 5: "LEFT_ARM", 6: "RIGHT_ARM",
+                           7: "GROIN", 8: "BUTT", 9: "LEFT_UPPER_LEG", 10: "RIGHT_UPPER_LEG", 11: "LEFT_LOWER_LEG",
+                           12: "RIGHT_LOWER_LEG", 13: "LEFT_FOOT", 14: "RIGHT_FOOT"}
+        self.hit_item = {1: "UT_MOD_KNIFE", 2: "UT_MOD_BERETTA", 3: "UT_MOD_DEAGLE", 4: "UT_MOD_SPAS", 5: "UT_MOD_MP5K",
+                         6: "UT_MOD_UMP45", 8: "UT_MOD_LR300", 9: "UT_MOD_G36", 10: "UT_MOD_PSG1", 14: "UT_MOD_SR8",
+                         15: "UT_MOD_AK103", 17: "UT_MOD_NEGEV", 19: "UT_MOD_M4", 20: "UT_MOD_GLOCK", 21: "UT_MOD_COLT1911",
+                         22: "UT_MOD_MAC11", 23: "UT_MOD_BLED"}
+        self.death_cause = {1: "MOD_WATER", 3: "MOD_LAVA", 5: "UT_MOD_TELEFRAG", 6: "MOD_FALLING", 7: "UT_MOD_SUICIDE",
+                            9: "MOD_TRIGGER_HURT", 10: "MOD_CHANGE_TEAM", 12: "UT_MOD_KNIFE", 13: "UT_MOD_KNIFE_THROWN",
+                            14: "UT_MOD_BERETTA", 15: "UT_MOD_DEAGLE", 16: "UT_MOD_SPAS", 17: "UT_MOD_UMP45", 18: "UT_MOD_MP5K",
+                            19: "UT_MOD_LR300", 20: "UT_MOD_G36", 21: "UT_MOD_PSG1", 22: "UT_MOD_HK69", 23: "UT_MOD_BLED",
+                            24: "UT_MOD_KICKED", 25: "UT_MOD_HEGRENADE", 28: "UT_MOD_SR8", 30: "UT_MOD_AK103",
+                            31: "UT_MOD_SPLODED", 32: "UT_MOD_SLAPPED", 33: "UT_MOD_SMITED", 34: "UT_MOD_BOMBED",
+                            35: "UT_MOD_NUKED", 36: "UT_MOD_NEGEV", 37: "UT_MOD_HK69_HIT", 38: "UT_MOD_M4",
+                            39: "UT_MOD_GLOCK", 40: "UT_MOD_COLT1911", 41: "UT_MOD_MAC11"}
 
-    def get_all_maps(self):
+    def set_modversion(self, modversion):
+        """
+        update hit zones, weapons and death causes for the game version
+        and return the version number, or None if the version is unknown
+
+        @param modversion: The g_modversion of the InitGame event
+        @type  modversion: String
+        """
+        if modversion.startswith('4.3'):
+            self.hit_item.update({23: "UT_MOD_FRF1", 24: "UT_MOD_BENELLI", 25: "UT_MOD_P90",
+                                  26: "UT_MOD_MAGNUM", 29: "UT_MOD_KICKED", 30: "UT_MOD_KNIFE_THROWN"})
+            self.death_cause.update({42: "UT_MOD_FRF1", 43: "UT_MOD_BENELLI", 44: "UT_MOD_P90", 45: "UT_MOD_MAGNUM",
+                                     46: "UT_MOD_TOD50", 47: "UT_MOD_FLAG", 48: "UT_MOD_GOOMBA"})
+            return 43
+        elif modversion.startswith('4.2'):
+            self.hit_item.update({23: "UT_MOD_BLED", 24: "UT_MOD_KICKED", 25: "UT_MOD_KNIFE_THROWN"})
+            self.death_cause.update({42: "UT_MOD_FLAG", 43: "UT_MOD_GOOMBA"})
+            return 42
+        elif modversion.startswith('4.1'):
+            # hit zone support for UrT 4.1
+            self.hit_points = {0: "HEAD", 1: "HELMET", 2: "TORSO", 3: "KEVLAR", 4: "ARMS", 5: "LEGS", 6: "BODY"}
+            self.hit_item.update({21: "UT_MOD_KICKED", 22: "UT_MOD_KNIFE_THROWN"})
+            self.death_cause.update({33: "UT_MOD_BOMBED", 34: "UT_MOD_NUKED", 35: "UT_MOD_NEGEV",
+                                     39: "UT_MOD_FLAG", 40: "UT_MOD_GOOMBA"})
+            return 41
+        return None
+
+    def count_kill(self, killer, victim, mod, team_kills=True):
+        """
+        count kill, death, team kill and suicide of a kill event,
+        return the death cause and if it is a team kill or a suicide
+
+        @param killer: The killer
+        @type  killer: Player
+        @param victim: The victim
+        @type  victim: Player
+        @param mod: The means of death
+        @type  mod: Integer
+        @param team_kills: Count team kills, disabled for FFA, LMS, Jump
+        @type  team_kills: Boolean
+        """
+        death_cause = self.death_cause[mod]
+        killer_id = killer.get_player_num()
+        victim_id = victim.get_player_num()
+        tk_event = False
+
+        # teamkill event
+        if team_kills and victim.get_team() == killer.get_team() and victim.get_team() != 3 and victim_id != killer_id and death_cause != "UT_MOD_BOMBED":
+            tk_event = True
+            # increase team kill counter for killer
+            killer.team_kill()
+            # increase team death counter for victim
+            victim.team_death()
+
+        # suicide counter
+        suicide = death_cause in SUICIDE_REASONS or (killer_id == victim_id and death_cause in SUICIDE_WEAPONS)
+        if suicide:
+            victim.suicide()
+            victim.die()
+        # kill counter
+        elif not tk_event and mod != 10:  # 10: MOD_CHANGE_TEAM
+            killer.kill()
+
+        # HE grenade kill
+        if death_cause == 'UT_MOD_HEGRENADE':
+            killer.set_he_kill()
+        # Knife kill
+        if "UT_MOD_KNIFE" in death_cause:
+            killer.set_knife_kill()
+
+        # death counter
+        victim.die()
+        return death_cause, tk_event, suicide
+
+    def count_hit(self, hitter, zone):
+        """
+        count hit, headshot and hit zone of a hit event, return the hit zone
+        or None if the hit zone is unknown
+
+        @param hitter: The hitter
+        @type  hitter: Player
+        @param zone: The hit zone number
+        @type  zone: Integer
+        """
+        hitter.set_all_hits()
+        hit_point = self.hit_points.get(zone)
+        if hit_point == 'HEAD' or hit_point == 'HELMET':
+            hitter.headshot()
+        elif hit_point in ZONES:
+            hitter.set_hitzones(ZONES[hit_point])
+        return hit_point
+
+    def count_flag(self, player, action):
+        """
+        count dropped, returned and captured flags
+
+        @param player: The player
+        @type  player: Player
+        @param action: The flag action, 0: dropped, 1: returned, 2: captured
+        @type  action: Integer
+        """
+        if action == 0:
+            player.dropped_flag()
+        elif action == 1:
+            player.return_flag()
+        elif action == 2:
+            player.capture_flag()
+
+
+### CLASS Word Matcher ###
+class WordMatcher(object):
+    """
+    find any of a list of words in a text with a single pass over the text,
+    the words are compiled into an Aho-Corasick automaton
+    """
+    def __init__(self, words, translation=None):
         """
-        get a list of all available maps
+        create a new instance of WordMatcher
+
+        @param words: The words to search for
+        @type  words: List
+        @param translation: Optional character substitutions applied to words and texts, see string.maketrans
+        @type  translation: String
         """
-        return self.all_maps_list
+        # the words and texts are matched as unicode, the table is converted to a mapping of the changed characters
+        self.translation = dict([(index, unichr(ord(char))) for index, char in enumerate(translation) if ord(char) != index]) if translation else None
+        self.goto = [{}]
+        self.fail = [0]
+        self.match = [None]
+        for word in words:
+            self.add_word(word)
+        self.build_fail_links()
 
-    def get_last_maps(self):
+    def normalize(self, text):
         """
-        get a list of the last played maps
+        return the text as unicode in lower case without color codes and with the character substitutions
+        applied, UTF-8 encoded texts are decoded first so letters of all languages are case-folded
+
+        @param text: The text
+        @type  text: String
         """
-        return self.last_maps_list
+        if isinstance(text, str):
+            text = text.decode('utf-8', 'replace')
+        text = COLOR_CODE.sub(u'', text.lower())
+        return text.translate(self.translation) if self.translation else text
 
-    def add_player(self, player):
+    def add_word(self, word):
         """
-        add a player to the game
+        add a word to the keyword tree
 
-        @param player: The instance of the player
-        @type  player: Instance
+        @param word: The word
+        @type  word: String
         """
-        self.players[player.get_player_num()] = player
-        # check DB for real players and exclude bots which have IP 0.0.0.0
-        if player.get_ip_address() != '0.0.0.0':
-            player.check_database()
+        normalized = self.normalize(word)
+        if not normalized:
+            return
+        state = 0
+        for char in normalized:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.match.append(None)
+            state = next_state
+        if self.match[state] is None:
+            self.match[state] = word
+
+    def build_fail_links(self):
+        """
+        link every state to the state of its longest proper suffix, breadth first
+        so a state inherits the match of its fail state
+        """
+        queue = deque(self.goto[0].itervalues())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].iteritems():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                if self.match[next_state] is None:
+                    self.match[next_state] = self.match[self.fail[next_state]]
+
+    def search(self, text):
+        """
+        return the first word found in the text, or None
+
+        @param text: The text
+        @type  text: String
+        """
+        goto = self.goto
+        fail = self.fail
+        match = self.match
+        state = 0
+        for char in self.normalize(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if match[state] is not None:
+                return match[state]
+        return None
+
+
+### CLASS Log Importer ###
+class LogImporter(object):
+    """
+    import archived games.log files into the xlrstats table, the matches are
+    counted in parallel by a pool of processes and merged in large transactions
+    """
+    def __init__(self, processes=None):
+        """
+        create a new instance of LogImporter
 
-    def get_gamestats(self):
+        @param processes: The number of processes, default is the number of CPUs
+        @type  processes: Integer
         """
-        get number of players in red team, blue team and spectator
+        self.processes = processes if processes > 0 else multiprocessing.cpu_count()
+
+    def import_logs(self, filenames):
         """
-        game_data = {Player.teams[1]: 0, Player.teams[2]: 0, Player.teams[3]: -1}
-        for player in self.players.itervalues():
-            game_data[Player.teams[player.get_team()]] += 1
-        return game_data
+        import the archived games.log files
 
-    def balance_teams(self, game_data):
+        @param filenames: The games.log files, gzip compressed files end with .gz
+        @type  filenames: List
         """
-        balance teams if needed
+        start_time = time.time()
+        logger.info("Importing Gamelog files: %d file(s) with %d process(es)", len(filenames), self.processes)
+        matches = itertools.chain.from_iterable(self.split_matches(filename) for filename in filenames)
+        pool = multiprocessing.Pool(self.processes)
+        num_matches = 0
+        num_lines = 0
+        num_players = 0
+        totals = {}
+        try:
+            for lines, deltas in pool.imap_unordered(self, matches, IMPORT_CHUNK_SIZE):
+                num_matches += 1
+                num_lines += lines
+                self.merge(totals, deltas)
+                if num_matches % IMPORT_COMMIT_MATCHES == 0:
+                    num_players += self.store(totals)
+                    totals = {}
+            num_players += self.store(totals)
+        finally:
+            pool.close()
+            pool.join()
+        duration = max(time.time() - start_time, 0.001)
+        logger.info("Imported %d matches, %d lines in %.1f s (%d lines/s), %d player statistics updated",
+                    num_matches, num_lines, duration, num_lines / duration, num_players)
+
+    def split_matches(self, filename):
+        """
+        yield the lines of each match of a games.log, a match starts with
+        InitGame and ends with ShutdownGame or the next InitGame
+
+        @param filename: The games.log file
+        @type  filename: String
+        """
+        match = []
+        log_file = gzip.open(filename, 'rb') if filename.endswith('.gz') else open(filename, 'rb')
+        try:
+            for line in log_file:
+                action = line[7:].split(":", 1)[0].strip()
+                if action == 'InitGame':
+                    if match:
+                        yield match
+                    match = [line]
+                elif match:
+                    match.append(line)
+                    if action == 'ShutdownGame':
+                        yield match
+                        match = []
+        finally:
+            log_file.close()
+        if match:
+            yield match
+
+    def __call__(self, lines):
+        """
+        count the statistics of one match in a worker process, return the number of lines
+        and the statistics stored during the match per GUID. The statistics are stored
+        like in the live game: on disconnect and on Exit, but not in games with bots.
+        Statistics not stored until the next InitGame are discarded.
+
+        @param lines: The lines of the match
+        @type  lines: List
+        """
+        decoder = EventDecoder()
+        stats = StatsCounter()
+        players = {BOT_PLAYER_NUM: Player(BOT_PLAYER_NUM, '127.0.0.1', 'NONE', 'World', lookup=False)}
+        team_kills = True
+        stats_with_bots = False
+        deltas = {}
+        for line in lines:
+            action, event = decoder.decode(line)
+            try:
+                if action == 'Kill':
+                    stats.count_kill(players[event.killer], players[event.victim], event.mod, team_kills)
+                elif action == 'Hit':
+                    stats.count_hit(players[event.hitter], event.zone)
+                elif action == 'Flag':
+                    stats.count_flag(players[event.player], event.action)
+                elif action == 'Assist':
+                    players[event.player].assist()
+                elif action == 'ClientUserinfo':
+                    player_num = int(event[:2].strip())
+                    values = decoder.explode_line(event[2:])
+                    guid = values['cl_guid'] if 'cl_guid' in values else "BOT%d" % player_num if 'skill' in values else "None"
+                    ip_address = values['ip'].split(":")[0].strip() if 'ip' in values else "0.0.0.0"
+                    if player_num not in players:
+                        players[player_num] = Player(player_num, ip_address, guid, values.get('name', "UnnamedPlayer"), lookup=False)
+                    elif players[player_num].get_guid() != guid:
+                        players[player_num].set_guid(guid)
+                elif action == 'ClientUserinfoChanged':
+                    values = decoder.explode_line(event[2:])
+                    players[int(event[:2].strip())].set_team(int(values['t']) if 't' in values else 3)
+                elif action == 'ClientSpawn':
+                    # if bots join game the statistics are not stored
+                    if players[event.player].get_ip_address() == '0.0.0.0':
+                        stats_with_bots = True
+                elif action == 'ClientDisconnect':
+                    player = players.pop(event.player)
+                    if not stats_with_bots:
+                        self.add_delta(deltas, player)
+                elif action == 'Exit':
+                    for player in players.itervalues():
+                        if not stats_with_bots:
+                            self.add_delta(deltas, player)
+                        player.clear_xlr_stats()
+                        player.reset()
+                elif action == 'InitGame':
+                    values = decoder.explode_line(event)
+                    stats.set_modversion(values.get('g_modversion', ''))
+                    # team kills are not counted for FFA, LMS, Jump, Gun
+                    team_kills = values.get('g_gametype') not in ('0', '1', '9', '11')
+            except (IndexError, KeyError, ValueError):
+                pass
+        return len(lines), deltas
 
-        @param game_data: Dictionary of players in each team
-        @type  game_data: dict
+    def add_delta(self, deltas, player):
         """
-        if (game_data[Player.teams[1]] - game_data[Player.teams[2]]) > 1:
-            team1 = 1
-            team2 = 2
-        elif (game_data[Player.teams[2]] - game_data[Player.teams[1]]) > 1:
-            team1 = 2
-            team2 = 1
-        else:
-            self.rcon_say("^7Teams are already balanced")
+        add the statistics of the player since the last store to the deltas of the match
+        """
+        guid = player.get_guid()
+        if player.get_player_num() == BOT_PLAYER_NUM or guid == "None":
             return
-        num_ptm = math.floor((game_data[Player.teams[team1]] - game_data[Player.teams[team2]]) / 2)
-        player_list = [player for player in self.players.itervalues() if player.get_team() == team1 and not player.get_team_lock()]
-        player_list.sort(cmp=lambda player1, player2: cmp(player2.get_time_joined(), player1.get_time_joined()))
-        for player in player_list[:int(num_ptm)]:
-            self.rcon_forceteam(player.get_player_num(), Player.teams[team2])
-        self.rcon_say("^7Autobalance complete!")
+        # kills, deaths, headshots, team_kills, team_death, max_kill_streak, suicides, flags_captured, flags_returned, flags_dropped, assists, rounds
+        self.merge(deltas, {guid: player.get_xlr_stats() + (1,)})
+        player.clear_xlr_stats()
+
+    def merge(self, totals, deltas):
+        """
+        merge the deltas per GUID into the totals, the max kill streak is the maximum
+        """
+        for guid, delta in deltas.iteritems():
+            if guid in totals:
+                total = totals[guid]
+                totals[guid] = tuple(max(old, new) if num == 5 else old + new for num, (old, new) in enumerate(zip(total, delta)))
+            else:
+                totals[guid] = tuple(delta)
+
+    def store(self, totals):
+        """
+        add the totals to the xlrstats table in a single transaction, only registered
+        players are updated, return the number of updated players
+        """
+        if not totals:
+            return 0
+        values = [delta + (guid,) for guid, delta in totals.iteritems()]
+        curs.executemany("UPDATE `xlrstats` SET `kills` = `kills` + ?,`deaths` = `deaths` + ?,`headshots` = `headshots` + ?,`team_kills` = `team_kills` + ?,`team_death` = `team_death` + ?,`max_kill_streak` = MAX(`max_kill_streak`, ?),`suicides` = `suicides` + ?,`flags_captured` = `flags_captured` + ?,`flags_returned` = `flags_returned` + ?,`flags_dropped` = `flags_dropped` + ?,`assists` = `assists` + ?,`rounds` = `rounds` + ? WHERE `guid` = ?", values)
+        updated = curs.rowcount
+        curs.executemany("UPDATE `xlrstats` SET `ratio` = CASE WHEN `deaths` > 0 THEN ROUND(CAST(`kills` AS REAL) / `deaths`, 2) ELSE 1.0 END WHERE `guid` = ?", [(guid,) for guid in totals])
+        conn.commit()
+        return updated
+
 
 ### Main ###
 if __name__ == "__main__":
     # get full path of spunky.py
     HOME = os.path.dirname(os.path.realpath(__file__))
 
+    parser = argparse.ArgumentParser(description='Spunky Bot - An automated game server bot')
+    parser.add_argument('--config', metavar='FILE', nargs='+', help='configuration files, one per game server (default: conf/settings.conf)')
+    parser.add_argument('--replay', metavar='GAMES_LOG', help='replay a recorded games.log as fast as possible without game server')
+    parser.add_argument('--transcript', metavar='FILE', default='replay_transcript.txt', help='file for the RCON commands of the replay (default: %(default)s)')
+    parser.add_argument('--database', metavar='FILE', help='database for the replay, its data is kept (default: replay.sqlite, recreated for each replay)')
+    parser.add_argument('--import', metavar='GAMES_LOG', dest='import_files', nargs='+', help='import archived games.log files into the player statistics')
+    parser.add_argument('--processes', metavar='NUM', type=int, help='number of processes of the import (default: number of CPUs)')
+    args = parser.parse_args()
+
+    if args.replay:
+        # the virtual time of the replay starts at the modification time of the games.log
+        CLOCK = VirtualClock(int(os.path.getmtime(args.replay)))
+        # no HTTP requests and Discord webhooks during the replay
+        WORKER = Worker(offline=True)
+        if args.database:
+            database = args.database
+        else:
+            # each replay starts from an empty database, so the results of a games.log are reproducible
+            database = 'replay.sqlite'
+            if os.path.isfile(database):
+                os.remove(database)
+    else:
+        CLOCK = Clock()
+        # background worker for HTTP requests and Discord webhooks
+        WORKER = Worker()
+        database = os.path.join(HOME, 'data.sqlite')
+
     # load the GEO database and store it globally in interpreter memory
     GEOIP = geoip2.database.Reader(os.path.join(HOME, 'lib', 'GeoLite2-Country.mmdb'))
 
     # connect to database
-    conn = sqlite3.connect(os.path.join(HOME, 'data.sqlite'))
+    conn = sqlite3.connect(database)
     curs = conn.cursor()
 
     # create tables if not exists
-    curs.execute('CREATE TABLE IF NOT EXISTS xlrstats (id INTEGER PRIMARY KEY NOT NULL, guid TEXT NOT NULL, name TEXT NOT NULL, ip_address TEXT NOT NULL, first_seen DATETIME, last_played DATETIME, num_played INTEGER DEFAULT 1, kills INTEGER DEFAULT 0, deaths INTEGER DEFAULT 0, headshots INTEGER DEFAULT 0, team_kills INTEGER DEFAULT 0, team_death INTEGER DEFAULT 0, max_kill_streak INTEGER DEFAULT 0, suicides INTEGER DEFAULT 0, ratio REAL DEFAULT 0, rounds INTEGER DEFAULT 0, admin_role INTEGER DEFAULT 1, flags_captured INTEGER DEFAULT 0, flags_returned INTEGER DEFAULT 0, flags_dropped INTEGER DEFAULT 0, assists INTEGER DEFAULT 0, gear TEXT DEFAULT "fLjRU")')
-    curs.execute('CREATE TABLE IF NOT EXISTS player (id INTEGER PRIMARY KEY NOT NULL, guid TEXT NOT NULL, name TEXT NOT NULL, ip_address TEXT NOT NULL, time_joined DATETIME, aliases TEXT, networks TEXT)')
-    curs.execute('CREATE TABLE IF NOT EXISTS ban_list (id INTEGER PRIMARY KEY NOT NULL, guid TEXT NOT NULL, name TEXT, ip_address TEXT, expires DATETIME DEFAULT 259200, timestamp DATETIME, reason TEXT)')
-    curs.execute('CREATE TABLE IF NOT EXISTS ban_points (id INTEGER PRIMARY KEY NOT NULL, guid TEXT NOT NULL, point_type TEXT, expires DATETIME)')
-    curs.execute('CREATE TABLE IF NOT EXISTS mapvotes (id INTEGER PRIMARY KEY NOT NULL, map TEXT, passed INTEGAR DEFAULT 0, failed INTEGAR DEFAULT 0)')
-
-    # create instance of LogParser
-    LogParser(os.path.join(HOME, 'conf', 'settings.conf'))
+    for table in DATABASE_TABLES:
+        curs.execute(table)
+
+    config_files = args.config if args.config else [os.path.join(HOME, 'conf', 'settings.conf')]
+    if len(config_files) > 1 and not args.replay and not args.import_files:
+        # run all game servers in this process
+        server_host = ServerHost()
+        for config_file in config_files:
+            LogParser(config_file, server_host=server_host)
+        server_host.run()
+    else:
+        # create instance of LogParser
+        LogParser(config_files[0], replay_file=args.replay, transcript_file=args.transcript,
+                  import_files=args.import_files, processes=args.processes)
 
     # close database connection
     conn.close()
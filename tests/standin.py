@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Stand-in game server for the tests and benchmarks of Spunky Bot
+
+A local UDP server answering the RCON and getstatus requests of the bot like an
+Urban Terror server. Run it at server_ip:server_port of the bot configuration:
+python tests/standin.py --config conf/settings.conf --latency 0.05 --loss 0.01
+"""
+
+import os
+import time
+import argparse
+import select
+import socket
+import random
+import ConfigParser
+import logging
+
+from threading import Thread
+from threading import RLock
+
+# commands setting the CVAR given as first argument
+SET_COMMANDS = frozenset(['set', 'seta', 'sets', 'setu'])
+
+
+class StandInServer(object):
+    """
+    local UDP game server answering RCON and getstatus requests of the Quake 3 out-of-band
+    protocol from a scripted state, used to test and benchmark the RCON layer without
+    Urban Terror server. All RCON commands are recorded with their time, the responses
+    can be delayed and requests dropped.
+    """
+    PACKET_PREFIX = '\xff\xff\xff\xff'
+
+    def __init__(self, address=('127.0.0.1', 27960), rcon_password='', variables=None, maps=None, latency=0, loss=0):
+        """
+        create a new instance of StandInServer and bind its socket
+
+        @param address: The IP address and port, port 0 binds a free port
+        @type  address: Tuple
+        @param rcon_password: The RCON password
+        @type  rcon_password: String
+        @param variables: The server variables in addition to the defaults
+        @type  variables: Dict
+        @param maps: The names of the available maps
+        @type  maps: List
+        @param latency: The seconds each response is delayed
+        @type  latency: Float
+        @param loss: The share of requests without response, 0 to 1
+        @type  loss: Float
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(address)
+        self.address = self.sock.getsockname()
+        self.rcon_password = rcon_password
+        self.variables = {'sv_hostname': 'Spunky Bot stand-in', 'mapname': 'ut4_abbey', 'g_gametype': '4', 'g_modversion': '4.3.4',
+                          'g_logsync': '1', 'g_loghits': '1', 'g_nextmap': '', 'g_nextcyclemap': 'ut4_abbey', 'g_mapcycle': 'mapcycle.txt',
+                          'fs_homepath': '', 'fs_basepath': '', 'fs_game': 'q3ut4'}
+        self.variables.update(variables or {})
+        self.maps = set(maps or [self.variables['mapname']])
+        # player number: (score, ping, name, address)
+        self.players = {}
+        self.latency = latency
+        self.loss = loss
+        # list of (time, command)
+        self.transcript = []
+        self.dropped = 0
+        self.running = False
+        self.lock = RLock()
+
+    def set_cvar(self, name, value):
+        """
+        set a server variable, the names are not case-sensitive
+
+        @param name: The name of the variable
+        @type  name: String
+        @param value: The value of the variable
+        @type  value: String
+        """
+        with self.lock:
+            self.variables[self.find_cvar(name) or name] = value
+
+    def find_cvar(self, name):
+        """
+        return the name of an existing server variable or None
+
+        @param name: The name of the variable in any case
+        @type  name: String
+        """
+        for variable in self.variables:
+            if variable.lower() == name.lower():
+                return variable
+        return None
+
+    def add_player(self, player_num, name, score=0, ping=50, address='127.0.0.1:27960'):
+        """
+        add a player to the status of the server
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        @param name: The name of the player
+        @type  name: String
+        @param score: The score of the player
+        @type  score: Integer
+        @param ping: The ping of the player, 999 = connection interrupted
+        @type  ping: Integer
+        @param address: The IP address and port of the player
+        @type  address: String
+        """
+        with self.lock:
+            self.players[player_num] = (score, ping, name, address)
+
+    def remove_player(self, player_num):
+        """
+        remove a player from the status of the server
+
+        @param player_num: The player number
+        @type  player_num: Integer
+        """
+        with self.lock:
+            self.players.pop(player_num, None)
+
+    def rcon(self, command):
+        """
+        record an RCON command and return the text of the response
+
+        @param command: The RCON command
+        @type  command: String
+        """
+        self.transcript.append((time.time(), command))
+        verb, _, args = command.partition(' ')
+        args = args.strip()
+        with self.lock:
+            if verb == 'status':
+                return self.get_rcon_status()
+            if verb == 'dir':
+                return "Directory %s\n---------------\n%s\n" % (args, '\n'.join(["/%s.bsp" % mapname for mapname in sorted(self.maps)]))
+            if verb in SET_COMMANDS:
+                name, _, value = args.partition(' ')
+                self.set_cvar(name, value.strip().strip('"'))
+            elif verb == 'kick' and args.split(' ')[0].isdigit():
+                self.remove_player(int(args.split(' ')[0]))
+            elif verb == 'map' and args:
+                self.variables['mapname'] = args.strip('"')
+                self.maps.add(self.variables['mapname'])
+            elif self.find_cvar(verb):
+                if not args:
+                    return '"%s" is:"%s^7" default:"^7"\n' % (self.find_cvar(verb), self.variables[self.find_cvar(verb)])
+                self.set_cvar(verb, args.strip('"'))
+            elif not args and verb not in ('veto', 'cyclemap', 'reload', 'restart', 'swapteams', 'shuffleteams'):
+                return 'Unknown command "%s"\n' % verb
+        return ''
+
+    def get_rcon_status(self):
+        """
+        return the response of the RCON status command
+        """
+        lines = ["map: %s" % self.variables['mapname'],
+                 "num score ping name            lastmsg address               qport rate",
+                 "--- ----- ---- --------------- ------- --------------------- ----- -----"]
+        for player_num, (score, ping, name, address) in sorted(self.players.iteritems()):
+            lines.append("%3d %5d %4d %-15s %7d %-21s %5d %5d" % (player_num, score, ping, name, 0, address, player_num, 25000))
+        return '\n'.join(lines) + '\n'
+
+    def get_status(self):
+        """
+        return the response of the getstatus request, the server variables and the players
+        """
+        with self.lock:
+            variables = ''.join(["\\%s\\%s" % item for item in sorted(self.variables.iteritems())])
+            players = ''.join(['%d %d "%s"\n' % (score, ping, name) for score, ping, name, _ in [self.players[num] for num in sorted(self.players)]])
+        return "%s\n%s" % (variables, players)
+
+    def handle_packet(self, data):
+        """
+        return the response packet of a request packet, or None if there is no response
+
+        @param data: The request packet
+        @type  data: String
+        """
+        if not data.startswith(self.PACKET_PREFIX):
+            return None
+        request = data[len(self.PACKET_PREFIX):].rstrip('\n')
+        if request.startswith('getstatus'):
+            self.transcript.append((time.time(), 'getstatus'))
+            return "%sstatusResponse\n%s" % (self.PACKET_PREFIX, self.get_status())
+        if request.startswith('rcon '):
+            request = request[5:].lstrip()
+            # the password may be quoted
+            if request.startswith('"'):
+                password, _, command = request[1:].partition('"')
+            else:
+                password, _, command = request.partition(' ')
+            if password != self.rcon_password:
+                return "%sprint\nBad rconpassword.\n" % self.PACKET_PREFIX
+            return "%sprint\n%s" % (self.PACKET_PREFIX, self.rcon(command.strip()))
+        return None
+
+    def serve_forever(self):
+        """
+        answer requests until stop is called
+        """
+        self.running = True
+        while self.running:
+            if not select.select([self.sock], [], [], 0.5)[0]:
+                continue
+            data, client = self.sock.recvfrom(4096)
+            if self.loss and random.random() < self.loss:
+                self.dropped += 1
+                continue
+            response = self.handle_packet(data)
+            if response is None:
+                continue
+            if self.latency:
+                time.sleep(self.latency)
+            self.sock.sendto(response, client)
+
+    def start(self):
+        """
+        answer requests in a background thread
+        """
+        server = Thread(target=self.serve_forever)
+        server.setDaemon(True)
+        server.start()
+        return server
+
+    def stop(self):
+        """
+        stop answering requests within half a second
+        """
+        self.running = False
+
+    def close(self):
+        """
+        stop answering requests and close the socket
+        """
+        self.stop()
+        self.sock.close()
+
+    def write_transcript(self, filename):
+        """
+        write the recorded RCON commands with their time in milliseconds
+
+        @param filename: The name of the transcript file
+        @type  filename: String
+        """
+        with open(filename, 'w') as file_handle:
+            for timestamp, command in self.transcript:
+                file_handle.write("%s.%03d %s\n" % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)), int(timestamp * 1000) % 1000, command))
+
+
+### Main ###
+if __name__ == "__main__":
+    HOME = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+    parser = argparse.ArgumentParser(description='Spunky Bot stand-in game server')
+    parser.add_argument('--config', metavar='FILE', default=os.path.join(HOME, 'conf', 'settings.conf'), help='bot configuration with the address and RCON password (default: %(default)s)')
+    parser.add_argument('--latency', metavar='SECONDS', type=float, default=0, help='response delay (default: %(default)s)')
+    parser.add_argument('--loss', metavar='RATE', type=float, default=0, help='share of requests without response, 0 to 1 (default: %(default)s)')
+    parser.add_argument('--transcript', metavar='FILE', default='standin_transcript.txt', help='file for the received RCON commands (default: %(default)s)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    config = ConfigParser.ConfigParser()
+    config.read(args.config)
+    standin = StandInServer((config.get('server', 'server_ip'), config.getint('server', 'server_port')), config.get('server', 'rcon_password'),
+                            latency=args.latency, loss=args.loss)
+    logging.info("Stand-in game server  : %s:%s, latency %.0f ms, loss %.0f %%", standin.address[0], standin.address[1], args.latency * 1000, args.loss * 100)
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    standin.close()
+    logging.info("Stand-in completed    : %d RCON commands, %d requests dropped", len(standin.transcript), standin.dropped)
+    standin.write_transcript(args.transcript)
+    logging.info("RCON transcript       : %s", args.transcript)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests of the RCON layer of Spunky Bot against the stand-in game server
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import unittest
+
+from threading import Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import spunkybot
+from standin import StandInServer
+
+
+class RconTestCase(unittest.TestCase):
+    """
+    game connected to a stand-in game server, the queued commands are sent by an RCON thread of the server host
+    """
+    config = """[server]
+server_name = Stand-in
+server_ip = 127.0.0.1
+server_port = %d
+rcon_password = secret
+"""
+
+    def setUp(self):
+        spunkybot.CLOCK = spunkybot.Clock()
+        spunkybot.conn = sqlite3.connect(':memory:')
+        spunkybot.curs = spunkybot.conn.cursor()
+        for table in spunkybot.DATABASE_TABLES:
+            spunkybot.curs.execute(table)
+        self.standin = StandInServer(('127.0.0.1', 0), 'secret', variables={'g_nextmap': 'ut4_turnpike'})
+        self.standin.start()
+        handle, self.config_file = tempfile.mkstemp(suffix='.conf')
+        with os.fdopen(handle, 'w') as file_handle:
+            file_handle.write(self.config % self.standin.address[1])
+        self.game = spunkybot.Game(self.config_file, '4.3.4')
+        self.game.live = True
+        rcon = Thread(target=spunkybot.ServerHost().rcon_process, args=(self.game,))
+        rcon.setDaemon(True)
+        rcon.start()
+
+    def tearDown(self):
+        self.game.live = False
+        self.standin.close()
+        os.remove(self.config_file)
+        spunkybot.conn.close()
+
+    def get_commands(self, verb):
+        """
+        return the RCON commands of a verb received by the stand-in game server
+        """
+        return [command for _, command in self.standin.transcript if command.split(' ')[0] == verb]
+
+    def test_query_cvar(self):
+        self.assertEqual(self.game.query_cvar('g_nextmap').result(), 'ut4_turnpike')
+        self.assertEqual(self.game.query_cvar('G_NEXTMAP').result(), 'ut4_turnpike')
+        # the second query is answered from the cache
+        self.assertEqual(len(self.get_commands('g_nextmap')), 1)
+
+    def test_query_cvar_set(self):
+        self.assertEqual(self.game.query_cvar('g_gear').result(), None)
+        self.game.send_rcon('set g_gear 63')
+        self.assertEqual(self.game.query_cvar('g_gear').result(), '63')
+
+    def test_query_status(self):
+        self.standin.add_player(0, 'Alice', ping=42)
+        self.standin.add_player(3, 'Bob', ping=999)
+        players = self.game.query_status().result()
+        self.assertEqual(sorted([(player.num, player.ping) for player in players]), [(0, 42), (3, 999)])
+
+    def test_group_flood_limit(self):
+        for player_num in xrange(3):
+            self.game.send_rcon('kick %d' % player_num)
+        group = self.game.send_rcon_group('smite', ['smite %d' % player_num for player_num in xrange(16)])
+        time.sleep(0.25)
+        kick_time = time.time()
+        self.game.send_rcon('kick 20')
+        self.assertTrue(group.finished.wait(10))
+        # ioq3 accepts 10 RCON requests per second
+        send_times = [send_time for send_time, _ in self.standin.transcript]
+        self.assertTrue(max([len([other for other in send_times if start <= other < start + 1.0]) for start in send_times]) <= 10)
+        # the kick is sent between the bursts of the group
+        commands = [command for _, command in self.standin.transcript]
+        self.assertTrue(commands.index('kick 20') < commands.index('smite 15'))
+        self.assertTrue(self.standin.transcript[commands.index('kick 20')][0] - kick_time < 0.2)
+
+    def test_group_burst(self):
+        group = self.game.send_rcon_group('smite', ['smite %d' % player_num for player_num in xrange(16)])
+        self.assertTrue(group.finished.wait(10))
+        # 9 commands per second within the server limit, the rate of 5 commands per second would take 3 s
+        self.assertTrue(group.get_duration() < 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()